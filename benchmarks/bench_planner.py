@@ -0,0 +1,379 @@
+"""
+Benchmarks for the Square Foot Garden Planner.
+
+Builds synthetic beds from 4×8 up to several hundred squares per side
+(mixed crops, surfaces, notes and irrigation/soil tags) and times the
+planner's main paths on each:
+
+    draw_grid        full redraw of the main canvas
+    refresh_cell     one planted square, repainted through the idle flush
+    update_sidebar   planted summary and stats footer after a full recount
+    load_json        File → Open of a JSON layout (load, recover check, draw)
+    save_json        File → Save as JSON, up to the end of the background write
+    load_sqft        File → Open of a binary .sqft layout
+    save_sqft        File → Save as .sqft
+    resize_garden    grow the bed by one column, then redraw
+    layout_dialog    open the layout editor (builds and draws the mini canvas)
+    layout_resize    in the layout editor, grow by one row and column, then shrink
+    region_stats     one edit, then the sidebar statistics for a selected region
+    transform        Garden → Transform → Rotate Clockwise, then redraw
+
+Each measurement is printed as one JSON object per line: best and median
+wall time over --repeat runs, canvas items created (recording stub only),
+items left on the main canvas, and peak traced memory from a separate
+run.  By default tkinter is replaced with the recording stub in
+tkstub.py, so no display is needed; --tk uses the real toolkit instead
+(run under xvfb-run on a headless machine).
+
+Compare two versions with:
+
+    python benchmarks/bench_planner.py -o before.jsonl
+    ...upgrade...
+    python benchmarks/bench_planner.py --compare before.jsonl
+
+which prints a ratio table to stderr and exits with status 1 if any case
+got slower than --threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+DEFAULT_SIZES = "4x8,16x16,50x50,100x100,200x200,400x400"
+
+
+# ─── Synthetic Layouts ────────────────────────────────────────────────────────
+
+def make_garden(rows, cols, seed=0):
+    """Return a Garden with a realistic mix of surfaces, crops and tags."""
+    from garden_core import CROP_DATA, IRRIGATION_VALUES, SOIL_VALUES, SURFACE_IDS, Garden
+
+    rng = random.Random(seed)
+    garden = Garden(rows, cols)
+    model = garden.model
+    surface = array("B", bytes(rows * cols))
+    # Pathways every few rows and columns, plus scattered other surfaces
+    for r in range(rows):
+        for c in range(cols):
+            if (r % 6 == 5 or c % 9 == 8) and rows > 4:
+                code = SURFACE_IDS["pathway"]
+            elif rng.random() < 0.05:
+                code = rng.randrange(1, len(SURFACE_IDS))
+            else:
+                code = 0
+            surface[r * cols + c] = code
+    model.assign_surfaces(surface)
+
+    crops = list(CROP_DATA)
+    for r in range(rows):
+        for c in range(cols):
+            if not model.is_garden(r, c):
+                continue
+            if rng.random() < 0.7:
+                model.set_crop(r, c, rng.choice(crops))
+            if rng.random() < 0.3:
+                model.set_irrigation(r, c, rng.choice(IRRIGATION_VALUES[1:]))
+            if rng.random() < 0.2:
+                model.set_soil(r, c, rng.choice(SOIL_VALUES[1:]))
+            if rng.random() < 0.02:
+                model.set_note(r, c, f"Note for square {r + 1},{c + 1}")
+    return garden
+
+
+# ─── Harness ──────────────────────────────────────────────────────────────────
+
+class Bench:
+    """One app instance and its scratch directory, shared by every case."""
+
+    def __init__(self, use_tk, renderer):
+        if not use_tk:
+            import tkstub
+            tkstub.install()
+            self.stub = tkstub
+        else:
+            self.stub = None
+        import garden_core
+        import garden_planner as gp
+
+        self.gp = gp
+        self.tmp = tempfile.mkdtemp(prefix="garden_bench_")
+        garden_core.AUTOSAVE_DIR = self.tmp     # keep journals out of $HOME
+        self.root = gp.tk.Tk()
+        self.app = gp.GardenPlannerApp(self.root, renderer=renderer)
+        self.settle()
+
+    def settle(self):
+        """Let pending idle callbacks (flushes, viewport syncs) run."""
+        if self.stub:
+            self.stub.run_pending()
+        else:
+            self.root.update()
+
+    def use(self, garden):
+        self.app._set_garden(garden)
+        self.app._draw_grid()
+        self.app._update_sidebar()
+        self.settle()
+
+    def created(self):
+        return self.stub.counters["created"] if self.stub else None
+
+    def close(self):
+        self.app.journal.close(discard=True)
+        self.root.destroy()
+
+
+def case_draw_grid(b, garden):
+    return b.app._draw_grid
+
+
+def case_refresh_cell(b, garden):
+    app = b.app
+    cells = [(r, c) for r in range(garden.rows) for c in range(garden.cols)
+             if garden.model.is_garden(r, c)][:64] or [(0, 0)]
+    state = {"n": 0}
+
+    def run():
+        r, c = cells[state["n"] % len(cells)]
+        state["n"] += 1
+        app.selected_crop.set("Basil" if state["n"] % 2 else "Kale")
+        app._paint_cell(r, c)
+        b.settle()
+    return run
+
+
+def case_update_sidebar(b, garden):
+    def run():
+        b.app.tally.model_reset()
+        b.app._update_sidebar()
+    return run
+
+
+def _file_case(ext, save):
+    def case(b, garden):
+        path = os.path.join(b.tmp, f"bench{ext}")
+        garden.save(path)
+        if save:
+            def run():
+                b.app._write_json(path)
+                b.app._settle_job()     # wait for the write on the file worker
+            return run
+
+        def run():
+            if b.stub:
+                b.stub.answers["path"] = path
+                b.app._load_file()
+            else:
+                # Real Tk would block in the file dialog; do what it leads to
+                b.app._set_garden(b.gp.Garden.load(path), recover=True)
+                b.app._draw_grid()
+                b.app._update_sidebar()
+            b.settle()
+        return run
+    return case
+
+
+def case_resize_garden(b, garden):
+    app = b.app
+    sizes = [(garden.rows, garden.cols + 1), (garden.rows, garden.cols)]
+    state = {"n": 0}
+
+    def run():
+        rows, cols = sizes[state["n"] % 2]
+        state["n"] += 1
+        app.garden.resize(rows, cols)
+        app.history.commit("Edit Layout")
+        app._draw_grid()
+        app._update_sidebar()
+        b.settle()
+    return run
+
+
+def case_layout_dialog(b, garden):
+    def run():
+        dlg = b.gp._LayoutDialog(b.root, b.app.model)
+        dlg.top.destroy()
+    return run
+
+
+def case_layout_resize(b, garden):
+    dlg = b.gp._LayoutDialog(b.root, b.app.model)
+    sizes = [(garden.rows + 1, garden.cols + 1), (garden.rows, garden.cols)]
+    state = {"n": 0}
+
+    def run():
+        rows, cols = sizes[state["n"] % 2]
+        state["n"] += 1
+        dlg.rows_var.set(rows)
+        dlg.cols_var.set(cols)
+        dlg._rebuild_canvas()
+    return run
+
+
+def case_region_stats(b, garden):
+    app = b.app
+    rows, cols = garden.rows, garden.cols
+    app._select((rows // 4, rows - rows // 4 or 1, cols // 4, cols - cols // 4 or 1))
+    state = {"n": 0}
+
+    def run():
+        # An edit inside the region, so the tables' pending log is exercised
+        state["n"] += 1
+        app.model.set_crop(rows // 2, cols // 2, "Basil" if state["n"] % 2 else "Kale")
+        app._update_selection_stats()
+    return run
+
+
+def case_transform(b, garden):
+    def run():
+        b.app._transform("Rotate", lambda g: g.rotate(1))
+        b.settle()
+    return run
+
+
+CASES = {
+    "draw_grid":      case_draw_grid,
+    "refresh_cell":   case_refresh_cell,
+    "update_sidebar": case_update_sidebar,
+    "load_json":      _file_case(".json", save=False),
+    "save_json":      _file_case(".json", save=True),
+    "load_sqft":      _file_case(".sqft", save=False),
+    "save_sqft":      _file_case(".sqft", save=True),
+    "resize_garden":  case_resize_garden,
+    "layout_dialog":  case_layout_dialog,
+    "layout_resize":  case_layout_resize,
+    "region_stats":   case_region_stats,
+    "transform":      case_transform,
+}
+
+
+def measure(b, name, garden, repeat):
+    b.use(garden)
+    run = CASES[name](b, garden)
+    run()   # warm-up: caches, styles, first-time allocations
+
+    times = []
+    created = b.created()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - t0)
+    if created is not None:
+        created = (b.created() - created) // repeat
+
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "case":          name,
+        "rows":          garden.rows,
+        "cols":          garden.cols,
+        "cells":         garden.rows * garden.cols,
+        "repeat":        repeat,
+        "best_s":        round(min(times), 6),
+        "median_s":      round(statistics.median(times), 6),
+        "items_created": created,
+        "canvas_items":  len(b.app.canvas.find_all()),
+        "peak_kb":       round(peak / 1024, 1),
+    }
+
+
+# ─── Comparison ───────────────────────────────────────────────────────────────
+
+def compare(baseline_path, results, threshold):
+    """Print best-time ratios against a baseline run; return True if any
+    case is slower than *threshold* times the baseline."""
+    with open(baseline_path, encoding="utf-8") as f:
+        old = {}
+        for line in f:
+            rec = json.loads(line)
+            if "case" in rec:
+                old[rec["case"], rec["rows"], rec["cols"]] = rec
+    slower = False
+    print(f"{'case':<16} {'size':>9} {'before':>10} {'after':>10} {'ratio':>7}", file=sys.stderr)
+    for rec in results:
+        base = old.get((rec["case"], rec["rows"], rec["cols"]))
+        if base is None:
+            continue
+        ratio = rec["best_s"] / base["best_s"] if base["best_s"] else float("inf")
+        flag = "  SLOWER" if ratio > threshold else ""
+        slower |= bool(flag)
+        print(
+            f"{rec['case']:<16} {rec['rows']:>4}×{rec['cols']:<4} "
+            f"{base['best_s']:>10.4f} {rec['best_s']:>10.4f} {ratio:>7.2f}{flag}",
+            file=sys.stderr,
+        )
+    return slower
+
+
+# ─── Entry Point ──────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the garden planner's hot paths")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"comma-separated ROWSxCOLS beds (default: {DEFAULT_SIZES})")
+    parser.add_argument("--cases", default=",".join(CASES),
+                        help="comma-separated cases to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (default: 5)")
+    parser.add_argument("--renderer", default="vector", help="grid renderer to use")
+    parser.add_argument("--tk", action="store_true",
+                        help="use real Tk instead of the recording stub (needs a display)")
+    parser.add_argument("-o", "--output", help="write results to this file instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="results file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="ratio above which --compare reports a regression (default: 1.25)")
+    args = parser.parse_args(argv)
+
+    sizes = [tuple(int(n) for n in s.lower().split("x")) for s in args.sizes.split(",")]
+    names = args.cases.split(",")
+    unknown = set(names) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    bench = Bench(args.tk, args.renderer)
+    from garden_core import Garden
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    meta = {
+        "python":   platform.python_version(),
+        "platform": platform.platform(),
+        "toolkit":  "tk" if args.tk else "stub",
+        "renderer": args.renderer,
+        "time":     time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    out.write(json.dumps({"meta": meta}) + "\n")
+    results = []
+    try:
+        for rows, cols in sizes:
+            garden = make_garden(rows, cols)
+            for name in names:
+                # Each case gets its own copy so edits don't leak between cases
+                rec = measure(bench, name, Garden(model=garden.model.copy()), args.repeat)
+                results.append(rec)
+                out.write(json.dumps(rec) + "\n")
+                out.flush()
+    finally:
+        bench.close()
+        if out is not sys.stdout:
+            out.close()
+
+    if args.compare and compare(args.compare, results, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+A stand-in for tkinter so the planner can be benchmarked without a display.
+
+install() puts fake ``tkinter``, ``tkinter.ttk``, ``tkinter.messagebox`` and
+``tkinter.filedialog`` modules into sys.modules; import garden_planner
+afterwards.  Widgets accept and ignore everything.  Canvas keeps its items
+in a dict and counts every call, so a benchmark can report how many items
+a code path created without paying for real drawing.  after()/after_idle()
+callbacks are queued until run_pending() is called.
+"""
+
+import itertools
+import sys
+import types
+
+_ids = itertools.count(1)
+_pending = []
+
+# Canvas activity across every canvas, for the benchmark to sample
+counters = {"created": 0, "deleted": 0, "calls": 0}
+
+# Answers given by the dialog stand-ins
+answers = {"askyesno": False, "askyesnocancel": False, "path": ""}
+
+
+def run_pending():
+    """Run queued after()/after_idle() callbacks, including ones they queue."""
+    while _pending:
+        _, fn, args = _pending.pop(0)
+        fn(*args)
+
+
+class TclError(Exception):
+    pass
+
+
+class Variable:
+    _default = ""
+
+    def __init__(self, master=None, value=None):
+        self._value = self._default if value is None else value
+        self._traces = []
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        self._value = value
+        for cb in self._traces:
+            cb("", "", "write")
+
+    def trace_add(self, mode, cb):
+        self._traces.append(cb)
+
+
+class IntVar(Variable):
+    _default = 0
+
+
+class BooleanVar(Variable):
+    _default = False
+
+
+class DoubleVar(Variable):
+    _default = 0.0
+
+
+class Misc:
+    """Any widget: remembers its options, ignores everything else."""
+
+    def __init__(self, master=None, **kw):
+        self.master = master
+        self._options = dict(kw)
+        self._children = []
+        if isinstance(master, Misc):
+            master._children.append(self)
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return lambda *a, **k: None
+
+    def configure(self, **kw):
+        self._options.update(kw)
+
+    config = configure
+
+    def cget(self, key):
+        return self._options.get(key)
+
+    def winfo_children(self):
+        return list(self._children)
+
+    def destroy(self):
+        for child in self._children:
+            child.destroy()
+        self._children = []
+
+    def winfo_width(self):
+        return self._options.get("width") or 1200
+
+    def winfo_height(self):
+        return self._options.get("height") or 800
+
+    def after(self, ms, fn=None, *args):
+        token = f"after#{next(_ids)}"
+        _pending.append((token, fn, args))
+        return token
+
+    def after_idle(self, fn, *args):
+        return self.after(0, fn, *args)
+
+    def after_cancel(self, token):
+        _pending[:] = [p for p in _pending if p[0] != token]
+
+
+class Canvas(Misc):
+    """Records items instead of drawing them."""
+
+    def __init__(self, master=None, **kw):
+        super().__init__(master, **kw)
+        self.items = {}     # id -> [tags]
+
+    def _create(self, *coords, **kw):
+        item = next(_ids)
+        tags = kw.get("tags", ())
+        self.items[item] = (tags,) if isinstance(tags, str) else tuple(tags)
+        counters["created"] += 1
+        counters["calls"] += 1
+        return item
+
+    create_rectangle = create_text = create_line = create_image = _create
+    create_oval = create_polygon = _create
+
+    def _find(self, tag):
+        if tag == "all":
+            return list(self.items)
+        if isinstance(tag, int):
+            return [tag] if tag in self.items else []
+        return [i for i, tags in self.items.items() if tag in tags]
+
+    def delete(self, *tags):
+        for tag in tags:
+            for item in self._find(tag):
+                del self.items[item]
+                counters["deleted"] += 1
+        counters["calls"] += 1
+
+    def find_all(self):
+        return tuple(self.items)
+
+    def find_withtag(self, tag):
+        return tuple(self._find(tag))
+
+    def _call(self, *a, **k):
+        counters["calls"] += 1
+
+    itemconfigure = itemconfig = coords = move = tag_raise = tag_lower = _call
+
+    def canvasx(self, x, *a):
+        return x
+
+    def canvasy(self, y, *a):
+        return y
+
+
+class PhotoImage:
+    def __init__(self, master=None, width=0, height=0, **kw):
+        self._size = (width, height)
+
+    def put(self, *a, **k):
+        pass
+
+    def width(self):
+        return self._size[0]
+
+    def height(self):
+        return self._size[1]
+
+    def zoom(self, x, y=None):
+        return PhotoImage(width=self._size[0] * x, height=self._size[1] * (y or x))
+
+    def subsample(self, x, y=None):
+        return PhotoImage(width=-(-self._size[0] // x), height=-(-self._size[1] // (y or x)))
+
+
+def _dialog(name):
+    return lambda *a, **k: answers[name]
+
+
+def install():
+    """Register the stand-in modules under the tkinter names."""
+    tk = types.ModuleType("tkinter")
+    for name in ("BOTH", "LEFT", "RIGHT", "TOP", "BOTTOM", "X", "Y",
+                 "HORIZONTAL", "VERTICAL", "END", "NORMAL", "HIDDEN",
+                 "DISABLED", "N", "S", "E", "W", "NW", "NE", "SW", "SE"):
+        setattr(tk, name, name.lower())
+    tk.TclError = TclError
+    tk.Misc = Misc
+    tk.Canvas = Canvas
+    tk.PhotoImage = PhotoImage
+    tk.StringVar = Variable
+    tk.IntVar, tk.BooleanVar, tk.DoubleVar = IntVar, BooleanVar, DoubleVar
+    for name in ("Tk", "Toplevel", "Frame", "Label", "Button", "Entry",
+                 "Scrollbar", "Spinbox", "Checkbutton", "Radiobutton",
+                 "Listbox", "LabelFrame", "Menu", "Text"):
+        setattr(tk, name, type(name, (Misc,), {}))
+
+    ttk = types.ModuleType("tkinter.ttk")
+    for name in ("Scrollbar", "Spinbox", "Button", "Combobox", "Separator",
+                 "Progressbar", "Checkbutton", "Radiobutton", "Entry",
+                 "Label", "Frame", "Style"):
+        setattr(ttk, name, type(name, (Misc,), {}))
+
+    messagebox = types.ModuleType("tkinter.messagebox")
+    messagebox.askyesno = _dialog("askyesno")
+    messagebox.askyesnocancel = _dialog("askyesnocancel")
+    messagebox.showerror = messagebox.showinfo = messagebox.showwarning = (
+        lambda *a, **k: None
+    )
+    filedialog = types.ModuleType("tkinter.filedialog")
+    filedialog.askopenfilename = filedialog.asksaveasfilename = _dialog("path")
+
+    tk.ttk, tk.messagebox, tk.filedialog = ttk, messagebox, filedialog
+    sys.modules.update({
+        "tkinter": tk, "tkinter.ttk": ttk,
+        "tkinter.messagebox": messagebox, "tkinter.filedialog": filedialog,
+    })
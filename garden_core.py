@@ -0,0 +1,2782 @@
+"""
+Square Foot Garden Planner — core
+The Tk-free half of the planner: crop and surface data, grid storage,
+layout files and bed statistics.  Scripts and batch jobs can import this
+module without a display; garden_planner.py is the desktop view on top.
+"""
+
+import csv
+import glob
+import json
+import mmap
+import os
+import queue
+import re
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+
+# ─── Crop Database ────────────────────────────────────────────────────────────
+
+CROP_DATA = {
+    # ── Original crops ────────────────────────────────────────────────────────
+    "Tomatoes":         {"plants_per_sqft": 1,  "color": "#E74C3C", "spacing": "18–24 in", "icon": "🍅"},
+    "Peppers":          {"plants_per_sqft": 1,  "color": "#E67E22", "spacing": "12–15 in", "icon": "🌶️"},
+    "Lettuce":          {"plants_per_sqft": 4,  "color": "#A8E063", "spacing": "6 in",     "icon": "🥬"},
+    "Spinach":          {"plants_per_sqft": 9,  "color": "#27AE60", "spacing": "4 in",     "icon": "🍃"},
+    "Carrots":          {"plants_per_sqft": 16, "color": "#F39C12", "spacing": "3 in",     "icon": "🥕"},
+    "Radishes":         {"plants_per_sqft": 16, "color": "#E91E8C", "spacing": "3 in",     "icon": "🌸"},
+    "Beans":            {"plants_per_sqft": 9,  "color": "#8BC34A", "spacing": "4 in",     "icon": "🫘"},
+    "Basil":            {"plants_per_sqft": 4,  "color": "#1ABC9C", "spacing": "6 in",     "icon": "🌿"},
+    "Cucumbers":        {"plants_per_sqft": 2,  "color": "#48C9B0", "spacing": "8 in",     "icon": "🥒"},
+    "Zucchini":         {"plants_per_sqft": 1,  "color": "#F1C40F", "spacing": "18 in",    "icon": "🟢"},
+    "Kale":             {"plants_per_sqft": 1,  "color": "#1E8449", "spacing": "12 in",    "icon": "🌱"},
+    "Onions":           {"plants_per_sqft": 16, "color": "#BB8FCE", "spacing": "3 in",     "icon": "🧅"},
+    "Peas":             {"plants_per_sqft": 8,  "color": "#A9DFBF", "spacing": "4–6 in",  "icon": "🫛"},
+    # ── New crops ─────────────────────────────────────────────────────────────
+    "Broccoli":         {"plants_per_sqft": 1,  "color": "#2E86AB", "spacing": "12 in",    "icon": "🥦"},
+    "Cauliflower":      {"plants_per_sqft": 1,  "color": "#D5D8DC", "spacing": "12 in",    "icon": "⚪"},
+    "Cabbage":          {"plants_per_sqft": 1,  "color": "#7DCEA0", "spacing": "12 in",    "icon": "💚"},
+    "Brussels Sprouts": {"plants_per_sqft": 1,  "color": "#52BE80", "spacing": "12 in",    "icon": "🥦"},
+    "Sweet Corn":       {"plants_per_sqft": 4,  "color": "#F9E79F", "spacing": "6 in",     "icon": "🌽"},
+    "Pumpkin":          {"plants_per_sqft": 1,  "color": "#DC7633", "spacing": "24–36 in", "icon": "🎃"},
+    "Watermelon":       {"plants_per_sqft": 1,  "color": "#EC407A", "spacing": "18–24 in", "icon": "🍉"},
+    "Cantaloupe":       {"plants_per_sqft": 1,  "color": "#FFAB76", "spacing": "18–24 in", "icon": "🍈"},
+    "Eggplant":         {"plants_per_sqft": 1,  "color": "#7B2D8B", "spacing": "18 in",    "icon": "🍆"},
+    "Sweet Potatoes":   {"plants_per_sqft": 4,  "color": "#B7770D", "spacing": "6 in",     "icon": "🍠"},
+    "Garlic":           {"plants_per_sqft": 16, "color": "#F0E6D3", "spacing": "3 in",     "icon": "🧄"},
+    "Leeks":            {"plants_per_sqft": 9,  "color": "#82E0AA", "spacing": "4 in",     "icon": "🌾"},
+    "Beets":            {"plants_per_sqft": 9,  "color": "#8E44AD", "spacing": "4 in",     "icon": "🔴"},
+    "Swiss Chard":      {"plants_per_sqft": 4,  "color": "#D98880", "spacing": "6 in",     "icon": "🍀"},
+    "Arugula":          {"plants_per_sqft": 4,  "color": "#A9CCE3", "spacing": "6 in",     "icon": "🥗"},
+    "Cilantro":         {"plants_per_sqft": 9,  "color": "#58D68D", "spacing": "4 in",     "icon": "🌿"},
+    "Parsley":          {"plants_per_sqft": 4,  "color": "#17A589", "spacing": "6 in",     "icon": "🪴"},
+    "Dill":             {"plants_per_sqft": 4,  "color": "#ABEBC6", "spacing": "6 in",     "icon": "🌼"},
+    "Sunflowers":       {"plants_per_sqft": 1,  "color": "#F4D03F", "spacing": "12 in",    "icon": "🌻"},
+    "Strawberries":     {"plants_per_sqft": 4,  "color": "#CB4335", "spacing": "6 in",     "icon": "🍓"},
+}
+
+# Companion planting: unordered pairs of crops that help each other, or
+# hold each other back, when grown in neighbouring squares.
+GOOD_NEIGHBOURS = (
+    ("Tomatoes", "Basil"), ("Tomatoes", "Carrots"), ("Tomatoes", "Onions"),
+    ("Tomatoes", "Parsley"), ("Tomatoes", "Garlic"), ("Tomatoes", "Lettuce"),
+    ("Peppers", "Basil"), ("Peppers", "Onions"), ("Peppers", "Carrots"),
+    ("Lettuce", "Carrots"), ("Lettuce", "Radishes"), ("Lettuce", "Strawberries"),
+    ("Lettuce", "Onions"), ("Spinach", "Strawberries"), ("Spinach", "Peas"),
+    ("Carrots", "Onions"), ("Carrots", "Leeks"), ("Carrots", "Peas"),
+    ("Carrots", "Radishes"), ("Beans", "Carrots"), ("Beans", "Sweet Corn"),
+    ("Beans", "Cucumbers"), ("Beans", "Eggplant"), ("Beans", "Strawberries"),
+    ("Cucumbers", "Dill"), ("Cucumbers", "Sunflowers"), ("Cucumbers", "Radishes"),
+    ("Sweet Corn", "Pumpkin"), ("Sweet Corn", "Peas"), ("Sweet Corn", "Cucumbers"),
+    ("Sweet Corn", "Zucchini"), ("Sweet Corn", "Watermelon"), ("Sweet Corn", "Cantaloupe"),
+    ("Kale", "Beets"), ("Cabbage", "Dill"), ("Broccoli", "Dill"), ("Cabbage", "Onions"),
+    ("Broccoli", "Onions"), ("Onions", "Beets"), ("Garlic", "Strawberries"),
+    ("Garlic", "Beets"), ("Zucchini", "Dill"), ("Swiss Chard", "Onions"),
+    ("Arugula", "Beets"), ("Cilantro", "Spinach"),
+)
+BAD_NEIGHBOURS = (
+    ("Tomatoes", "Cabbage"), ("Tomatoes", "Broccoli"), ("Tomatoes", "Cauliflower"),
+    ("Tomatoes", "Brussels Sprouts"), ("Tomatoes", "Kale"), ("Tomatoes", "Sweet Corn"),
+    ("Tomatoes", "Dill"), ("Tomatoes", "Eggplant"), ("Beans", "Onions"),
+    ("Beans", "Garlic"), ("Beans", "Leeks"), ("Beans", "Sunflowers"),
+    ("Peas", "Onions"), ("Peas", "Garlic"), ("Peas", "Leeks"), ("Carrots", "Dill"),
+    ("Cabbage", "Strawberries"), ("Broccoli", "Strawberries"), ("Kale", "Strawberries"),
+    ("Cucumbers", "Basil"), ("Pumpkin", "Sweet Potatoes"), ("Zucchini", "Pumpkin"),
+    ("Swiss Chard", "Sweet Corn"), ("Beets", "Beans"),
+)
+
+SURFACE_DATA = {
+    "garden":  {"color": None,      "icon": ""},     # uses EMPTY_COLOR when no crop
+    "grass":   {"color": "#7EC850", "icon": "🌱"},
+    "pathway": {"color": "#A0856B", "icon": "🧱"},
+    "gravel":  {"color": "#B0B0B0", "icon": "⬡"},
+    "mulch":   {"color": "#5C3A1E", "icon": "🪵"},
+    "water":   {"color": "#5DADE2", "icon": "💧"},
+    "unused":  {"color": "#E8E8E8", "icon": ""},
+}
+
+SURFACE_ORDER = ["garden", "grass", "pathway", "gravel", "mulch", "water", "unused"]
+
+MAX_GRID_DIM = 1000  # largest rows/cols a bed may have
+
+IRRIGATION_ICONS = {"drip": "💧", "spray": "🌧️"}
+SOIL_ICONS = {
+    "composted":        "♻️",
+    "fertilized":       "⚡",
+    "needs_compost":    "🟤",
+    "needs_fertilizer": "⚠️",
+}
+
+
+# ─── Grid Model ───────────────────────────────────────────────────────────────
+
+# Interned ID tables.  Each per-cell attribute is stored as a small integer
+# code; code 0 is always the default (no crop, garden surface, no tag).
+CROP_NAMES        = (None,) + tuple(CROP_DATA)     # crop id -> crop name
+CROP_IDS          = {name: i for i, name in enumerate(CROP_NAMES)}
+SURFACE_IDS       = {name: i for i, name in enumerate(SURFACE_ORDER)}
+IRRIGATION_VALUES = (None,) + tuple(IRRIGATION_ICONS)
+IRRIGATION_IDS    = {v: i for i, v in enumerate(IRRIGATION_VALUES)}
+SOIL_VALUES       = (None,) + tuple(SOIL_ICONS)
+SOIL_IDS          = {v: i for i, v in enumerate(SOIL_VALUES)}
+
+# Per-plane lookups: code -> value and value -> code
+PLANE_VALUES = {
+    "crop": CROP_NAMES, "surface": SURFACE_ORDER,
+    "irrigation": IRRIGATION_VALUES, "soil": SOIL_VALUES,
+}
+PLANE_IDS = {
+    "crop": CROP_IDS, "surface": SURFACE_IDS,
+    "irrigation": IRRIGATION_IDS, "soil": SOIL_IDS,
+}
+
+_NONZERO = re.compile(b"[^\x00]")
+
+
+class GridModel:
+    """Compact storage for everything attached to the cells of one bed.
+
+    Crop, surface, irrigation and soil are kept as row-major byte planes
+    (``array("B")``, one byte per cell) holding IDs from the tables above;
+    notes live in a sparse ``{flat index: text}`` dict.  A 500×500 bed
+    needs about 1 MB, and whole-plane scans (counts, clears, finding the
+    planted cells) run inside C loops instead of Python dict iteration.
+
+    Objects in ``observers`` are told about every change: per-cell setters
+    call ``cell_changed(plane, index, old, new)`` with the old and new codes
+    (or note texts, for plane "notes"), and bulk operations call
+    ``model_reset()`` once when they are done.
+    """
+
+    PLANES = ("crop", "surface", "irrigation", "soil")
+
+    def __init__(self, rows=4, cols=8):
+        self.rows = rows
+        self.cols = cols
+        n = rows * cols
+        self.crop       = array("B", bytes(n))
+        self.surface    = array("B", bytes(n))
+        self.irrigation = array("B", bytes(n))
+        self.soil       = array("B", bytes(n))
+        self.notes      = {}    # flat index -> str
+        self.observers  = []
+
+    def copy(self):
+        """Return an independent copy of the data (observers are not copied)."""
+        other = GridModel.__new__(GridModel)
+        other.rows, other.cols = self.rows, self.cols
+        for name in self.PLANES:
+            setattr(other, name, array("B", getattr(self, name)))
+        other.notes = dict(self.notes)
+        other.observers = []
+        return other
+
+    def matches(self, other):
+        """True if *other* holds exactly the same bed data."""
+        return (
+            (self.rows, self.cols) == (other.rows, other.cols)
+            and all(getattr(self, name) == getattr(other, name) for name in self.PLANES)
+            and self.notes == other.notes
+        )
+
+    def _write(self, plane, i, new):
+        codes = getattr(self, plane)
+        old = codes[i]
+        if old != new:
+            codes[i] = new
+            for obs in self.observers:
+                obs.cell_changed(plane, i, old, new)
+
+    def _write_note(self, i, text):
+        old = self.notes.get(i)
+        if old == text:
+            return
+        if text:
+            self.notes[i] = text
+        else:
+            del self.notes[i]
+        for obs in self.observers:
+            obs.cell_changed("notes", i, old, text)
+
+    def _reset(self):
+        for obs in self.observers:
+            obs.model_reset()
+
+    # ── Indexing ─────────────────────────────────────────────────────────────
+
+    def in_bounds(self, r, c):
+        return 0 <= r < self.rows and 0 <= c < self.cols
+
+    def index(self, r, c):
+        return r * self.cols + c
+
+    def cell(self, i):
+        return divmod(i, self.cols)
+
+    # ── Per-cell access ──────────────────────────────────────────────────────
+
+    def crop_at(self, r, c):
+        return CROP_NAMES[self.crop[r * self.cols + c]]
+
+    def surface_at(self, r, c):
+        return SURFACE_ORDER[self.surface[r * self.cols + c]]
+
+    def irrigation_at(self, r, c):
+        return IRRIGATION_VALUES[self.irrigation[r * self.cols + c]]
+
+    def soil_at(self, r, c):
+        return SOIL_VALUES[self.soil[r * self.cols + c]]
+
+    def note_at(self, r, c):
+        return self.notes.get(r * self.cols + c)
+
+    def is_garden(self, r, c):
+        """True if (r, c) is inside the grid and has surface type 'garden'."""
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            return False
+        return self.surface[r * self.cols + c] == 0
+
+    def set_crop(self, r, c, crop):
+        self._write("crop", r * self.cols + c, CROP_IDS[crop])
+
+    def set_surface(self, r, c, surface):
+        """Change a cell's surface; non-garden cells lose crop, note and tags."""
+        i = r * self.cols + c
+        self._write("surface", i, SURFACE_IDS[surface])
+        if surface != "garden":
+            self._write("crop", i, 0)
+            self._write("irrigation", i, 0)
+            self._write("soil", i, 0)
+            self._write_note(i, None)
+
+    def set_irrigation(self, r, c, value):
+        self._write("irrigation", r * self.cols + c, IRRIGATION_IDS[value])
+
+    def set_soil(self, r, c, value):
+        self._write("soil", r * self.cols + c, SOIL_IDS[value])
+
+    def set_note(self, r, c, text):
+        self._write_note(r * self.cols + c, text or None)
+
+    # ── Bulk operations ──────────────────────────────────────────────────────
+
+    def clear_crops(self):
+        self.crop = array("B", bytes(len(self.crop)))
+        self._reset()
+
+    def clear_tags(self):
+        """Remove every note, irrigation tag and soil tag."""
+        n = len(self.crop)
+        self.irrigation = array("B", bytes(n))
+        self.soil       = array("B", bytes(n))
+        self.notes      = {}
+        self._reset()
+
+    def resize(self, rows, cols):
+        """Change the grid size, keeping the overlapping top-left region."""
+        self.reframe(0, 0, rows, cols)
+
+    def fill(self, plane, runs, value):
+        """Set *plane* to *value* on every cell of *runs*, a list of
+        flat-index ranges such as flood_region() and rect_runs() return.
+
+        Crops only go on garden squares, and squares given a non-garden
+        surface lose crop, note and tags, as with the per-cell setters.
+        Up to History.BULK_APPLY cells are written one by one, so
+        observers see each change; bigger fills write the planes a run at
+        a time and send one model_reset().  Returns the cells written.
+        """
+        code = PLANE_IDS[plane][value]
+        cells = sum(len(run) for run in runs)
+        if cells <= History.BULK_APPLY:
+            surface = self.surface
+            for run in runs:
+                for i in run:
+                    if plane == "crop":
+                        if not surface[i]:
+                            self._write("crop", i, code)
+                    elif plane == "surface":
+                        self.set_surface(*divmod(i, self.cols), value)
+                    else:
+                        self._write(plane, i, code)
+            return cells
+        codes = getattr(self, plane)
+        for run in runs:
+            a, b = run.start, run.stop
+            fill = bytes((code,)) * (b - a)
+            if plane == "crop":
+                fill = _and(fill, self.surface[a:b].tobytes().translate(_GARDEN_KEEP))
+            codes[a:b] = array("B", fill)
+            if plane == "surface" and code:
+                blank = array("B", bytes(b - a))
+                self.crop[a:b] = self.irrigation[a:b] = self.soil[a:b] = blank
+        if plane == "surface" and code and self.notes:
+            starts = sorted(run.start for run in runs)
+            stops = {run.start: run.stop for run in runs}
+            for i in list(self.notes):
+                k = bisect_right(starts, i)
+                if k and i < stops[starts[k - 1]]:
+                    del self.notes[i]
+        self._reset()
+        return cells
+
+    def assign_surfaces(self, surface):
+        """Replace the whole surface plane (an ``array("B")`` of surface IDs).
+
+        Crops, notes and tags on cells that are no longer garden are dropped.
+        """
+        self.surface = array("B", surface)
+        for i in self.nonzero("surface"):
+            self.crop[i] = self.irrigation[i] = self.soil[i] = 0
+            self.notes.pop(i, None)
+        self._reset()
+
+    def restore(self, rows, cols, planes, notes):
+        """Replace everything: *planes* maps each plane name to its codes."""
+        self.rows, self.cols = rows, cols
+        for name in self.PLANES:
+            setattr(self, name, array("B", planes[name]))
+        self.notes = dict(notes)
+        self._reset()
+
+    def nonzero(self, plane):
+        """Yield the flat index of every cell whose *plane* code is non-zero."""
+        data = getattr(self, plane).tobytes()
+        return (m.start() for m in _NONZERO.finditer(data))
+
+    def items(self, plane):
+        """Yield ((row, col), value) for every non-default cell of *plane*."""
+        names = PLANE_VALUES[plane]
+        codes = getattr(self, plane)
+        cols = self.cols
+        for i in self.nonzero(plane):
+            yield divmod(i, cols), names[codes[i]]
+
+    def garden_count(self):
+        return self.surface.count(0)
+
+    def planted_count(self):
+        return len(self.crop) - self.crop.count(0)
+
+    def crop_counts(self):
+        """Return {crop name: planted squares} for every crop in the bed."""
+        data = self.crop.tobytes()
+        counts = {}
+        for cid in set(data) - {0}:
+            counts[CROP_NAMES[cid]] = data.count(cid)
+        return counts
+
+    def value_counts(self, plane):
+        """Return {value: cells} for the non-default values of *plane*."""
+        data = getattr(self, plane).tobytes()
+        names = PLANE_VALUES[plane]
+        return {names[code]: data.count(code) for code in sorted(set(data) - {0})}
+
+    # ── Transforms ───────────────────────────────────────────────────────────
+    #
+    # Each transform rebuilds all four planes from byte slices (a whole row,
+    # or a strided column, per slice) and re-keys the sparse notes, then
+    # sends one model_reset().  Cells keep their crop, surface, tags and
+    # note together wherever they land.
+
+    def _transform(self, rows, cols, move, where):
+        """Make the grid rows×cols: each plane becomes ``move(old bytes)``
+        and the note at (r, c) moves to ``where(r, c)``, or is dropped if
+        that is None."""
+        for name in self.PLANES:
+            setattr(self, name, array("B", move(getattr(self, name).tobytes())))
+        notes = {}
+        old_cols = self.cols
+        for i, text in self.notes.items():
+            cell = where(*divmod(i, old_cols))
+            if cell is not None:
+                notes[cell[0] * cols + cell[1]] = text
+        self.notes = notes
+        self.rows, self.cols = rows, cols
+        self._reset()
+
+    def reframe(self, top, left, rows, cols):
+        """Make the grid the rows×cols window whose top-left corner is at
+        (top, left) of the current one.
+
+        Negative offsets, or a window reaching past the far edges, add
+        squares there (new squares are empty garden); a smaller window
+        trims.  This covers extending or trimming any edge, cropping to a
+        region and shifting the layout within the same size.
+        """
+        old_rows, old_cols = self.rows, self.cols
+        c0, c1 = max(0, -left), min(cols, old_cols - left)
+        r0, r1 = max(0, -top), min(rows, old_rows - top)
+
+        def move(data):
+            out = bytearray(rows * cols)
+            if c0 < c1:
+                for r in range(r0, r1):
+                    src = (r + top) * old_cols + left
+                    out[r * cols + c0:r * cols + c1] = data[src + c0:src + c1]
+            return out
+
+        def where(r, c):
+            r, c = r - top, c - left
+            return (r, c) if 0 <= r < rows and 0 <= c < cols else None
+
+        self._transform(rows, cols, move, where)
+
+    def rotate(self, turns=1):
+        """Rotate the layout by *turns* quarter turns clockwise (negative:
+        counter-clockwise); a quarter turn swaps rows and columns."""
+        rows, cols = self.rows, self.cols
+        turns %= 4
+        if turns == 1:
+            # New row c is old column c, read bottom to top
+            self._transform(
+                cols, rows,
+                lambda data: b"".join(data[c::cols][::-1] for c in range(cols)),
+                lambda r, c: (c, rows - 1 - r),
+            )
+        elif turns == 2:
+            self._transform(
+                rows, cols,
+                lambda data: data[::-1],
+                lambda r, c: (rows - 1 - r, cols - 1 - c),
+            )
+        elif turns == 3:
+            # New row k is old column cols-1-k, read top to bottom
+            self._transform(
+                cols, rows,
+                lambda data: b"".join(data[c::cols] for c in reversed(range(cols))),
+                lambda r, c: (cols - 1 - c, r),
+            )
+
+    def mirror(self, left_right=True):
+        """Mirror the layout left to right, or top to bottom."""
+        rows, cols = self.rows, self.cols
+        starts = range(0, rows * cols, cols)
+        if left_right:
+            self._transform(
+                rows, cols,
+                lambda data: b"".join(data[i:i + cols][::-1] for i in starts),
+                lambda r, c: (r, cols - 1 - c),
+            )
+        else:
+            self._transform(
+                rows, cols,
+                lambda data: b"".join(data[i:i + cols] for i in reversed(starts)),
+                lambda r, c: (rows - 1 - r, c),
+            )
+
+
+class CropTally:
+    """Running bed statistics for a GridModel, maintained from cell deltas.
+
+    Attach with ``model.observers.append(tally)``.  Each planted, cleared
+    or re-surfaced cell adjusts the counters in O(1); bulk changes fall
+    back to a recount.  Crops whose totals changed since the last call to
+    take_dirty() are collected so a view can update just their rows.
+    """
+
+    def __init__(self, model):
+        self.model   = model
+        self.squares = {}       # crop name -> planted squares
+        self.planted = 0
+        self.plants  = 0
+        self.garden  = 0
+        self._dirty  = set()
+        self.model_reset()
+
+    def model_reset(self):
+        self._dirty.update(self.squares)
+        self.squares = self.model.crop_counts()
+        self._dirty.update(self.squares)
+        self.planted = sum(self.squares.values())
+        self.plants  = sum(
+            n * CROP_DATA[crop]["plants_per_sqft"] for crop, n in self.squares.items()
+        )
+        self.garden  = self.model.garden_count()
+
+    def cell_changed(self, plane, i, old, new):
+        if plane == "crop":
+            if old:
+                self._add(CROP_NAMES[old], -1)
+            if new:
+                self._add(CROP_NAMES[new], 1)
+        elif plane == "surface":
+            self.garden += (new == 0) - (old == 0)
+
+    def _add(self, crop, delta):
+        n = self.squares.get(crop, 0) + delta
+        if n:
+            self.squares[crop] = n
+        else:
+            del self.squares[crop]
+        self.planted += delta
+        self.plants  += delta * CROP_DATA[crop]["plants_per_sqft"]
+        self._dirty.add(crop)
+
+    def take_dirty(self):
+        """Return the crops whose totals changed since the last call."""
+        dirty, self._dirty = self._dirty, set()
+        return dirty
+
+
+_GARDEN_MASK = bytes([1] + [0] * 255)   # surface ID -> 1 if garden, else 0
+_GARDEN_KEEP = bytes([255] + [0] * 255)  # surface ID -> 0xFF if garden, else 0
+_RUNS = re.compile(rb"\x01+")
+
+
+def _xor(a, b):
+    """Byte-wise XOR of two equal-length byte strings."""
+    n = len(a)
+    return (int.from_bytes(a, "little") ^ int.from_bytes(b, "little")).to_bytes(n, "little")
+
+
+def _and(a, b):
+    """Byte-wise AND of two equal-length byte strings."""
+    n = len(a)
+    return (int.from_bytes(a, "little") & int.from_bytes(b, "little")).to_bytes(n, "little")
+
+
+def _runs(line):
+    """Return the (start, end) spans of consecutive 1 bytes in *line*."""
+    return [m.span() for m in _RUNS.finditer(line)]
+
+
+class BedOutline:
+    """The raised-bed border of a GridModel as merged straight runs.
+
+    ``h[r]`` lists the (c0, c1) column spans of border along the top of
+    row r (``h[rows]`` is the bottom edge of the last row); ``v[c]`` lists
+    the (r0, r1) row spans along the left of column c.  A border lies
+    wherever exactly one side of a grid line is garden.
+
+    The whole outline is computed with byte-string operations over the
+    surface plane.  Attach with ``model.observers.append(outline)``: a
+    surface edit recomputes just the four grid lines around that cell, and
+    a bulk change recomputes everything only if the garden mask changed.
+    Lines that changed since the last take_dirty() are collected for the
+    view.
+    """
+
+    def __init__(self, model):
+        self.model  = model
+        self._mask  = None
+        self._shape = None
+        self._dirty = set()
+        self.model_reset()
+
+    def model_reset(self):
+        m = self.model
+        mask = bytearray(m.surface.tobytes().translate(_GARDEN_MASK))
+        if mask == self._mask and (m.rows, m.cols) == self._shape:
+            return
+        self._mask  = mask
+        self._shape = rows, cols = m.rows, m.cols
+
+        # Horizontal line r separates rows r - 1 and r (zero rows outside).
+        zero = bytes(cols)
+        padded = zero + mask + zero
+        hx = _xor(padded[:-cols], padded[cols:])
+        self.h = [_runs(hx[r * cols:(r + 1) * cols]) for r in range(rows + 1)]
+
+        # Pad each row with a zero on both sides; XOR-ing neighbours then
+        # leaves vertical line c of row r at index r * (cols + 2) + c.
+        w = cols + 2
+        padded = b"".join(
+            b"\0" + mask[r * cols:(r + 1) * cols] + b"\0" for r in range(rows)
+        )
+        vx = _xor(padded[:-1], padded[1:])
+        self.v = [_runs(vx[c::w]) for c in range(cols + 1)]
+
+        self._dirty.update(("h", r) for r in range(rows + 1))
+        self._dirty.update(("v", c) for c in range(cols + 1))
+
+    def cell_changed(self, plane, i, old, new):
+        if plane != "surface" or (old == 0) == (new == 0):
+            return
+        self._mask[i] ^= 1
+        r, c = divmod(i, self._shape[1])
+        for k in (r, r + 1):
+            self.h[k] = _runs(self._line("h", k))
+            self._dirty.add(("h", k))
+        for k in (c, c + 1):
+            self.v[k] = _runs(self._line("v", k))
+            self._dirty.add(("v", k))
+
+    def _line(self, kind, k):
+        """Return the 0/1 border bytes along one grid line."""
+        rows, cols = self._shape
+        mask = self._mask
+        if kind == "h":
+            a = mask[(k - 1) * cols:k * cols] if k > 0 else bytes(cols)
+            b = mask[k * cols:(k + 1) * cols] if k < rows else bytes(cols)
+        else:
+            a = mask[k - 1::cols] if k > 0 else bytes(rows)
+            b = mask[k::cols] if k < cols else bytes(rows)
+        return _xor(bytes(a), bytes(b))
+
+    def take_dirty(self):
+        """Return the ("h" | "v", k) lines that changed since the last call."""
+        dirty, self._dirty = self._dirty, set()
+        return dirty
+
+
+def _pair_table(good, bad):
+    """Return a flat crop-ID × crop-ID table of neighbour scores (+1 / 0 / -1)."""
+    n = len(CROP_NAMES)
+    table = array("b", bytes(n * n))
+    for pairs, score in ((good, 1), (bad, -1)):
+        for a, b in pairs:
+            ia, ib = CROP_IDS[a], CROP_IDS[b]
+            table[ia * n + ib] = table[ib * n + ia] = score
+    return table
+
+
+class CompanionScore:
+    """Live companion-planting score of a GridModel.
+
+    Every pair of neighbouring squares scores +1 when GOOD_NEIGHBOURS
+    lists their crops and -1 when BAD_NEIGHBOURS does.  ``good`` and
+    ``bad`` count such pairs and ``score`` is their difference;
+    ``conflicts`` maps the flat index of each square in a bad pair to the
+    number of bad neighbours it has.  Neighbours are the 4 squares that
+    share a side, or all 8 with *diagonal*.
+
+    Attach with ``model.observers.append(score)``.  A crop edit looks up
+    just that square's neighbours in a precomputed pair table; bulk
+    changes rescan the planted squares.  Squares that gained or lost all
+    their conflicts since the last take_dirty() are collected for the view.
+    """
+
+    def __init__(self, model, diagonal=False, good=GOOD_NEIGHBOURS, bad=BAD_NEIGHBOURS):
+        self.model    = model
+        self.diagonal = diagonal
+        self.pairs    = _pair_table(good, bad)
+        self._dirty   = set()
+        self.conflicts = {}
+        self.model_reset()
+
+    @property
+    def score(self):
+        return self.good - self.bad
+
+    def _neighbours(self, i):
+        rows, cols = self.model.rows, self.model.cols
+        r, c = divmod(i, cols)
+        steps = ((-1, 0), (1, 0), (0, -1), (0, 1))
+        if self.diagonal:
+            steps += ((-1, -1), (-1, 1), (1, -1), (1, 1))
+        for dr, dc in steps:
+            rr, cc = r + dr, c + dc
+            if 0 <= rr < rows and 0 <= cc < cols:
+                yield rr * cols + cc
+
+    def model_reset(self):
+        cols, pairs, n = self.model.cols, self.pairs, len(CROP_NAMES)
+        data = self.model.crop.tobytes()
+        self._dirty.update(self.conflicts)
+        self.good = self.bad = 0
+        conflicts = self.conflicts = {}
+        # Each pair once, from its first square in row-major order: (flat
+        # step to the neighbour, column whose step wraps onto another row)
+        steps = [(1, cols - 1), (cols, None)]
+        if self.diagonal:
+            steps += [(cols + 1, cols - 1), (cols - 1, 0)]
+        for step, wrap in steps:
+            if not 0 < step < len(data):
+                continue
+            for i, a, b in zip(range(len(data)), data, data[step:]):
+                if not (a and b):
+                    continue
+                s = pairs[a * n + b]
+                if not s or (wrap is not None and i % cols == wrap):
+                    continue
+                if s > 0:
+                    self.good += 1
+                else:
+                    self.bad += 1
+                    conflicts[i] = conflicts.get(i, 0) + 1
+                    conflicts[i + step] = conflicts.get(i + step, 0) + 1
+        self._dirty.update(conflicts)
+
+    def cell_changed(self, plane, i, old, new):
+        if plane != "crop":
+            return
+        crop, pairs, n = self.model.crop, self.pairs, len(CROP_NAMES)
+        for j in self._neighbours(i):
+            other = crop[j]
+            if not other:
+                continue
+            before = pairs[old * n + other]
+            after  = pairs[new * n + other]
+            if before == after:
+                continue
+            self.good += (after > 0) - (before > 0)
+            self.bad  += (after < 0) - (before < 0)
+            delta = (after < 0) - (before < 0)
+            if delta:
+                self._bump(i, delta)
+                self._bump(j, delta)
+
+    def _bump(self, i, delta):
+        n = self.conflicts.get(i, 0) + delta
+        if n:
+            self.conflicts[i] = n
+        else:
+            del self.conflicts[i]
+        if n == 0 or n == delta:     # the square's highlight turns off or on
+            self._dirty.add(i)
+
+    def conflicting(self, i):
+        """Return the crops next to square *i* that its crop clashes with."""
+        crop, pairs, n = self.model.crop, self.pairs, len(CROP_NAMES)
+        row = crop[i] * n
+        return sorted({CROP_NAMES[crop[j]] for j in self._neighbours(i) if pairs[row + crop[j]] < 0})
+
+    def take_dirty(self):
+        """Return the (row, col) squares whose highlight changed since the last call."""
+        cols = self.model.cols
+        dirty, self._dirty = self._dirty, set()
+        return {divmod(i, cols) for i in dirty}
+
+
+class RegionStats:
+    """Counts of any crop, surface or tag over any rectangle of a bed.
+
+    Each (plane, code) gets a summed-area table the first time it is
+    asked about.  To keep big beds cheap, the table has one row per band
+    of BAND grid rows: entry ``k * (cols + 1) + c`` counts the cells in
+    rows above k * BAND and columns left of c that hold the code.  A
+    rectangle is four lookups for the whole bands it spans, plus a
+    bytes.count() for each of the fewer than 2 * BAND rows left over, so
+    a query costs the same whatever the bed size.  Bed-wide counts per
+    code are kept live, and codes absent from the bed never get a table.
+
+    Attach with ``model.observers.append(regions)``.  A cell edit is
+    logged against the two tables it touches, and queries add the logged
+    edits that fall in the banded part of the rectangle; a table with
+    PENDING_MAX of them is dropped and rebuilt by the next query.  Bulk
+    changes drop every table.  Rectangles are half-open row and column
+    ranges, as in SqftFile.read().
+    """
+
+    BAND        = 8
+    PENDING_MAX = 256
+
+    def __init__(self, model):
+        self.model = model
+        self.model_reset()
+
+    def model_reset(self):
+        self._tables  = {}      # (plane, code) -> array("I") banded summed-area table
+        self._pending = {}      # (plane, code) -> [(flat index, ±1)] since built
+        self.totals   = {}      # plane -> bed-wide cells per code
+        for plane in GridModel.PLANES:
+            data = getattr(self.model, plane).tobytes()
+            self.totals[plane] = [data.count(code) for code in range(len(PLANE_VALUES[plane]))]
+
+    def cell_changed(self, plane, i, old, new):
+        if plane == "notes":
+            return
+        totals = self.totals[plane]
+        totals[old] -= 1
+        totals[new] += 1
+        for key, delta in (((plane, old), -1), ((plane, new), 1)):
+            pending = self._pending.get(key)
+            if pending is None:
+                continue
+            if len(pending) < self.PENDING_MAX:
+                pending.append((i, delta))
+            else:
+                del self._tables[key], self._pending[key]
+
+    def _table(self, plane, code):
+        key = (plane, code)
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+        model = self.model
+        w = model.cols + 1
+        hits = getattr(model, plane).tobytes().translate(
+            bytes(1 if k == code else 0 for k in range(256))
+        )
+        # Widen each 0/1 hit to a 32-bit lane, so a whole grid row is one
+        # int and adding rows up is a single big-int addition
+        lanes = bytearray(4 * len(hits))
+        lanes[::4] = hits
+        row_bytes = 4 * model.cols
+        band_bytes = row_bytes * self.BAND
+        keep = (1 << (32 * w)) - 1
+        parts = [bytes(4 * w)]
+        sums = 0        # per-column counts over the rows done so far
+        for start in range(0, len(lanes) - band_bytes + 1, band_bytes):
+            for row in range(start, start + band_bytes, row_bytes):
+                sums += int.from_bytes(lanes[row:row + row_bytes], "little")
+            # Running sums across the lanes, by doubling, give the table row
+            x = sums << 32
+            shift = 32
+            while shift < 32 * w:
+                x += x << shift
+                shift <<= 1
+            parts.append((x & keep).to_bytes(4 * w, "little"))
+        table = array("I")
+        table.frombytes(b"".join(parts))
+        if sys.byteorder == "big":
+            table.byteswap()
+        self._tables[key] = table
+        self._pending[key] = []
+        return table
+
+    def _bounds(self, r0, r1, c0, c1):
+        rows, cols = self.model.rows, self.model.cols
+        r1 = rows if r1 is None else r1
+        c1 = cols if c1 is None else c1
+        if not (0 <= r0 <= r1 <= rows and 0 <= c0 <= c1 <= cols):
+            raise ValueError("Region is outside the bed")
+        return r0, r1, c0, c1
+
+    def _count(self, plane, code, data, r0, r1, c0, c1):
+        """Cells holding *code* in the rectangle; *data* is the plane's
+        current bytes, for the rows outside whole bands."""
+        model = self.model
+        total = self.totals[plane][code]
+        if not total or (r1 - r0, c1 - c0) == (model.rows, model.cols):
+            return total
+        cols, band = model.cols, self.BAND
+        k0, k1 = -(-r0 // band), r1 // band
+        n = 0
+        if k0 < k1:
+            table = self._table(plane, code)
+            w = cols + 1
+            n = table[k1 * w + c1] - table[k0 * w + c1] - table[k1 * w + c0] + table[k0 * w + c0]
+            top, bottom = k0 * band, k1 * band
+            for i, delta in self._pending[plane, code]:
+                r, c = divmod(i, cols)
+                if top <= r < bottom and c0 <= c < c1:
+                    n += delta
+            rest = [*range(r0, top), *range(bottom, r1)]
+        else:
+            rest = range(r0, r1)
+        sub = bytes((code,))
+        for r in rest:
+            n += data.count(sub, r * cols + c0, r * cols + c1)
+        return n
+
+    def count(self, plane, value, r0=0, r1=None, c0=0, c1=None):
+        """Return how many cells of rows r0..r1, cols c0..c1 have *value*
+        (a crop name, surface name or tag) in *plane*."""
+        data = getattr(self.model, plane).tobytes()
+        return self._count(plane, PLANE_IDS[plane][value], data, *self._bounds(r0, r1, c0, c1))
+
+    def summary(self, r0=0, r1=None, c0=0, c1=None):
+        """Return stats for a rectangle in the shape of Garden.stats(),
+        plus {value: cells} dicts for "surfaces", "irrigation" and "soil"."""
+        box = self._bounds(r0, r1, c0, c1)
+        cells = (box[1] - box[0]) * (box[3] - box[2])
+        counts = {}
+        for plane in GridModel.PLANES:
+            names = PLANE_VALUES[plane]
+            data = getattr(self.model, plane).tobytes()
+            found = counts[plane] = {}
+            for code, total in enumerate(self.totals[plane]):
+                if code and total:
+                    n = self._count(plane, code, data, *box)
+                    if n:
+                        found[names[code]] = n
+        crops = {
+            crop: (n, n * CROP_DATA[crop]["plants_per_sqft"])
+            for crop, n in sorted(counts["crop"].items())
+        }
+        garden = cells - sum(counts["surface"].values())
+        planted = sum(n for n, _ in crops.values())
+        return {
+            "rows":       (box[0], box[1]),
+            "cols":       (box[2], box[3]),
+            "cells":      cells,
+            "garden":     garden,
+            "planted":    planted,
+            "percent":    int(100 * planted / garden) if garden else 0,
+            "plants":     sum(p for _, p in crops.values()),
+            "crops":      crops,
+            "surfaces":   counts["surface"],
+            "irrigation": counts["irrigation"],
+            "soil":       counts["soil"],
+        }
+
+
+# ─── Fill Tools ───────────────────────────────────────────────────────────────
+
+def flood_region(model, plane, r, c):
+    """Return the 4-connected region around (r, c) whose *plane* value is
+    the same as at (r, c), as a list of flat-index ranges (row runs).
+
+    A "crop" region only spreads over garden squares, so it is empty when
+    (r, c) is not one.  The fill is an iterative scanline fill: each run
+    is found with bytes searches and the runs touching it in the rows
+    above and below are queued, so there is no recursion and the work
+    grows with the number of runs rather than of cells.
+    """
+    cols = model.cols
+    data = getattr(model, plane).tobytes()
+    seed = r * cols + c
+    # 1 marks a cell still to be taken; taken and other cells are 0
+    same = data.translate(bytes(1 if k == data[seed] else 0 for k in range(256)))
+    if plane == "crop":
+        same = _and(same, model.surface.tobytes().translate(_GARDEN_KEEP))
+    same = bytearray(same)
+    end = len(same)
+    runs = []
+    stack = [seed] if same[seed] else []
+    while stack:
+        i = stack.pop()
+        if not same[i]:
+            continue
+        row = i - i % cols
+        lo = same.rfind(0, row, i) + 1 or row     # -1 + 1: the run starts the row
+        hi = same.find(0, i, row + cols)
+        if hi < 0:
+            hi = row + cols
+        same[lo:hi] = bytes(hi - lo)
+        runs.append(range(lo, hi))
+        for a in (lo - cols, lo + cols):
+            if 0 <= a < end:
+                stack.extend(m.start() for m in _RUNS.finditer(same, a, a + hi - lo))
+    return runs
+
+
+def rect_runs(model, r0, r1, c0, c1):
+    """Return rows r0..r1, cols c0..c1 (half-open) as flat-index ranges."""
+    cols = model.cols
+    return [range(r * cols + c0, r * cols + c1) for r in range(r0, r1)]
+
+
+# ─── Progress ─────────────────────────────────────────────────────────────────
+
+class Cancelled(Exception):
+    """Raised inside a long operation whose Task was cancelled."""
+
+
+class Task:
+    """Progress and cancellation for one long operation, such as loading a
+    big layout on a worker thread.
+
+    The operation calls step() as it goes; another thread reads ``done``,
+    ``total`` and fraction() to show progress, and calls cancel() to stop
+    it at the next step with Cancelled.
+    """
+
+    def __init__(self, label=""):
+        self.label = label
+        self.done  = 0
+        self.total = 0
+        self._cancel = threading.Event()
+
+    def step(self, done, total=None):
+        if total is not None:
+            self.total = total
+        self.done = done
+        if self._cancel.is_set():
+            raise Cancelled(self.label)
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def fraction(self):
+        """Share of the work done so far, 0.0–1.0 (0.0 until known)."""
+        return min(1.0, self.done / self.total) if self.total else 0.0
+
+
+# ─── JSON Layout Files ────────────────────────────────────────────────────────
+
+# Layout file sections and the plane each one fills
+JSON_SECTIONS = {
+    "grid": "crop", "cell_types": "surface", "notes": "notes",
+    "irrigation": "irrigation", "soil": "soil",
+}
+
+Diagnostic = namedtuple("Diagnostic", "section key message")
+Diagnostic.__doc__ = "One layout-file entry that was skipped, and why."
+
+_CELL_KEY = re.compile(r"\s*(-?\d+)\s*,\s*(-?\d+)\s*\Z")
+_WS = re.compile(r"[ \t\n\r]*")
+# A complete '"key": "value",' member with no escapes: the common case
+_SIMPLE_MEMBER = re.compile(
+    r'[ \t\n\r]*"([^"\\\x00-\x1f]*)"[ \t\n\r]*:[ \t\n\r]*"([^"\\\x00-\x1f]*)"[ \t\n\r]*([,}])'
+)
+
+
+class _LayoutBuilder:
+    """Validates layout-file entries and writes them straight into a model.
+
+    Feed it the bed size with size() and every section entry with entry(),
+    in any order; finish() returns the GridModel.  Entries with bad keys,
+    cells outside the bed or values outside the vocabulary are skipped and
+    recorded in ``diagnostics``.  Entries that arrive before the bed size
+    is known are held back until it is.
+    """
+
+    def __init__(self):
+        self.model = None
+        self.diagnostics = []
+        self._dims = {}
+        self._pending = []
+
+    def size(self, name, value):
+        try:
+            n = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{name}' must be a whole number, not {value!r}") from None
+        if not 1 <= n <= MAX_GRID_DIM:
+            raise ValueError(f"'{name}' must be between 1 and {MAX_GRID_DIM}, not {n}")
+        self._dims[name] = n
+        if self.model is None and len(self._dims) == 2:
+            self.model = GridModel(self._dims["rows"], self._dims["cols"])
+            pending, self._pending = self._pending, None
+            for args in pending:
+                self.entry(*args)
+
+    def entry(self, section, key, value):
+        model = self.model
+        if model is None:
+            self._pending.append((section, key, value))
+            return
+        m = _CELL_KEY.match(key)
+        if not m:
+            self._skip(section, key, "is not a 'row,col' cell key")
+            return
+        r, c = int(m.group(1)), int(m.group(2))
+        if not model.in_bounds(r, c):
+            self._skip(section, key, f"is outside the {model.rows}×{model.cols} bed")
+            return
+        i = r * model.cols + c
+        plane = JSON_SECTIONS[section]
+        if plane == "notes":
+            if not isinstance(value, str):
+                self._skip(section, key, "note is not text")
+            elif value:
+                model.notes[i] = value
+            return
+        code = PLANE_IDS[plane].get(value) if isinstance(value, str) else None
+        if not code and not (plane == "surface" and value == "garden"):
+            self._skip(section, key, f"unknown {plane} {value!r}")
+            return
+        getattr(model, plane)[i] = code
+
+    def _skip(self, section, key, message):
+        self.diagnostics.append(Diagnostic(section, key, message))
+
+    def finish(self):
+        model = self.model
+        if model is None:
+            missing = " and ".join(n for n in ("rows", "cols") if n not in self._dims)
+            raise ValueError(f"Layout has no {missing}")
+        # Crops only grow on garden squares, whichever section came first
+        keep = model.surface.tobytes().translate(_GARDEN_KEEP)
+        crops = model.crop.tobytes()
+        kept = _and(crops, keep)
+        if kept != crops:
+            for m in _NONZERO.finditer(_xor(crops, kept)):
+                r, c = model.cell(m.start())
+                self._skip("grid", f"{r},{c}", "crop on a non-garden square")
+            model.crop = array("B", kept)
+        return model
+
+
+class _JsonStream:
+    """Pulls JSON tokens off a text file a chunk at a time."""
+
+    def __init__(self, f, chunk_size, on_fill=None):
+        self._f = f
+        self._chunk = chunk_size
+        self._on_fill = on_fill     # called after each chunk is read
+        self._buf = ""
+        self._pos = 0
+        self._base = 0          # file offset of _buf[0], for error messages
+        self._eof = False
+        self._decode = json.JSONDecoder().raw_decode
+
+    def _fill(self):
+        if self._eof:
+            return False
+        data = self._f.read(self._chunk)
+        if self._on_fill is not None:
+            self._on_fill()
+        if not data:
+            self._eof = True
+            return False
+        self._base += self._pos
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def error(self, message):
+        return ValueError(f"{message} at character {self._base + self._pos}")
+
+    def peek(self):
+        """Skip whitespace and return the next character ("" at the end)."""
+        while True:
+            self._pos = _WS.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch):
+        if self.peek() != ch:
+            raise self.error(f"Expected '{ch}'")
+        self._pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                val, end = self._decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                # Probably cut off at the end of the buffer; read on and retry
+                if self._fill():
+                    continue
+                raise self.error(f"Invalid JSON ({e.msg})") from None
+            # A number touching the end of the buffer may continue past it
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return val
+
+    def members(self):
+        """Yield (key, position) for each member of the object that starts
+        here; the caller must consume each member's value before the next."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise self.error("Expected a string key")
+            key = self.value()
+            self.expect(":")
+            yield key
+            ch = self.peek()
+            self._pos += 1
+            if ch == "}":
+                return
+            if ch != ",":
+                self._pos -= 1
+                raise self.error("Expected ',' or '}'")
+
+    def entries(self):
+        """Yield (key, value) for each member of the object that starts here.
+
+        Plain string members are matched with one regex straight off the
+        buffer; anything else (escapes, other value types, a member cut by
+        the end of the buffer) goes through the general decoder.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        simple = _SIMPLE_MEMBER.match
+        while True:
+            m = simple(self._buf, self._pos)
+            if m:
+                self._pos = m.end()
+                yield m.group(1), m.group(2)
+                if m.group(3) == "}":
+                    return
+                continue
+            if self.peek() != '"':
+                raise self.error("Expected a string key")
+            key = self.value()
+            self.expect(":")
+            yield key, self.value()
+            ch = self.peek()
+            if ch == "}":
+                self._pos += 1
+                return
+            if ch != ",":
+                raise self.error("Expected ',' or '}'")
+            self._pos += 1
+
+
+def load_json(path, chunk_size=1 << 16, task=None):
+    """Read a JSON layout file without loading the whole document.
+
+    The file is tokenised a chunk at a time and every entry is validated
+    and written into the model as it is read, so memory use stays close
+    to the size of the finished model.  Returns ``(model, diagnostics)``,
+    where diagnostics lists the entries that were skipped.  Malformed JSON
+    or a missing or out-of-range bed size raises ValueError.  A *task* is
+    stepped with the bytes read after every chunk.
+    """
+    build = _LayoutBuilder()
+    with open(path, encoding="utf-8") as f:
+        on_fill = None
+        if task is not None:
+            size = os.fstat(f.fileno()).st_size
+
+            def on_fill():
+                task.step(f.buffer.tell(), size)
+        stream = _JsonStream(f, chunk_size, on_fill)
+        if stream.peek() != "{":
+            raise stream.error("Layout file is not a JSON object")
+        for name in stream.members():
+            if name in ("rows", "cols"):
+                build.size(name, stream.value())
+            elif name in JSON_SECTIONS and stream.peek() == "{":
+                for key, value in stream.entries():
+                    build.entry(name, key, value)
+            elif name in JSON_SECTIONS:
+                stream.value()
+                build._skip(name, "", "section is not an object")
+            else:
+                stream.value()
+                build._skip(name, "", "unknown section")
+        if stream.peek():
+            raise stream.error("Extra data after the layout")
+    return build.finish(), build.diagnostics
+
+
+def _json_sections(model):
+    """Yield (section, entries) for a layout file, where entries yields
+    the section's ("row,col", value) pairs in file order."""
+    for section, plane in JSON_SECTIONS.items():
+        if plane == "notes":
+            cols = model.cols
+            entries = (
+                (f"{i // cols},{i % cols}", note) for i, note in sorted(model.notes.items())
+            )
+        else:
+            entries = ((f"{r},{c}", val) for (r, c), val in model.items(plane))
+        yield section, entries
+
+
+def write_json(model, path, task=None):
+    """Write *model* to *path* as a JSON layout file.
+
+    The output is what ``json.dump(garden.to_dict(), f, indent=2)`` gives,
+    but it is written an entry at a time rather than built in memory, and
+    a *task* is stepped with the entries written so far.
+    """
+    total = len(model.notes) + sum(
+        len(codes) - codes.count(0) for codes in (getattr(model, p) for p in GridModel.PLANES)
+    )
+    encoded = {}            # value -> JSON text; crop and tag names repeat a lot
+    done = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'{{\n  "rows": {model.rows},\n  "cols": {model.cols}')
+        for section, entries in _json_sections(model):
+            f.write(f',\n  "{section}": {{')
+            sep = "\n    "
+            batch = []
+            # Cell keys are plain "row,col" strings that need no escaping
+            for key, value in entries:
+                text = encoded.get(value)
+                if text is None:
+                    text = encoded[value] = json.dumps(value)
+                batch.append(f'"{key}": {text}')
+                if len(batch) == 4096:
+                    f.write(sep + ",\n    ".join(batch))
+                    sep = ",\n    "
+                    done += len(batch)
+                    batch.clear()
+                    if task is not None:
+                        task.step(done, total)
+            if batch:
+                f.write(sep + ",\n    ".join(batch))
+                sep = ",\n    "
+                done += len(batch)
+            f.write("}" if sep == "\n    " else "\n  }")
+        f.write("\n}")
+    if task is not None:
+        task.step(done, total)
+
+
+# ─── Binary Layout Files ──────────────────────────────────────────────────────
+
+# A .sqft file is laid out as:
+#
+#   header   magic "SQFT", version, flags, rows, cols, offset of the planes
+#   tables   for crop, surface, irrigation and soil in turn: a count byte,
+#            then each value's name as a length byte plus UTF-8 ("" = none);
+#            a cell code in the file is an index into its plane's table
+#   planes   crop, surface, irrigation and soil, rows × cols bytes each,
+#            row-major
+#   notes    a uint32 count, then (flat index, byte length, UTF-8 text)
+#            records in index order
+#
+# All integers are little-endian.  Storing the names lets a file written
+# with one crop list be read by a planner that has another.
+
+SQFT_EXT     = ".sqft"
+SQFT_MAGIC   = b"SQFT"
+SQFT_VERSION = 1
+_SQFT_HEADER = struct.Struct("<4sHHIII")
+_NOTE_HEADER = struct.Struct("<II")
+
+
+def _sqft_parts(model):
+    """Yield the pieces of the .sqft encoding of *model*, in file order."""
+    tables = bytearray()
+    for plane in GridModel.PLANES:
+        values = PLANE_VALUES[plane]
+        tables.append(len(values))
+        for value in values:
+            name = (value or "").encode("utf-8")
+            tables.append(len(name))
+            tables += name
+    notes = bytearray(struct.pack("<I", len(model.notes)))
+    for i, text in sorted(model.notes.items()):
+        data = text.encode("utf-8")
+        notes += _NOTE_HEADER.pack(i, len(data))
+        notes += data
+
+    yield _SQFT_HEADER.pack(
+        SQFT_MAGIC, SQFT_VERSION, 0, model.rows, model.cols,
+        _SQFT_HEADER.size + len(tables),
+    )
+    yield tables
+    for plane in GridModel.PLANES:
+        yield getattr(model, plane).tobytes()
+    yield notes
+
+
+def write_sqft(model, path, task=None):
+    """Write *model* to *path* in the binary .sqft format (a *task* is
+    stepped once per section written)."""
+    parts = len(GridModel.PLANES) + 3
+    with open(path, "wb") as f:
+        for k, part in enumerate(_sqft_parts(model)):
+            if task is not None:
+                task.step(k, parts)
+            f.write(part)
+    if task is not None:
+        task.step(parts, parts)
+
+
+def sqft_bytes(model):
+    """Return the .sqft encoding of *model* as one byte string."""
+    return b"".join(_sqft_parts(model))
+
+
+class SqftFile:
+    """Read-only, memory-mapped view of a .sqft layout file.
+
+    Opening one reads just the header and name tables; plane bytes are
+    paged in by the OS as they are read, so model() with a row/column range
+    loads a visible region of a huge bed without touching the rest.  Codes
+    are translated to this planner's IDs on the way out, and names it does
+    not know read as the default (no crop, garden, no tag).
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._open()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Read a .sqft encoding held in memory instead of in a file."""
+        self = cls.__new__(cls)
+        self._mm = data
+        self._open()
+        return self
+
+    def _open(self):
+        self._notes = None
+        try:
+            self._parse_header()
+        except (struct.error, IndexError) as e:
+            self.close()
+            raise ValueError(f"Corrupt .sqft file: {e}") from None
+        except ValueError:
+            self.close()
+            raise
+
+    def _parse_header(self):
+        mm = self._mm
+        magic, version, _, rows, cols, planes = _SQFT_HEADER.unpack_from(mm)
+        if magic != SQFT_MAGIC:
+            raise ValueError("Not a .sqft layout file")
+        if version != SQFT_VERSION:
+            raise ValueError(f"Unsupported .sqft version {version}")
+        if not (1 <= rows <= MAX_GRID_DIM and 1 <= cols <= MAX_GRID_DIM):
+            raise ValueError(f"Bed size {rows}×{cols} is out of range")
+        self.rows, self.cols = rows, cols
+
+        pos = _SQFT_HEADER.size
+        self._tables = {}   # plane -> bytes.translate() table, file code -> ID
+        for plane in GridModel.PLANES:
+            ids = PLANE_IDS[plane]
+            table = bytearray(256)
+            count = mm[pos]
+            pos += 1
+            for code in range(count):
+                n = mm[pos]
+                name = mm[pos + 1:pos + 1 + n].decode("utf-8")
+                pos += 1 + n
+                table[code] = ids.get(name or None, 0)
+            self._tables[plane] = bytes(table)
+
+        if pos > planes:
+            raise ValueError("Corrupt .sqft file: name tables overrun the planes")
+        self._planes = planes
+        self._notes_at = planes + len(GridModel.PLANES) * rows * cols
+        if len(mm) < self._notes_at + 4:
+            raise ValueError("Corrupt .sqft file: truncated")
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def read(self, plane, r0=0, r1=None, c0=0, c1=None):
+        """Return the codes of *plane* over rows r0..r1, cols c0..c1 (half-open)."""
+        rows, cols = self.rows, self.cols
+        r1 = rows if r1 is None else r1
+        c1 = cols if c1 is None else c1
+        if not (0 <= r0 <= r1 <= rows and 0 <= c0 <= c1 <= cols):
+            raise ValueError("Region is outside the bed")
+        mm = self._mm
+        base = self._planes + GridModel.PLANES.index(plane) * rows * cols
+        if c0 == 0 and c1 == cols:
+            data = mm[base + r0 * cols:base + r1 * cols]
+        else:
+            data = b"".join(
+                mm[base + r * cols + c0:base + r * cols + c1] for r in range(r0, r1)
+            )
+        return data.translate(self._tables[plane])
+
+    def notes(self):
+        """Return {flat index: text} for the whole bed."""
+        if self._notes is None:
+            mm = self._mm
+            notes = {}
+            try:
+                (count,) = struct.unpack_from("<I", mm, self._notes_at)
+                pos = self._notes_at + 4
+                for _ in range(count):
+                    i, n = _NOTE_HEADER.unpack_from(mm, pos)
+                    pos += _NOTE_HEADER.size
+                    if n > len(mm) - pos:
+                        raise ValueError("Corrupt .sqft file: truncated note")
+                    notes[i] = mm[pos:pos + n].decode("utf-8")
+                    pos += n
+            except struct.error as e:
+                raise ValueError(f"Corrupt .sqft file: {e}") from None
+            self._notes = notes
+        return self._notes
+
+    def model(self, r0=0, r1=None, c0=0, c1=None, task=None):
+        """Return a GridModel of the given region (default: the whole bed).
+
+        A *task* is stepped once per plane read.
+        """
+        r1 = self.rows if r1 is None else r1
+        c1 = self.cols if c1 is None else c1
+        model = GridModel(r1 - r0, c1 - c0)
+        steps = len(GridModel.PLANES) + 1
+        for k, plane in enumerate(GridModel.PLANES):
+            if task is not None:
+                task.step(k, steps)
+            setattr(model, plane, array("B", self.read(plane, r0, r1, c0, c1)))
+        if task is not None:
+            task.step(len(GridModel.PLANES), steps)
+        # Crops only grow on garden squares
+        keep = model.surface.tobytes().translate(_GARDEN_KEEP)
+        model.crop = array("B", _and(model.crop.tobytes(), keep))
+        cols = self.cols
+        for i, text in self.notes().items():
+            r, c = divmod(i, cols)
+            if r0 <= r < r1 and c0 <= c < c1:
+                model.notes[model.index(r - r0, c - c0)] = text
+        if task is not None:
+            task.step(steps, steps)
+        return model
+
+
+def is_sqft(path):
+    """True if *path* starts with the .sqft magic bytes."""
+    with open(path, "rb") as f:
+        return f.read(len(SQFT_MAGIC)) == SQFT_MAGIC
+
+
+def save_layout(model, path, task=None):
+    """Write *model* to *path*: .sqft if the name ends in SQFT_EXT, JSON
+    otherwise.  The file is written beside *path* and renamed over it, so
+    a save that fails or is cancelled leaves the old file as it was."""
+    tmp = path + ".tmp"
+    try:
+        if path.lower().endswith(SQFT_EXT):
+            write_sqft(model, tmp, task)
+        else:
+            write_json(model, tmp, task)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+# ─── Garden ───────────────────────────────────────────────────────────────────
+
+class Garden:
+    """One garden bed: its GridModel, live CropTally and RegionStats, and its
+    file path.
+
+    This is the headless API used by the desktop app and by scripts::
+
+        garden = Garden.load("bed.json")
+        garden.plant(0, 0, "Tomatoes")
+        print(garden.stats())
+        garden.save()
+
+    Files are JSON, or the binary .sqft format when the name ends in
+    SQFT_EXT.  Loading and saving raise OSError, ValueError or KeyError on
+    bad files.  Entries naming cells outside the bed, or unknown crops,
+    surfaces or tags, are skipped and listed in ``diagnostics``.
+    """
+
+    def __init__(self, rows=4, cols=8, model=None):
+        self._attach(model if model is not None else GridModel(rows, cols))
+        self.path = None
+        self.diagnostics = []
+
+    def _attach(self, model):
+        self.model = model
+        self.tally = CropTally(model)
+        self.regions = RegionStats(model)
+        model.observers.append(self.tally)
+        model.observers.append(self.regions)
+
+    @property
+    def rows(self):
+        return self.model.rows
+
+    @property
+    def cols(self):
+        return self.model.cols
+
+    # ── Files ────────────────────────────────────────────────────────────────
+
+    @classmethod
+    def load(cls, path, task=None):
+        """Load a JSON or .sqft layout (told apart by content, not name).
+
+        A *task* follows the progress and can cancel the load.
+        """
+        if is_sqft(path):
+            with SqftFile(path) as f:
+                garden = cls(model=f.model(task=task))
+        else:
+            model, diagnostics = load_json(path, task=task)
+            garden = cls(model=model)
+            garden.diagnostics = diagnostics
+        garden.path = path
+        return garden
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a garden from the decoded contents of a layout file."""
+        build = _LayoutBuilder()
+        build.size("rows", data["rows"])
+        build.size("cols", data["cols"])
+        for section in JSON_SECTIONS:
+            entries = data.get(section, {})
+            if not isinstance(entries, dict):
+                build._skip(section, "", "section is not an object")
+                continue
+            for key, value in entries.items():
+                build.entry(section, key, value)
+        garden = cls(model=build.finish())
+        garden.diagnostics = build.diagnostics
+        return garden
+
+    def to_dict(self):
+        """Return the layout-file representation of the garden."""
+        model = self.model
+        data = {"rows": model.rows, "cols": model.cols}
+        for section, entries in _json_sections(model):
+            data[section] = dict(entries)
+        return data
+
+    def save(self, path=None, task=None):
+        """Write the garden to *path* (default: where it was loaded from)."""
+        path = path or self.path
+        if not path:
+            raise ValueError("No file name given")
+        save_layout(self.model, path, task)
+        self.path = path
+
+    # ── Editing ──────────────────────────────────────────────────────────────
+
+    def plant(self, r, c, crop):
+        """Plant *crop* (None clears) on a garden square.
+
+        Returns True if the square changed; non-garden squares are left alone.
+        """
+        model = self.model
+        if not model.is_garden(r, c) or model.crop_at(r, c) == crop:
+            return False
+        model.set_crop(r, c, crop)
+        return True
+
+    def set_surface(self, r, c, surface):
+        """Change a square's surface; non-garden squares lose crop, note and tags."""
+        self.model.set_surface(r, c, surface)
+
+    def set_irrigation(self, r, c, value):
+        self.model.set_irrigation(r, c, value)
+
+    def set_soil(self, r, c, value):
+        self.model.set_soil(r, c, value)
+
+    def set_note(self, r, c, text):
+        self.model.set_note(r, c, text)
+
+    def clear_all(self):
+        """Remove every crop, note and tag, keeping the layout."""
+        self.model.clear_crops()
+        self.model.clear_tags()
+
+    def resize(self, rows, cols, surface=None):
+        """Resize the bed, keeping the overlapping top-left region.
+
+        *surface*, if given, replaces the whole surface plane (an
+        ``array("B")`` of surface IDs for the new size).
+        """
+        self._check_size(rows, cols)
+        self.model.resize(rows, cols)
+        if surface is not None:
+            self.model.assign_surfaces(surface)
+
+    @staticmethod
+    def _check_size(rows, cols):
+        if not (1 <= rows <= MAX_GRID_DIM and 1 <= cols <= MAX_GRID_DIM):
+            raise ValueError(f"Bed size {rows}×{cols} is out of range")
+
+    # ── Transforms ───────────────────────────────────────────────────────────
+
+    def reframe(self, top, left, rows, cols):
+        """Make the bed the rows×cols window at (top, left) of the current
+        one; see GridModel.reframe()."""
+        self._check_size(rows, cols)
+        self.model.reframe(top, left, rows, cols)
+
+    def extend(self, top=0, bottom=0, left=0, right=0):
+        """Add empty garden squares on each edge (negative counts trim)."""
+        self.reframe(-top, -left, self.rows + top + bottom, self.cols + left + right)
+
+    def shift(self, down=0, right=0):
+        """Move the layout down and right (negative: up and left) within
+        the same size; squares pushed past the edge are lost."""
+        self.reframe(-down, -right, self.rows, self.cols)
+
+    def crop(self, r0, r1, c0, c1):
+        """Keep only rows r0..r1, cols c0..c1 (half-open)."""
+        self.reframe(r0, c0, r1 - r0, c1 - c0)
+
+    def rotate(self, turns=1):
+        """Rotate by *turns* quarter turns clockwise."""
+        self.model.rotate(turns)
+
+    def mirror(self, left_right=True):
+        """Mirror left to right, or top to bottom."""
+        self.model.mirror(left_right)
+
+    # ── Statistics ───────────────────────────────────────────────────────────
+
+    def stats(self):
+        """Return a dict of bed totals and per-crop {crop: (squares, plants)}."""
+        tally = self.tally
+        return {
+            "rows":    self.model.rows,
+            "cols":    self.model.cols,
+            "cells":   self.model.rows * self.model.cols,
+            "garden":  tally.garden,
+            "planted": tally.planted,
+            "percent": int(100 * tally.planted / tally.garden) if tally.garden else 0,
+            "plants":  tally.plants,
+            "crops": {
+                crop: (n, n * CROP_DATA[crop]["plants_per_sqft"])
+                for crop, n in sorted(tally.squares.items())
+            },
+        }
+
+    def region_stats(self, r0=0, r1=None, c0=0, c1=None):
+        """Return stats for rows r0..r1, cols c0..c1 (half-open); see
+        RegionStats.summary()."""
+        return self.regions.summary(r0, r1, c0, c1)
+
+
+def convert(src, dst):
+    """Copy the layout in *src* to *dst*, converting between JSON and .sqft
+    as the file names require.  The round trip is lossless."""
+    Garden.load(src).save(dst)
+
+
+# ─── Auto-Plan ────────────────────────────────────────────────────────────────
+
+# Crops that grow tall enough to shade their neighbours.  Square-foot
+# practice puts them along the north edge of a bed; row 0 is north.
+TALL_CROPS = frozenset({"Tomatoes", "Sweet Corn", "Sunflowers", "Peas", "Cucumbers"})
+TALL_ROWS  = 2      # tall crops go at most this many squares from a bed's north edge
+
+
+class Plan:
+    """Crops chosen by auto_plan() for the empty squares of a bed.
+
+    ``cells`` holds flat cell indices and ``crops`` the matching crop IDs.
+    ``squares`` maps each crop to the squares it gains, ``plants`` and
+    ``score`` total the additions, and ``shortfall`` maps each crop left
+    below its minimum (for lack of room) to the squares it is short.
+    """
+
+    def __init__(self, cells, crops, score, shortfall):
+        self.cells = cells
+        self.crops = crops
+        self.score = score
+        self.shortfall = shortfall
+        data = crops.tobytes()
+        self.squares = {CROP_NAMES[cid]: data.count(cid) for cid in sorted(set(data))}
+        self.plants = sum(n * CROP_DATA[crop]["plants_per_sqft"] for crop, n in self.squares.items())
+
+    def __len__(self):
+        return len(self.cells)
+
+    def apply(self, model):
+        """Plant the plan into *model*, the bed it was made for."""
+        if len(self.cells) > History.BULK_APPLY:
+            codes = model.crop
+            for i, cid in zip(self.cells, self.crops):
+                codes[i] = cid
+            model._reset()
+        else:
+            for i, cid in zip(self.cells, self.crops):
+                model._write("crop", i, cid)
+
+
+def auto_plan(model, mix=None, weights=None, tall_rows=TALL_ROWS):
+    """Choose crops for the empty garden squares of *model*; return a Plan.
+
+    *mix* maps each crop that may be used to ``(min, max)`` squares for the
+    whole bed, counting squares already planted; ``None`` means no limit.
+    Without a mix every crop may be used, without limits.  Each new square
+    scores ``weights[crop]`` (default: the crop's plants per square foot, so
+    the plan grows the most plants); crops missing from *weights* score 0
+    and are only planted to meet their minimum.  Tall crops only go within
+    *tall_rows* squares of the north edge of their bed.  Existing plantings
+    are kept, and *model* is not changed.
+
+    The score is per square, so the squares each crop gets can be settled
+    exactly by a greedy pass over two kinds of empty square — the north
+    strip, open to every crop, and the rest, closed to tall ones.  Crops
+    are then laid out in row-major runs, tall ones nearest the north edge.
+    """
+    if mix is None:
+        mix = dict.fromkeys(CROP_DATA, (None, None))
+    unknown = sorted(set(mix) - set(CROP_DATA))
+    if unknown:
+        raise KeyError(f"unknown crop: {unknown[0]}")
+    if weights is None:
+        value = {crop: CROP_DATA[crop]["plants_per_sqft"] for crop in mix}
+    else:
+        value = {crop: weights.get(crop, 0) for crop in mix}
+    # Best first; ties in catalog order so plans are repeatable
+    ranked = sorted(mix, key=lambda crop: (-value[crop], CROP_IDS[crop]))
+
+    # Empty garden squares by distance from their bed's north edge.  Odd rows
+    # run right to left so consecutive squares stay adjacent.
+    rows, cols = model.rows, model.cols
+    surface, planted = model.surface, model.crop
+    north, rest = array("I"), array("I")
+    depth = [0] * cols
+    for r in range(rows):
+        base = r * cols
+        for c in (range(cols) if r % 2 == 0 else range(cols - 1, -1, -1)):
+            i = base + c
+            if surface[i]:
+                depth[c] = 0
+                continue
+            depth[c] += 1
+            if not planted[i]:
+                (north if depth[c] <= tall_rows else rest).append(i)
+
+    have = model.crop_counts()
+    free = [len(north), len(rest)]
+    room = {}                           # crop -> squares it may still gain
+    take = {crop: [0, 0] for crop in mix}   # crop -> [north, rest] squares
+
+    def give(crop, n, where):
+        n = min(n, free[where], room[crop])
+        take[crop][where] += n
+        free[where] -= n
+        room[crop] -= n
+        return n
+
+    short = {}
+    for crop in ranked:
+        least, most = mix[crop]
+        room[crop] = len(north) + len(rest) if most is None else max(0, most - have.get(crop, 0))
+        short[crop] = max(0, (least or 0) - have.get(crop, 0))
+    # Minimums first, tall crops before the others can use up the north strip;
+    # whatever does not fit (give() caps at the room left) stays in short
+    for crop in sorted(ranked, key=lambda crop: crop not in TALL_CROPS):
+        need = short[crop]
+        if crop not in TALL_CROPS:
+            need -= give(crop, need, 1)
+        short[crop] = need - give(crop, need, 0)
+    # Then the best crops by score: the rest can only take short crops, so
+    # fill it first and leave the north strip for tall ones
+    for crop in ranked:
+        if value[crop] > 0 and crop not in TALL_CROPS:
+            give(crop, free[1], 1)
+    for crop in sorted(ranked, key=lambda crop: (-value[crop], crop not in TALL_CROPS)):
+        if value[crop] > 0:
+            give(crop, free[0], 0)
+
+    cells, crops = array("I"), array("B")
+    tall_first = sorted(ranked, key=lambda crop: crop not in TALL_CROPS)
+    for where, pool, order in ((0, north, tall_first), (1, rest, ranked)):
+        used = 0
+        for crop in order:
+            n = take[crop][where]
+            cells.extend(pool[used:used + n])
+            crops.extend([CROP_IDS[crop]] * n)
+            used += n
+    score = sum(value[crop] * (t[0] + t[1]) for crop, t in take.items())
+    return Plan(cells, crops, score, {crop: n for crop, n in short.items() if n})
+
+
+# ─── Projects ─────────────────────────────────────────────────────────────────
+
+PROJECT_EXT = ".sqproj"
+
+
+class Project:
+    """A site of many named beds, each kept in its own layout file.
+
+    Only the active bed is a live Garden.  Every other bed is its cached
+    summary (Garden.stats()) plus, while it has edits that are not saved
+    yet, its layout packed as .sqft bytes; a bed with nothing unsaved
+    stays on disk until it is opened again.  totals() adds up the
+    summaries, so project-wide figures never load a bed.
+
+    The project file is JSON: each bed's name, its layout file (relative
+    to the project file), and the summary with the file's size and mtime
+    when it was taken.  A layout changed behind the project's back is
+    re-read once, the next time totals() needs it.
+    """
+
+    def __init__(self):
+        self.path   = None
+        self.beds   = {}        # name -> record dict, in display order
+        self.active = None      # name of the active bed
+        self.garden = None      # the active bed's Garden
+        self.last_active = None     # bed that was active when the file was saved
+        self._edited = False    # active bed changed since it was opened or saved
+
+    # The project watches the active model to know whether it needs saving
+    def cell_changed(self, plane, i, old, new):
+        self._edited = True
+
+    def model_reset(self):
+        self._edited = True
+
+    # ── Beds ─────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _record(file=None, summary=None, blob=None):
+        return {"file": file, "stamp": _file_stamp(file), "summary": summary, "blob": blob}
+
+    def _check_name(self, name):
+        name = name.strip()
+        if not name:
+            raise ValueError("A bed needs a name")
+        if name in self.beds:
+            raise ValueError(f"There is already a bed named {name!r}")
+        return name
+
+    def add_bed(self, name, rows=4, cols=8):
+        """Add a new, empty bed of *rows* × *cols* squares; return its name."""
+        name = self._check_name(name)
+        garden = Garden(rows, cols)
+        self.beds[name] = self._record(summary=garden.stats(), blob=sqft_bytes(garden.model))
+        return name
+
+    def add_layout(self, path, name=None):
+        """Add an existing layout file as a bed; return its name."""
+        name = self._check_name(name or os.path.splitext(os.path.basename(path))[0])
+        summary = Garden.load(path).stats()
+        self.beds[name] = self._record(os.path.abspath(path), summary)
+        return name
+
+    def add_garden(self, garden, name):
+        """Add *garden* as a bed and make it the active one."""
+        name = self._check_name(name)
+        self.beds[name] = self._record(garden.path and os.path.abspath(garden.path))
+        self._activate(name, garden, edited=garden.path is None)
+        return name
+
+    def rename_bed(self, old, new):
+        if new.strip() == old:
+            return old
+        new = self._check_name(new)
+        self.beds = {new if k == old else k: v for k, v in self.beds.items()}
+        if self.active == old:
+            self.active = new
+        return new
+
+    def remove_bed(self, name):
+        if name == self.active:
+            self.garden.model.observers.remove(self)
+            self.active = self.garden = None
+        del self.beds[name]
+
+    def open_bed(self, name):
+        """Make *name* the active bed and return its Garden.
+
+        The bed that was active is packed away first.  Raises OSError,
+        ValueError or KeyError if the bed's file cannot be loaded.
+        """
+        if name == self.active:
+            return self.garden
+        rec = self.beds[name]
+        if rec["blob"] is not None:
+            garden = Garden(model=SqftFile.from_bytes(rec["blob"]).model())
+            garden.path = rec["file"]
+        elif rec["file"]:
+            garden = Garden.load(rec["file"])
+        else:
+            raise ValueError(f"Bed {name!r} has no layout file")
+        self._park()
+        self._activate(name, garden, edited=rec["blob"] is not None)
+        rec["blob"] = None
+        return garden
+
+    def _activate(self, name, garden, edited):
+        self.active, self.garden, self._edited = name, garden, edited
+        garden.model.observers.append(self)
+
+    def _park(self):
+        """Reduce the active bed to its summary (and its bytes, if unsaved)."""
+        if self.garden is None:
+            return
+        rec = self.beds[self.active]
+        rec["summary"] = self.garden.stats()
+        if self._edited:
+            rec["blob"] = sqft_bytes(self.garden.model)
+        self.garden.model.observers.remove(self)
+        self.active = self.garden = None
+
+    def bed_saved(self, current=True):
+        """Note that the active bed was just saved to ``garden.path``;
+        *current* is False if it was edited again while being written."""
+        rec = self.beds[self.active]
+        rec["file"] = os.path.abspath(self.garden.path)
+        rec["stamp"] = _file_stamp(rec["file"])
+        rec["summary"] = self.garden.stats()
+        self._edited = not current
+
+    def unsaved(self):
+        """Return the names of the beds with edits not yet written to disk."""
+        return [
+            name for name, rec in self.beds.items()
+            if rec["blob"] is not None or (name == self.active and self._edited)
+        ]
+
+    # ── Statistics ───────────────────────────────────────────────────────────
+
+    def summary(self, name):
+        """Return the stats dict of bed *name* (live for the active bed).
+
+        A summary missing from the project file is read from the layout
+        once and cached; a file that cannot be read gives None.
+        """
+        if name == self.active:
+            return self.garden.stats()
+        rec = self.beds[name]
+        if rec["summary"] is None and rec["file"]:
+            try:
+                rec["summary"] = Garden.load(rec["file"]).stats()
+                rec["stamp"] = _file_stamp(rec["file"])
+            except (OSError, ValueError, KeyError):
+                return None
+        return rec["summary"]
+
+    def totals(self):
+        """Project-wide totals in the shape of Garden.stats(), plus "beds"."""
+        total = {"beds": len(self.beds), "cells": 0, "garden": 0, "planted": 0, "plants": 0}
+        crops = {}
+        for name in self.beds:
+            st = self.summary(name)
+            if st is None:
+                continue
+            for key in ("cells", "garden", "planted", "plants"):
+                total[key] += st[key]
+            for crop, (n, plants) in st["crops"].items():
+                have = crops.get(crop, (0, 0))
+                crops[crop] = (have[0] + n, have[1] + plants)
+        total["percent"] = int(100 * total["planted"] / total["garden"]) if total["garden"] else 0
+        total["crops"] = dict(sorted(crops.items()))
+        return total
+
+    # ── Files ────────────────────────────────────────────────────────────────
+
+    def _bed_file(self, path, name, taken):
+        """Default layout file for a bed saved with the project at *path*;
+        *taken* holds the files other beds already use."""
+        stem = os.path.splitext(path)[0]
+        safe = re.sub(r"[^\w\- ]", "_", name).strip() or "bed"
+        file = os.path.join(stem + "_beds", safe + SQFT_EXT)
+        k = 2
+        while file in taken:
+            file = os.path.join(stem + "_beds", f"{safe} {k}{SQFT_EXT}")
+            k += 1
+        return file
+
+    def save(self, path=None):
+        """Write every bed with unsaved edits, then the project file."""
+        plan = self.save_plan(path)
+        try:
+            self.write_plan(plan)
+        finally:
+            self.save_done(plan)
+
+    # A save in three steps, so the writing can run on a worker thread while
+    # the active bed is still being edited: save_plan() snapshots what needs
+    # writing, write_plan() writes it without touching the project, and
+    # save_done() records what was written.
+
+    def save_plan(self, path=None):
+        """Snapshot the beds to write and the project file's contents."""
+        path = path or self.path
+        if not path:
+            raise ValueError("No file name given")
+        path = os.path.abspath(path)
+        taken = {rec["file"] for rec in self.beds.values()}
+        beds = []
+        for name, rec in self.beds.items():
+            file = rec["file"]
+            if file is None:
+                file = self._bed_file(path, name, taken)
+                taken.add(file)
+            data = None     # what to write: a model copy or .sqft bytes
+            if name == self.active:
+                if self._edited or not os.path.exists(file):
+                    data = self.garden.model.copy()
+            elif rec["blob"] is not None:
+                data = rec["blob"]
+            beds.append({
+                "rec": rec, "name": name, "file": file, "data": data,
+                "summary": self.summary(name), "stamp": rec["stamp"], "written": False,
+            })
+        return {"path": path, "active": self.active, "beds": beds, "written": False}
+
+    @staticmethod
+    def write_plan(plan, task=None):
+        """Write the beds and project file of a save_plan().
+
+        Each file is replaced whole, so stopping part way (an error, or
+        Cancelled from *task*) leaves the beds written so far saved and
+        the rest as they were; the project file is written last.
+        """
+        for bed in plan["beds"]:
+            data = bed["data"]
+            if data is None:
+                continue
+            if task is not None:
+                task.label = f"Saving bed {bed['name']}"
+            if not isinstance(data, GridModel):
+                data = SqftFile.from_bytes(data).model()
+            os.makedirs(os.path.dirname(bed["file"]), exist_ok=True)
+            save_layout(data, bed["file"], task)
+            bed["stamp"] = _file_stamp(bed["file"])
+            bed["written"] = True
+
+        base = os.path.dirname(plan["path"])
+        beds = [{
+            "name":    bed["name"],
+            "file":    os.path.relpath(bed["file"], base).replace(os.sep, "/"),
+            "stamp":   bed["stamp"],
+            "summary": bed["summary"],
+        } for bed in plan["beds"]]
+        tmp = plan["path"] + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"project": 1, "active": plan["active"], "beds": beds}, f, indent=2)
+        os.replace(tmp, plan["path"])
+        plan["written"] = True
+
+    def save_done(self, plan):
+        """Record the outcome of write_plan(), complete or not.
+
+        Returns whether the active bed's file matches its model now: None
+        if it was not written, False if it was edited during the write.
+        """
+        current = None
+        active = self.beds.get(self.active)
+        for bed in plan["beds"]:
+            rec = bed["rec"]
+            # Beds removed since the plan was made are simply forgotten
+            if not bed["written"] or not any(rec is r for r in self.beds.values()):
+                continue
+            rec["file"] = bed["file"]
+            if rec is active and isinstance(bed["data"], GridModel):
+                self.garden.path = bed["file"]
+                current = self.garden.model.matches(bed["data"])
+                self.bed_saved(current)
+                continue
+            if rec["blob"] is bed["data"]:
+                rec["blob"] = None      # else it was parked again with newer edits
+            rec["stamp"] = bed["stamp"]
+        if plan["written"]:
+            self.path = plan["path"]
+        return current
+
+    @classmethod
+    def load(cls, path):
+        """Read a project file.  No bed is opened; see open_bed()."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get("project") != 1:
+            raise ValueError(f"{path}: not a garden project file")
+        self = cls()
+        self.path = os.path.abspath(path)
+        base = os.path.dirname(self.path)
+        for bed in data.get("beds", []):
+            name = bed["name"]
+            file = os.path.normpath(os.path.join(base, bed["file"]))
+            rec = cls._record(file)
+            summary = bed.get("summary")
+            # Trust the cached summary only if the file is unchanged since
+            if summary and rec["stamp"] is not None and list(rec["stamp"]) == bed.get("stamp"):
+                summary["crops"] = {crop: tuple(v) for crop, v in summary["crops"].items()}
+                rec["summary"] = summary
+            self.beds[name] = rec
+        if data.get("active") in self.beds:
+            self.last_active = data["active"]
+        return self
+
+
+def _file_stamp(path):
+    """(size, mtime in ns) of *path*, or None if it does not exist."""
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+# ─── Undo History ─────────────────────────────────────────────────────────────
+
+UNDO_BUDGET = 16 * 1024 * 1024     # default bytes of undo history to keep
+
+
+class _CellDeltas:
+    """Per-cell changes as parallel arrays: index, old code, new code per
+    plane, plus (index, old, new) triples for notes.  Applied newest first
+    on undo and oldest first on redo, so a cell edited twice comes out
+    right either way."""
+
+    __slots__ = ("planes", "notes")
+
+    def __init__(self):
+        self.planes = {}    # plane -> (array("I"), array("B"), array("B"))
+        self.notes  = []
+
+    def add(self, plane, i, old, new):
+        if plane == "notes":
+            self.notes.append((i, old, new))
+            return
+        deltas = self.planes.get(plane)
+        if deltas is None:
+            deltas = self.planes[plane] = (array("I"), array("B"), array("B"))
+        deltas[0].append(i)
+        deltas[1].append(old)
+        deltas[2].append(new)
+
+    def __len__(self):
+        return sum(len(d[0]) for d in self.planes.values()) + len(self.notes)
+
+    def nbytes(self):
+        n = 64 + 72 * len(self.notes)
+        n += sum(len(text or "") for _, old, new in self.notes for text in (old, new))
+        return n + sum(6 * len(d[0]) for d in self.planes.values())
+
+    def apply(self, model, undo):
+        """Write the old (undo) or new codes back; return the cells touched,
+        or None if the change was big enough to apply as a bulk reset."""
+        k = 1 if undo else 2
+        step = -1 if undo else 1
+        if len(self) > History.BULK_APPLY:
+            for plane, deltas in self.planes.items():
+                codes = getattr(model, plane)
+                for i, code in zip(deltas[0][::step], deltas[k][::step]):
+                    codes[i] = code
+            for i, old, new in self.notes[::step]:
+                text = old if undo else new
+                if text:
+                    model.notes[i] = text
+                else:
+                    model.notes.pop(i, None)
+            model._reset()
+            return None
+        cells = set()
+        for plane, deltas in self.planes.items():
+            for i, code in zip(deltas[0][::step], deltas[k][::step]):
+                model._write(plane, i, code)
+                cells.add(model.cell(i))
+        for i, old, new in self.notes[::step]:
+            model._write_note(i, old if undo else new)
+            cells.add(model.cell(i))
+        return cells
+
+
+class _Reshape:
+    """A change of bed size, stored as the non-default cells before and after."""
+
+    __slots__ = ("before", "after")
+
+    def __init__(self, before, after):
+        self.before = self._sparse(before)
+        self.after  = self._sparse(after)
+
+    @staticmethod
+    def _sparse(model):
+        planes = {}
+        for name in GridModel.PLANES:
+            codes = getattr(model, name)
+            idx = array("I", model.nonzero(name))
+            planes[name] = (idx, array("B", (codes[i] for i in idx)))
+        return model.rows, model.cols, planes, dict(model.notes)
+
+    def nbytes(self):
+        n = 128
+        for _, _, planes, notes in (self.before, self.after):
+            n += sum(5 * len(idx) for idx, _ in planes.values())
+            n += sum(72 + len(text) for text in notes.values())
+        return n
+
+    def apply(self, model, undo):
+        rows, cols, sparse, notes = self.before if undo else self.after
+        planes = {}
+        for name, (idx, codes) in sparse.items():
+            plane = planes[name] = array("B", bytes(rows * cols))
+            for i, code in zip(idx, codes):
+                plane[i] = code
+        model.restore(rows, cols, planes, notes)
+        return None
+
+
+class History:
+    """Undo/redo for a GridModel, recorded from its change notifications.
+
+    Attach with ``model.observers.append(history)``.  Per-cell changes are
+    logged as compact deltas; a bulk operation is diffed against a shadow
+    copy of the model kept in step with those notifications, so Clear All
+    becomes one record of just the cells it cleared.  Call commit() after
+    each user action to close the current undo step.  Whole steps are
+    evicted oldest first once the log exceeds *budget* bytes.
+    """
+
+    BULK_APPLY = 5000   # larger records are re-applied as one model reset
+
+    def __init__(self, model, budget=UNDO_BUDGET):
+        self.model  = model
+        self.budget = budget
+        self._undo  = []    # [(label, [records], nbytes)], oldest first
+        self._redo  = []
+        self._open  = []    # records of the step in progress
+        self._used  = 0
+        self._applying = False
+        self._shadow = model.copy()
+
+    # ── Model observer ───────────────────────────────────────────────────────
+
+    def cell_changed(self, plane, i, old, new):
+        shadow = self._shadow
+        if plane == "notes":
+            if new:
+                shadow.notes[i] = new
+            else:
+                shadow.notes.pop(i, None)
+        else:
+            getattr(shadow, plane)[i] = new
+        if self._applying:
+            return
+        if not self._open or not isinstance(self._open[-1], _CellDeltas):
+            self._open.append(_CellDeltas())
+        self._open[-1].add(plane, i, old, new)
+
+    def model_reset(self):
+        old, new = self._shadow, self.model
+        self._shadow = new.copy()
+        if self._applying:
+            return
+        if (old.rows, old.cols) != (new.rows, new.cols):
+            self._open.append(_Reshape(old, new))
+            return
+        deltas = _CellDeltas()
+        for name in GridModel.PLANES:
+            a = getattr(old, name).tobytes()
+            b = getattr(new, name).tobytes()
+            if a == b:
+                continue
+            idx = array("I", (m.start() for m in _NONZERO.finditer(_xor(a, b))))
+            deltas.planes[name] = (
+                idx, array("B", (a[i] for i in idx)), array("B", (b[i] for i in idx)),
+            )
+        for i in old.notes.keys() | new.notes.keys():
+            if old.notes.get(i) != new.notes.get(i):
+                deltas.notes.append((i, old.notes.get(i), new.notes.get(i)))
+        if len(deltas):
+            self._open.append(deltas)
+
+    # ── Steps ────────────────────────────────────────────────────────────────
+
+    def commit(self, label=""):
+        """Close the current step; a non-empty step clears the redo list."""
+        if not self._open:
+            return
+        records, self._open = self._open, []
+        size = sum(r.nbytes() for r in records)
+        self._undo.append((label, records, size))
+        self._used += size
+        self._redo.clear()
+        while self._used > self.budget and self._undo:
+            self._used -= self._undo.pop(0)[2]
+
+    def can_undo(self):
+        return bool(self._open or self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        """Revert the last step.  Returns (label, cells changed), where
+        cells is None if the model was reset; None if there is nothing."""
+        self.commit()
+        if not self._undo:
+            return None
+        step = self._undo.pop()
+        self._used -= step[2]
+        cells = self._apply(step[1], undo=True)
+        self._redo.append(step)
+        return step[0], cells
+
+    def redo(self):
+        """Re-apply the last undone step, returning the same as undo()."""
+        if not self._redo:
+            return None
+        step = self._redo.pop()
+        cells = self._apply(step[1], undo=False)
+        self._undo.append(step)
+        self._used += step[2]
+        return step[0], cells
+
+    def _apply(self, records, undo):
+        cells = set()
+        self._applying = True
+        try:
+            for record in (reversed(records) if undo else records):
+                changed = record.apply(self.model, undo)
+                if changed is None:
+                    cells = None
+                elif cells is not None:
+                    cells |= changed
+        finally:
+            self._applying = False
+        return cells
+
+
+# ─── Autosave Journal ─────────────────────────────────────────────────────────
+
+# A journal file starts with a header (magic plus a checksum of the ID
+# tables, since records store raw IDs) and then holds records:
+#
+#   0–3   (kind, index, code)          set a crop/surface/irrigation/soil code
+#   4     (kind, index, length, text)  set a note; length 0 removes it
+#   0xFE  (kind)                       start from the layout file itself
+#   0xFF  (kind, dirty, length, .sqft bytes)
+#                                      start from this snapshot; dirty is 1
+#                                      if it has edits not saved anywhere
+#
+# Every record stores absolute values, so replaying one twice is harmless.
+
+AUTOSAVE_DIR     = os.path.join(os.path.expanduser("~"), ".garden_planner")
+JOURNAL_EXT      = ".journal"
+_JOURNAL_MAGIC   = b"SQJ1"
+_J_NOTE, _J_BASE, _J_SNAPSHOT = 4, 0xFE, 0xFF
+_J_CODE          = struct.Struct("<BIB")
+_J_NOTE_HEADER   = struct.Struct("<BII")
+_J_SNAP_HEADER   = struct.Struct("<BBI")
+_J_TABLES_CRC    = zlib.crc32("\n".join(
+    str(v) for plane in GridModel.PLANES for v in PLANE_VALUES[plane]
+).encode("utf-8"))
+
+
+def journal_path(layout_path):
+    """Where the journal for *layout_path* (None: an unsaved garden) lives."""
+    if layout_path:
+        return layout_path + JOURNAL_EXT
+    return os.path.join(AUTOSAVE_DIR, "untitled" + JOURNAL_EXT)
+
+
+class Journal:
+    """Append-only autosave log of one GridModel, written on a thread.
+
+    Attach with ``model.observers.append(journal)``.  Each cell change is
+    packed into a few bytes and queued; a background thread appends the
+    queue to the journal file and flushes it, so an edit costs the same
+    whatever the bed size.  Bulk changes, and every COMPACT_EVERY records,
+    queue a copy of the model instead: the writer rewrites the journal as
+    that one snapshot, via a temporary file and os.replace() so a crash
+    never leaves a half-written journal behind.
+
+    *base_saved* says the model matches the layout file next to the
+    journal, which then serves as the starting point instead of a
+    snapshot; *dirty* says the model already has unsaved edits.  Call
+    mark_saved() after saving and close() when done.
+    """
+
+    COMPACT_EVERY = 20000
+
+    def __init__(self, path, model, base_saved=False, dirty=False):
+        self.path  = path
+        self.model = model
+        self.dirty = dirty              # edits not saved to a layout file
+        self.error = None               # first write failure, if any
+        self._count = 0
+        self._queue = queue.SimpleQueue()
+        if base_saved:
+            self._queue.put(("rewrite", None))
+        else:
+            self.compact()
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    # ── Model observer ───────────────────────────────────────────────────────
+
+    def cell_changed(self, plane, i, old, new):
+        if plane == "notes":
+            text = (new or "").encode("utf-8")
+            self._queue.put(_J_NOTE_HEADER.pack(_J_NOTE, i, len(text)) + text)
+        else:
+            self._queue.put(_J_CODE.pack(GridModel.PLANES.index(plane), i, new))
+        self.dirty = True
+        self._count += 1
+        if self._count >= self.COMPACT_EVERY:
+            self.compact()
+
+    def model_reset(self):
+        self.dirty = True
+        self.compact()
+
+    # ── Control ──────────────────────────────────────────────────────────────
+
+    def compact(self):
+        """Replace the journal with a snapshot of the model as it is now."""
+        self._count = 0
+        self._queue.put(("rewrite", (self.model.copy(), self.dirty)))
+
+    def mark_saved(self):
+        """The layout file now matches the model; restart the journal on it."""
+        self._count = 0
+        self.dirty = False
+        self._queue.put(("rewrite", None))
+
+    def close(self, discard=None):
+        """Stop the writer; the journal is deleted if *discard* (default:
+        unless there are unsaved edits)."""
+        if discard is None:
+            discard = not self.dirty
+        self._queue.put(("close", discard))
+        self._thread.join()
+
+    # ── Writer thread ────────────────────────────────────────────────────────
+
+    def _run(self):
+        f = None
+        while True:
+            item = self._queue.get()
+            batch = []
+            while True:
+                if isinstance(item, tuple):
+                    break
+                batch.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+                    break
+            try:
+                if batch and f is not None:
+                    f.write(b"".join(batch))
+                    f.flush()
+                if item is None:
+                    continue
+                command, arg = item
+                if command == "close":
+                    if f is not None:
+                        f.close()
+                    if arg and os.path.exists(self.path):
+                        os.remove(self.path)
+                    return
+                if f is not None:
+                    f.close()
+                f = self._rewrite(arg)
+            except OSError as e:
+                # Keep draining the queue so the editor never blocks
+                self.error = self.error or e
+                f = None
+
+    def _rewrite(self, start):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_JOURNAL_MAGIC + struct.pack("<I", _J_TABLES_CRC))
+            if start is None:
+                f.write(bytes([_J_BASE]))
+            else:
+                snapshot, dirty = start
+                data = sqft_bytes(snapshot)
+                f.write(_J_SNAP_HEADER.pack(_J_SNAPSHOT, dirty, len(data)))
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        return open(self.path, "ab")
+
+
+def replay_journal(path, layout_path=None):
+    """Rebuild the model a journal describes.
+
+    Returns ``(model, changed)``; *changed* is False when the journal holds
+    nothing beyond the saved layout.  A record cut short by a crash ends
+    the replay.  Raises ValueError if the journal is unreadable and OSError
+    or ValueError if its base layout file cannot be loaded.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    head = len(_JOURNAL_MAGIC) + 4
+    if data[:len(_JOURNAL_MAGIC)] != _JOURNAL_MAGIC or len(data) < head + 1:
+        raise ValueError("Not an autosave journal")
+    if struct.unpack_from("<I", data, len(_JOURNAL_MAGIC))[0] != _J_TABLES_CRC:
+        raise ValueError("Journal was written with a different crop or surface list")
+
+    pos = head
+    if data[pos] == _J_BASE:
+        if not layout_path:
+            raise ValueError("Journal needs its layout file")
+        model = Garden.load(layout_path).model
+        changed = False
+        pos += 1
+    elif data[pos] == _J_SNAPSHOT and pos + _J_SNAP_HEADER.size <= len(data):
+        _, changed, n = _J_SNAP_HEADER.unpack_from(data, pos)
+        changed = bool(changed)
+        pos += _J_SNAP_HEADER.size
+        if pos + n > len(data):
+            raise ValueError("Journal snapshot is incomplete")
+        with SqftFile.from_bytes(data[pos:pos + n]) as snap:
+            model = snap.model()
+        pos += n
+    else:
+        raise ValueError("Journal has no starting point")
+
+    planes = [getattr(model, name) for name in GridModel.PLANES]
+    size = model.rows * model.cols
+    end = len(data)
+    while pos < end:
+        kind = data[pos]
+        if kind < len(planes):
+            if pos + _J_CODE.size > end:
+                break
+            _, i, code = _J_CODE.unpack_from(data, pos)
+            pos += _J_CODE.size
+            if i < size:
+                planes[kind][i] = code
+        elif kind == _J_NOTE:
+            if pos + _J_NOTE_HEADER.size > end:
+                break
+            _, i, n = _J_NOTE_HEADER.unpack_from(data, pos)
+            pos += _J_NOTE_HEADER.size
+            if pos + n > end:
+                break
+            text = data[pos:pos + n].decode("utf-8", "replace")
+            pos += n
+            if text:
+                model.notes[i] = text
+            else:
+                model.notes.pop(i, None)
+        else:
+            break
+        changed = True
+    return model, changed
+
+
+# ─── Batch Statistics ─────────────────────────────────────────────────────────
+
+def layout_stats(path):
+    """Return the statistics of one layout file as a dict.
+
+    Has the sidebar's totals (garden sqft, planted squares, percent,
+    plants), per-crop {"squares", "plants"} and irrigation and soil tag
+    counts.  A file that cannot be loaded gives {"file", "error"} instead,
+    so one bad layout does not stop a batch.
+    """
+    try:
+        garden = Garden.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        return {"file": path, "error": str(e) or type(e).__name__}
+    st = garden.stats()
+    return {
+        "file":       path,
+        "rows":       st["rows"],
+        "cols":       st["cols"],
+        "garden":     st["garden"],
+        "planted":    st["planted"],
+        "percent":    st["percent"],
+        "plants":     st["plants"],
+        "crops":      {crop: {"squares": n, "plants": p} for crop, (n, p) in st["crops"].items()},
+        "irrigation": garden.model.value_counts("irrigation"),
+        "soil":       garden.model.value_counts("soil"),
+        "skipped":    len(garden.diagnostics),
+    }
+
+
+def find_layouts(patterns):
+    """Expand directories and glob patterns into a sorted list of layout files."""
+    found = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for name in os.listdir(pattern):
+                if name.lower().endswith((".json", SQFT_EXT)):
+                    found.add(os.path.join(pattern, name))
+        else:
+            found.update(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+    return sorted(found)
+
+
+def iter_stats(paths, jobs=None):
+    """Yield layout_stats() for each path, in order, computed by a process
+    pool of *jobs* workers (default: one per CPU)."""
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(paths) < 2:
+        yield from map(layout_stats, paths)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunk = max(1, min(32, len(paths) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(layout_stats, paths, chunksize=chunk)
+
+
+CSV_COLUMNS = (
+    ["file", "rows", "cols", "garden", "planted", "percent", "plants", "skipped"]
+    + [f"{field}:{crop}" for crop in CROP_DATA for field in ("squares", "plants")]
+    + [f"irrigation:{v}" for v in IRRIGATION_VALUES[1:]]
+    + [f"soil:{v}" for v in SOIL_VALUES[1:]]
+    + ["error"]
+)
+
+
+def _csv_row(st):
+    row = {k: st.get(k, "") for k in CSV_COLUMNS[:8]}
+    row["error"] = st.get("error", "")
+    if "error" not in st:
+        for crop in CROP_DATA:
+            counts = st["crops"].get(crop, {})
+            row[f"squares:{crop}"] = counts.get("squares", 0)
+            row[f"plants:{crop}"] = counts.get("plants", 0)
+        for plane in ("irrigation", "soil"):
+            for v in PLANE_VALUES[plane][1:]:
+                row[f"{plane}:{v}"] = st[plane].get(v, 0)
+    return row
+
+
+def write_stats(paths, out, fmt="jsonl", jobs=None):
+    """Stream statistics for *paths* to the text file *out* as JSON lines
+    or CSV.  Returns the number of files that failed to load."""
+    failed = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(out, CSV_COLUMNS)
+        writer.writeheader()
+    for st in iter_stats(paths, jobs):
+        failed += "error" in st
+        if fmt == "csv":
+            writer.writerow(_csv_row(st))
+        else:
+            out.write(json.dumps(st, ensure_ascii=False) + "\n")
+        out.flush()
+    return failed
+
+
+# ─── Command Line ─────────────────────────────────────────────────────────────
+
+CLI_COMMANDS = ("convert", "stats")
+
+
+def main(argv=None, prog=None):
+    """Run a command-line tool; returns the process exit status."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="Square Foot Garden Planner tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("convert", help="convert a layout between JSON and .sqft")
+    p.add_argument("src")
+    p.add_argument("dst", help="output file; a name ending in .sqft writes binary")
+    p = sub.add_parser("stats", help="bed statistics for many layout files")
+    p.add_argument("paths", nargs="+", metavar="DIR-OR-GLOB",
+                   help="directories (every .json and .sqft inside) or glob patterns")
+    p.add_argument("--format", choices=("jsonl", "csv"), default="jsonl",
+                   help="output JSON lines (default) or CSV")
+    p.add_argument("-j", "--jobs", type=int, default=None,
+                   help="worker processes (default: one per CPU)")
+    p.add_argument("-o", "--output", help="write to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "convert":
+            convert(args.src, args.dst)
+        elif args.command == "stats":
+            paths = find_layouts(args.paths)
+            if not paths:
+                parser.exit(1, "stats: no layout files found\n")
+            if args.output:
+                with open(args.output, "w", encoding="utf-8", newline="") as out:
+                    failed = write_stats(paths, out, args.format, args.jobs)
+            else:
+                failed = write_stats(paths, sys.stdout, args.format, args.jobs)
+            if failed:
+                print(f"stats: {failed} of {len(paths)} files could not be loaded",
+                      file=sys.stderr)
+                return 1
+    except BrokenPipeError:
+        # The reader went away (say, output piped into head); stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (OSError, ValueError, KeyError) as e:
+        parser.exit(1, f"{args.command}: {e}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
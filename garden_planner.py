@@ -3,67 +3,54 @@ Square Foot Garden Planner
 A Tkinter desktop app for planning raised-bed vegetable gardens.
 """
 
+import argparse
+import cProfile
+import functools
 import json
+import os
+import sys
+import time
 import tkinter as tk
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from tkinter import filedialog, messagebox, ttk
 
-# ─── Crop Database ────────────────────────────────────────────────────────────
-
-CROP_DATA = {
-    # ── Original crops ────────────────────────────────────────────────────────
-    "Tomatoes":         {"plants_per_sqft": 1,  "color": "#E74C3C", "spacing": "18–24 in", "icon": "🍅"},
-    "Peppers":          {"plants_per_sqft": 1,  "color": "#E67E22", "spacing": "12–15 in", "icon": "🌶️"},
-    "Lettuce":          {"plants_per_sqft": 4,  "color": "#A8E063", "spacing": "6 in",     "icon": "🥬"},
-    "Spinach":          {"plants_per_sqft": 9,  "color": "#27AE60", "spacing": "4 in",     "icon": "🍃"},
-    "Carrots":          {"plants_per_sqft": 16, "color": "#F39C12", "spacing": "3 in",     "icon": "🥕"},
-    "Radishes":         {"plants_per_sqft": 16, "color": "#E91E8C", "spacing": "3 in",     "icon": "🌸"},
-    "Beans":            {"plants_per_sqft": 9,  "color": "#8BC34A", "spacing": "4 in",     "icon": "🫘"},
-    "Basil":            {"plants_per_sqft": 4,  "color": "#1ABC9C", "spacing": "6 in",     "icon": "🌿"},
-    "Cucumbers":        {"plants_per_sqft": 2,  "color": "#48C9B0", "spacing": "8 in",     "icon": "🥒"},
-    "Zucchini":         {"plants_per_sqft": 1,  "color": "#F1C40F", "spacing": "18 in",    "icon": "🟢"},
-    "Kale":             {"plants_per_sqft": 1,  "color": "#1E8449", "spacing": "12 in",    "icon": "🌱"},
-    "Onions":           {"plants_per_sqft": 16, "color": "#BB8FCE", "spacing": "3 in",     "icon": "🧅"},
-    "Peas":             {"plants_per_sqft": 8,  "color": "#A9DFBF", "spacing": "4–6 in",  "icon": "🫛"},
-    # ── New crops ─────────────────────────────────────────────────────────────
-    "Broccoli":         {"plants_per_sqft": 1,  "color": "#2E86AB", "spacing": "12 in",    "icon": "🥦"},
-    "Cauliflower":      {"plants_per_sqft": 1,  "color": "#D5D8DC", "spacing": "12 in",    "icon": "⚪"},
-    "Cabbage":          {"plants_per_sqft": 1,  "color": "#7DCEA0", "spacing": "12 in",    "icon": "💚"},
-    "Brussels Sprouts": {"plants_per_sqft": 1,  "color": "#52BE80", "spacing": "12 in",    "icon": "🥦"},
-    "Sweet Corn":       {"plants_per_sqft": 4,  "color": "#F9E79F", "spacing": "6 in",     "icon": "🌽"},
-    "Pumpkin":          {"plants_per_sqft": 1,  "color": "#DC7633", "spacing": "24–36 in", "icon": "🎃"},
-    "Watermelon":       {"plants_per_sqft": 1,  "color": "#EC407A", "spacing": "18–24 in", "icon": "🍉"},
-    "Cantaloupe":       {"plants_per_sqft": 1,  "color": "#FFAB76", "spacing": "18–24 in", "icon": "🍈"},
-    "Eggplant":         {"plants_per_sqft": 1,  "color": "#7B2D8B", "spacing": "18 in",    "icon": "🍆"},
-    "Sweet Potatoes":   {"plants_per_sqft": 4,  "color": "#B7770D", "spacing": "6 in",     "icon": "🍠"},
-    "Garlic":           {"plants_per_sqft": 16, "color": "#F0E6D3", "spacing": "3 in",     "icon": "🧄"},
-    "Leeks":            {"plants_per_sqft": 9,  "color": "#82E0AA", "spacing": "4 in",     "icon": "🌾"},
-    "Beets":            {"plants_per_sqft": 9,  "color": "#8E44AD", "spacing": "4 in",     "icon": "🔴"},
-    "Swiss Chard":      {"plants_per_sqft": 4,  "color": "#D98880", "spacing": "6 in",     "icon": "🍀"},
-    "Arugula":          {"plants_per_sqft": 4,  "color": "#A9CCE3", "spacing": "6 in",     "icon": "🥗"},
-    "Cilantro":         {"plants_per_sqft": 9,  "color": "#58D68D", "spacing": "4 in",     "icon": "🌿"},
-    "Parsley":          {"plants_per_sqft": 4,  "color": "#17A589", "spacing": "6 in",     "icon": "🪴"},
-    "Dill":             {"plants_per_sqft": 4,  "color": "#ABEBC6", "spacing": "6 in",     "icon": "🌼"},
-    "Sunflowers":       {"plants_per_sqft": 1,  "color": "#F4D03F", "spacing": "12 in",    "icon": "🌻"},
-    "Strawberries":     {"plants_per_sqft": 4,  "color": "#CB4335", "spacing": "6 in",     "icon": "🍓"},
-}
-
-SURFACE_DATA = {
-    "garden":  {"color": None,      "icon": ""},     # uses EMPTY_COLOR when no crop
-    "grass":   {"color": "#7EC850", "icon": "🌱"},
-    "pathway": {"color": "#A0856B", "icon": "🧱"},
-    "gravel":  {"color": "#B0B0B0", "icon": "⬡"},
-    "mulch":   {"color": "#5C3A1E", "icon": "🪵"},
-    "water":   {"color": "#5DADE2", "icon": "💧"},
-    "unused":  {"color": "#E8E8E8", "icon": ""},
-}
-
-SURFACE_ORDER = ["garden", "grass", "pathway", "gravel", "mulch", "water", "unused"]
+from garden_core import (
+    CROP_DATA, CROP_NAMES, IRRIGATION_ICONS, IRRIGATION_VALUES, MAX_GRID_DIM,
+    SOIL_ICONS, SOIL_VALUES, SURFACE_DATA, SURFACE_ORDER,
+    CLI_COMMANDS, PROJECT_EXT, SQFT_EXT, TALL_CROPS, TALL_ROWS, UNDO_BUDGET, BedOutline,
+    Cancelled, CompanionScore, Garden, GridModel, History, Journal, Project, Task, auto_plan,
+    flood_region, journal_path, rect_runs, replay_journal, save_layout,
+)
+from garden_core import main as cli_main
 
 EMPTY_COLOR     = "#E8DCC8"
 GRID_LINE_COLOR = "#7D6B4F"
 HOVER_COLOR     = "#FFD700"
-CELL_SIZE       = 100  # pixels per square foot
+SELECT_COLOR    = "#00E5FF"   # outline of the selected region
+CONFLICT_COLOR  = "#D50000"   # outline of squares next to a bad companion
+CELL_SIZE       = 100  # pixels per square foot at 100% zoom
+ZOOM_LEVELS     = (8, 12, 16, 24, 32, 48, 64, 80, 100, 125, 150)   # cell sizes
+LOD_DETAIL      = 64   # at this cell size and up: labels, counts and badges
+LOD_ICONS       = 32   # at this size and up: the icon only; below: fill only
 PAD             = 30   # canvas edge padding
+BORDER_COLOR    = "#3E2107"
+BORDER_W        = 5
+
+NOTE_ICON  = "📝"
+BADGE_FONT = ("Segoe UI Emoji", 9)
+
+# Planting tools: (value, button label, hint shown beside them)
+TOOLS = (
+    ("paint", "✎ Paint",     "Click/drag = plant  ·  Double-click = note  ·  Right-click = menu"),
+    ("fill",  "◍ Fill",      "Click = plant every connected square of the same crop"),
+    ("rect",  "▭ Rectangle", "Drag = plant every garden square in the rectangle"),
+)
+
+IO_POLL_MS       = 50    # how often a running open/save is checked on
+IO_PROGRESS_SECS = 0.3   # show the progress bar once a job runs this long
 
 
 def _text_color(hex_color):
@@ -74,31 +61,398 @@ def _text_color(hex_color):
     return "#000000" if brightness > 128 else "#ffffff"
 
 
+# ─── Cell Styles ──────────────────────────────────────────────────────────────
+
+class _StyleTable:
+    """Drawing styles for every crop and surface ID, computed once.
+
+    ``crops[crop_id]`` styles a garden cell (ID 0 is an empty garden cell),
+    ``surfaces[surface_id]`` a non-garden cell, and ``irrigation`` /
+    ``soil`` map tag codes to their badge icons.  Each style is a dict with
+    fill, outline and text colours, icon, display label, "× n" count text
+    and fonts, so the renderer only does table lookups per cell.  refresh()
+    rebuilds the table only if CROP_DATA or SURFACE_DATA changed.
+    """
+
+    def __init__(self):
+        self._signature = None
+        self.refresh()
+
+    @staticmethod
+    def _catalog_signature():
+        return (
+            tuple((name, tuple(d.items())) for name, d in CROP_DATA.items()),
+            tuple((name, tuple(d.items())) for name, d in SURFACE_DATA.items()),
+        )
+
+    def invalidate(self):
+        self._signature = None
+
+    def refresh(self):
+        """Rebuild the table if the catalogs changed; return True if rebuilt."""
+        signature = self._catalog_signature()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+
+        self.crops = []
+        for crop in CROP_NAMES:
+            data = CROP_DATA.get(crop)
+            if data is None:
+                # Empty garden cell (or a crop no longer in the catalog)
+                self.crops.append({
+                    "fill": EMPTY_COLOR, "outline": GRID_LINE_COLOR,
+                    "text": _text_color(EMPTY_COLOR),
+                    "icon": "", "label": "", "count": "",
+                    "icon_font": None, "label_font": ("Helvetica", 6), "count_font": None,
+                })
+                continue
+            self.crops.append({
+                "fill": data["color"], "outline": GRID_LINE_COLOR,
+                "text": _text_color(data["color"]),
+                "icon": data["icon"],
+                "label": crop if len(crop) <= 10 else crop[:9] + ".",
+                "count": f"× {data['plants_per_sqft']}",
+                "icon_font": ("Segoe UI Emoji", 14),
+                "label_font": ("Helvetica", 8, "bold"),
+                "count_font": ("Helvetica", 8),
+            })
+
+        self.surfaces = []
+        for surface in SURFACE_ORDER:
+            data = SURFACE_DATA[surface]
+            color = data["color"] or EMPTY_COLOR
+            self.surfaces.append({
+                "fill": color, "outline": "#C0C0C0",
+                "text": _text_color(color),
+                "icon": data["icon"], "label": surface.capitalize(), "count": "",
+                "icon_font": ("Segoe UI Emoji", 16),
+                "label_font": ("Helvetica", 8),
+                "count_font": None,
+            })
+
+        self.irrigation = tuple(IRRIGATION_ICONS.get(v) for v in IRRIGATION_VALUES)
+        self.soil       = tuple(SOIL_ICONS.get(v) for v in SOIL_VALUES)
+        return True
+
+
+STYLES = _StyleTable()
+
+
+# ─── Instrumentation ──────────────────────────────────────────────────────────
+
+PERF_WINDOW = 500      # recent calls per operation kept for percentiles
+PERF_TRACE  = 50_000   # most recent calls kept for the session trace
+
+
+def _timed(name):
+    """Report each call of the decorated method to ``self.profiler``.
+
+    While instrumentation is off this costs one attribute test per call.
+    """
+    def wrap(method):
+        @functools.wraps(method)
+        def timed(self, *args, **kwargs):
+            prof = self.profiler
+            if not prof.enabled:
+                return method(self, *args, **kwargs)
+            prof.begin()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                prof.end(name)
+        return timed
+    return wrap
+
+
+class _Profiler:
+    """Opt-in timing of the app's handlers.
+
+    While enabled, every ``@_timed`` call is timed and the canvas items it
+    created and deleted are counted.  The last PERF_WINDOW durations of
+    each operation give rolling percentiles, and every call goes into a
+    trace that save() writes as Chrome trace-event JSON (open it in
+    Perfetto or chrome://tracing).  Calls made from inside another timed
+    call are recorded too; an outermost call is one "frame".
+    """
+
+    CREATE_METHODS = (
+        "create_arc", "create_bitmap", "create_image", "create_line", "create_oval",
+        "create_polygon", "create_rectangle", "create_text", "create_window",
+    )
+
+    def __init__(self):
+        self.enabled  = False
+        self.canvas   = None
+        self.samples  = {}      # name -> deque of recent durations (s)
+        self.calls    = {}      # name -> total calls this session
+        self.frames   = deque(maxlen=PERF_WINDOW)
+        self.trace    = deque(maxlen=PERF_TRACE)
+        self.last     = None    # (name, seconds, created, deleted) of the last frame
+        self.on_frame = None    # called after every frame
+        self.cprofile = None
+        self.created  = 0
+        self.deleted  = 0
+        self._stack   = []
+        self._epoch   = time.perf_counter()
+
+    def enable(self, canvas, cprofile=False):
+        """Start timing, counting items on *canvas*; optionally run cProfile too."""
+        if self.enabled:
+            return
+        self.enabled = True
+        self.canvas = canvas
+        # Count items through per-instance wrappers, removed again by disable()
+        for name in self.CREATE_METHODS:
+            setattr(canvas, name, self._counting_create(getattr(canvas, name)))
+        canvas.delete = self._counting_delete(canvas.delete, canvas.find_withtag)
+        if cprofile:
+            self.cprofile = cProfile.Profile()
+        if self.cprofile is not None:
+            self.cprofile.enable()
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        for name in self.CREATE_METHODS + ("delete",):
+            self.canvas.__dict__.pop(name, None)
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        self._stack.clear()
+
+    def _counting_create(self, create):
+        def counted(*args, **kw):
+            self.created += 1
+            return create(*args, **kw)
+        return counted
+
+    def _counting_delete(self, delete, find):
+        def counted(*tags):
+            self.deleted += sum(len(find(t)) for t in tags)
+            delete(*tags)
+        return counted
+
+    # ── Recording ────────────────────────────────────────────────────────────
+
+    def begin(self):
+        self._stack.append((time.perf_counter(), self.created, self.deleted))
+
+    def end(self, name):
+        if not self._stack:     # disabled from inside a timed call
+            return
+        t0, created, deleted = self._stack.pop()
+        dt = time.perf_counter() - t0
+        created = self.created - created
+        deleted = self.deleted - deleted
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=PERF_WINDOW)
+        samples.append(dt)
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.trace.append((name, t0 - self._epoch, dt, created, deleted, len(self._stack)))
+        if not self._stack:
+            self.frames.append(dt)
+            self.last = (name, dt, created, deleted)
+            if self.on_frame is not None:
+                self.on_frame()
+
+    # ── Reporting ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def percentiles(samples, points=(50, 90, 99)):
+        """Nearest-rank percentiles of *samples*, in milliseconds."""
+        ordered = sorted(samples)
+        if not ordered:
+            return {}
+        n = len(ordered)
+        return {
+            f"p{p}_ms": round(ordered[min(n - 1, -(-p * n // 100) - 1)] * 1000, 3)
+            for p in points
+        }
+
+    def summary(self):
+        """``{operation: {calls, p50_ms, p90_ms, p99_ms, max_ms}}``."""
+        return {
+            name: {
+                "calls": self.calls[name],
+                **self.percentiles(samples),
+                "max_ms": round(max(samples) * 1000, 3),
+            }
+            for name, samples in sorted(self.samples.items())
+        }
+
+    def overlay_text(self):
+        if self.last is None:
+            return "Performance overlay: waiting for input…"
+        name, dt, created, deleted = self.last
+        frames = self.percentiles(self.frames, (50, 95))
+        return (
+            f"frame {dt * 1000:.1f} ms  ({name})\n"
+            f"items +{created} / −{deleted}\n"
+            f"p50 {frames['p50_ms']:.1f}  p95 {frames['p95_ms']:.1f} ms"
+            f"  ({len(self.frames)} frames)"
+        )
+
+    def save(self, path):
+        """Write the session trace to *path*; return the files written.
+
+        If cProfile is running its stats are dumped beside it, as .prof.
+        """
+        events = [
+            {
+                "name": name, "ph": "X", "pid": 1, "tid": 1,
+                "ts": round(start * 1e6, 1), "dur": round(dt * 1e6, 1),
+                "args": {"created": created, "deleted": deleted, "depth": depth},
+            }
+            for name, start, dt, created, deleted, depth in self.trace
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "traceEvents": events,
+                "displayTimeUnit": "ms",
+                "otherData": {"summary": self.summary()},
+            }, f)
+        written = [path]
+        if self.cprofile is not None:
+            prof_path = os.path.splitext(path)[0] + ".prof"
+            self.cprofile.dump_stats(prof_path)     # this also stops it
+            if self.enabled:
+                self.cprofile.enable()
+            written.append(prof_path)
+        return written
+
+
 # ─── Main Application ─────────────────────────────────────────────────────────
 
 class GardenPlannerApp:
-    def __init__(self, root):
+    def __init__(self, root, renderer="vector", undo_budget=UNDO_BUDGET, profile=False):
         self.root = root
         self.root.title("Square Foot Garden Planner")
         self.root.configure(bg="#2D5016")
-
-        self.rows = 4
-        self.cols = 8
-        self.grid_data      = {}    # (row, col) -> crop name or None
-        self.notes          = {}    # (row, col) -> str
-        self.irrigation     = {}    # (row, col) -> "drip" | "spray"
-        self.soil           = {}    # (row, col) -> soil amendment key
-        self.cell_types     = {}    # (row, col) -> surface string; absent = "garden"
-        self.current_file = None
+        self.root.protocol("WM_DELETE_WINDOW", self._exit)
+
+        self.journal = None
+        self.history = None
+        self.project = None
+        self.companions = None
+        self.show_conflicts = True      # outline squares next to a bad companion
+        self.companion_diagonal = False
+        self.undo_budget = undo_budget
+        self._autosave_warned = False
+        # Opening and saving layouts run here, one job at a time
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="file-io")
+        self._job = None
+        self._job_poll = None
+        self._set_garden(Garden(4, 8), recover=True)
+        self.renderer_name = renderer
         self.hovered_cell = None
+        # Edits and hover moves are queued here and applied together by
+        # _flush() on the next idle tick, so bursts of events cost one repaint.
+        self._dirty_cells   = set()
+        self._hover_target  = None
+        self._hover_pending = False
+        self._flush_id      = None
+        self._drag_last     = None
+        self._select_anchor = None      # (row, col, where) while Shift+dragging
+        self._rect_anchor   = None      # (row, col) while dragging a rectangle
+        self.tool = tk.StringVar(value="paint")
         self.selected_crop = tk.StringVar(value="Tomatoes")
+        self.profiler = _Profiler()
+        self.perf_overlay = tk.BooleanVar(value=False)
 
         self._build_menu()
         self._build_ui()
-        self._init_grid()
+        if profile:
+            # Instrument the whole session, cProfile included
+            self.profiler.enable(self.canvas, cprofile=True)
         self._draw_grid()
         self._update_sidebar()
 
+    def _set_garden(self, garden, recover=False):
+        """Make *garden* the bed being edited and start autosaving it.
+
+        With *recover*, unsaved edits that a previous session left in the
+        garden's journal are offered back first.  A garden that is not the
+        current project's active bed starts a new, unsaved project of one bed.
+        """
+        if self.project is None or garden is not self.project.garden:
+            self.project = Project()
+            name = os.path.splitext(os.path.basename(garden.path))[0] if garden.path else "Bed 1"
+            self.project.add_garden(garden, name)
+        dirty = False
+        jpath = journal_path(garden.path)
+        if recover and os.path.exists(jpath):
+            try:
+                model, changed = replay_journal(jpath, garden.path)
+            except (OSError, ValueError, KeyError):
+                changed = False
+            if changed and messagebox.askyesno(
+                "Recover Changes",
+                "This garden has unsaved changes from a previous session.\n"
+                "Recover them?",
+            ):
+                planes = {name: getattr(model, name) for name in GridModel.PLANES}
+                garden.model.restore(model.rows, model.cols, planes, model.notes)
+                dirty = True
+        self.garden = garden
+        self.model  = garden.model
+        self.tally  = garden.tally
+        self.selection = None       # (r0, r1, c0, c1), half-open
+        self._start_journal(base_saved=garden.path is not None and not dirty, dirty=dirty)
+        # Undo history starts afresh with each garden
+        if self.history is not None:
+            self.history.model.observers.remove(self.history)
+        self.history = History(self.model, self.undo_budget)
+        self.model.observers.append(self.history)
+        self._attach_companions()
+
+    def _attach_companions(self):
+        if self.companions is not None:
+            self.companions.model.observers.remove(self.companions)
+        self.companions = CompanionScore(self.model, diagonal=self.companion_diagonal)
+        self.model.observers.append(self.companions)
+
+    def _start_journal(self, base_saved, dirty=False):
+        if self.journal is not None:
+            self.journal.model.observers.remove(self.journal)
+            self.journal.close(discard=True)
+        self.journal = Journal(
+            journal_path(self.garden.path), self.model, base_saved=base_saved, dirty=dirty,
+        )
+        self.model.observers.append(self.journal)
+
+    def _exit(self):
+        if not self._keep_other_beds():
+            return
+        self._settle_job()
+        self._io.shutdown()
+        # A clean exit drops the journal unless there are unsaved edits
+        self.journal.close()
+        self.root.quit()
+
+    def _keep_other_beds(self):
+        """Offer to save beds other than the active one that have unsaved
+        edits (the journal only covers the active bed).  Returns False if
+        the user cancelled."""
+        others = [name for name in self.project.unsaved() if name != self.project.active]
+        if not others:
+            return True
+        answer = messagebox.askyesnocancel(
+            "Unsaved Beds",
+            f"{len(others)} other bed(s) have unsaved changes "
+            f"({', '.join(others[:5])}{', …' if len(others) > 5 else ''}).\n"
+            "Save the project first?",
+        )
+        if answer is None:
+            return False
+        if answer:
+            if not (self._save_project(self.project.path) if self.project.path else self._save_project_as()):
+                return False
+            self._settle_job()      # the caller is about to replace the garden
+            return not any(name != self.project.active for name in self.project.unsaved())
+        return True
+
     # ─── Menu Bar ─────────────────────────────────────────────────────────────
 
     def _build_menu(self):
@@ -110,18 +464,87 @@ class GardenPlannerApp:
         file_menu.add_command(label="Save",          accelerator="Ctrl+S", command=self._save_file)
         file_menu.add_command(label="Save As…",      command=self._save_as)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Open Project…",     command=self._open_project)
+        file_menu.add_command(label="Save Project As…",  command=self._save_project_as)
+        file_menu.add_separator()
+        file_menu.add_command(label="Exit", command=self._exit)
         menubar.add_cascade(label="File", menu=file_menu)
 
+        edit_menu = tk.Menu(menubar, tearoff=0)
+        edit_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=self._undo)
+        edit_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=self._redo)
+        edit_menu.add_separator()
+        edit_menu.add_command(label="Select All",      accelerator="Ctrl+A", command=self._select_all)
+        edit_menu.add_command(label="Clear Selection", accelerator="Esc",    command=lambda: self._select(None))
+        menubar.add_cascade(label="Edit", menu=edit_menu)
+
         garden_menu = tk.Menu(menubar, tearoff=0)
+        garden_menu.add_command(label="Add Bed…",               command=self._add_bed)
+        garden_menu.add_command(label="Add Layout File as Bed…", command=self._add_layout_bed)
+        garden_menu.add_command(label="Rename Bed…",            command=self._rename_bed)
+        garden_menu.add_command(label="Remove Bed",             command=self._remove_bed)
+        garden_menu.add_command(label="Next Bed",     accelerator="Ctrl+PgDn", command=lambda: self._step_bed(1))
+        garden_menu.add_command(label="Previous Bed", accelerator="Ctrl+PgUp", command=lambda: self._step_bed(-1))
+        garden_menu.add_separator()
         garden_menu.add_command(label="Edit Garden Layout…", command=self._resize_garden)
+        transform_menu = tk.Menu(garden_menu, tearoff=0)
+        transform_menu.add_command(label="Rotate Clockwise",
+                                   command=lambda: self._transform("Rotate", lambda g: g.rotate(1)))
+        transform_menu.add_command(label="Rotate Counter-clockwise",
+                                   command=lambda: self._transform("Rotate", lambda g: g.rotate(-1)))
+        transform_menu.add_command(label="Rotate 180°",
+                                   command=lambda: self._transform("Rotate", lambda g: g.rotate(2)))
+        transform_menu.add_separator()
+        transform_menu.add_command(label="Mirror Left–Right",
+                                   command=lambda: self._transform("Mirror", lambda g: g.mirror(True)))
+        transform_menu.add_command(label="Mirror Top–Bottom",
+                                   command=lambda: self._transform("Mirror", lambda g: g.mirror(False)))
+        transform_menu.add_separator()
+        transform_menu.add_command(label="Shift Layout…",         command=self._shift_layout)
+        transform_menu.add_command(label="Extend or Trim Edges…", command=self._extend_edges)
+        transform_menu.add_command(label="Crop to Selection",     command=self._crop_to_selection)
+        garden_menu.add_cascade(label="Transform", menu=transform_menu)
+        garden_menu.add_command(label="Auto-Plan Empty Squares…", command=self._auto_plan)
         garden_menu.add_command(label="Clear All Squares",   command=self._clear_all)
         menubar.add_cascade(label="Garden", menu=garden_menu)
 
+        view_menu = tk.Menu(menubar, tearoff=0)
+        view_menu.add_command(label="Zoom In",     accelerator="Ctrl++", command=lambda: self._zoom(1))
+        view_menu.add_command(label="Zoom Out",    accelerator="Ctrl+-", command=lambda: self._zoom(-1))
+        view_menu.add_command(label="Actual Size", accelerator="Ctrl+0", command=lambda: self._zoom(0))
+        view_menu.add_separator()
+        self._conflicts_var = tk.BooleanVar(value=self.show_conflicts)
+        self._diagonal_var  = tk.BooleanVar(value=self.companion_diagonal)
+        view_menu.add_checkbutton(
+            label="Highlight Companion Conflicts", variable=self._conflicts_var,
+            command=self._toggle_conflicts,
+        )
+        view_menu.add_checkbutton(
+            label="Count Diagonal Neighbours", variable=self._diagonal_var,
+            command=self._toggle_diagonal,
+        )
+        view_menu.add_separator()
+        view_menu.add_checkbutton(
+            label="Performance Overlay", variable=self.perf_overlay, command=self._toggle_perf_overlay,
+        )
+        view_menu.add_command(label="Save Performance Profile…", command=self._save_profile)
+        menubar.add_cascade(label="View", menu=view_menu)
+
         self.root.config(menu=menubar)
         self.root.bind("<Control-n>", lambda e: self._new_garden())
         self.root.bind("<Control-o>", lambda e: self._load_file())
         self.root.bind("<Control-s>", lambda e: self._save_file())
+        self.root.bind("<Control-z>", lambda e: self._undo())
+        self.root.bind("<Control-y>", lambda e: self._redo())
+        self.root.bind("<Control-Z>", lambda e: self._redo())   # Ctrl+Shift+Z
+        self.root.bind("<Control-plus>",  lambda e: self._zoom(1))
+        self.root.bind("<Control-equal>", lambda e: self._zoom(1))
+        self.root.bind("<Control-minus>", lambda e: self._zoom(-1))
+        self.root.bind("<Control-0>",     lambda e: self._zoom(0))
+        self.root.bind("<Control-a>",     lambda e: self._select_all())
+        self.root.bind("<Escape>",        lambda e: self._select(None))
+        self.root.bind("<Control-Next>",  lambda e: self._step_bed(1))
+        self.root.bind("<Control-Prior>", lambda e: self._step_bed(-1))
 
     # ─── UI Layout ────────────────────────────────────────────────────────────
 
@@ -151,17 +574,39 @@ class GardenPlannerApp:
         )
         h_bar = ttk.Scrollbar(cv_wrap, orient=tk.HORIZONTAL, command=self.canvas.xview)
         v_bar = ttk.Scrollbar(cv_wrap, orient=tk.VERTICAL,   command=self.canvas.yview)
-        self.canvas.configure(xscrollcommand=h_bar.set, yscrollcommand=v_bar.set)
+        self.renderer = RENDERERS[self.renderer_name](self.canvas, self)
+
+        # Scrolling or resizing the canvas brings new cells into view
+        def on_scroll(bar):
+            def update(*args):
+                bar.set(*args)
+                self.renderer.schedule_sync()
+            return update
+
+        self.canvas.configure(xscrollcommand=on_scroll(h_bar), yscrollcommand=on_scroll(v_bar))
 
         h_bar.pack(side=tk.BOTTOM, fill=tk.X)
         v_bar.pack(side=tk.RIGHT,  fill=tk.Y)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
+        # Frame-time readout floating over the canvas (View → Performance Overlay)
+        self._perf_label = tk.Label(
+            self.canvas, font=("Consolas", 9), justify=tk.LEFT,
+            bg="#1E1E1E", fg="#9CDC63", padx=6, pady=4,
+        )
+
         self.canvas.bind("<Button-1>",        self._on_click)
+        self.canvas.bind("<Shift-Button-1>",  self._start_select)
+        self.canvas.bind("<B1-Motion>",       self._on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self._end_drag)
         self.canvas.bind("<Double-Button-1>", self._on_double_click)
         self.canvas.bind("<Button-3>",        self._on_right_click)
         self.canvas.bind("<Motion>",          self._on_hover)
         self.canvas.bind("<Leave>",           lambda e: self._clear_hover())
+        self.canvas.bind("<Configure>",       self.renderer.schedule_sync)
+        self.canvas.bind("<MouseWheel>",      self._on_wheel)   # Ctrl+wheel zooms
+        self.canvas.bind("<Button-4>",        self._on_wheel)   # X11 wheel up
+        self.canvas.bind("<Button-5>",        self._on_wheel)   # X11 wheel down
 
         # Crop selector bar
         sel = tk.Frame(left, bg="#2D5016", pady=8)
@@ -186,21 +631,33 @@ class GardenPlannerApp:
         self.info_lbl = tk.Label(sel, bg="#2D5016", fg="#C8E6C9", font=("Helvetica", 9))
         self.info_lbl.pack(side=tk.LEFT)
 
-        tk.Label(
-            sel, text="Left-click = plant  ·  Double-click = note  ·  Right-click = menu",
-            bg="#2D5016", fg="#7CB87C", font=("Helvetica", 9),
-        ).pack(side=tk.RIGHT, padx=6)
+        self.tool_hint = tk.Label(sel, bg="#2D5016", fg="#7CB87C", font=("Helvetica", 9))
+        self.tool_hint.pack(side=tk.RIGHT, padx=6)
+        for value, text, _ in reversed(TOOLS):
+            tk.Radiobutton(
+                sel, text=text, value=value, variable=self.tool, indicatoron=False,
+                bg="#1A3209", fg="#F5F5DC", selectcolor="#3A7D44",
+                activebackground="#2D5016", font=("Helvetica", 9), padx=6,
+            ).pack(side=tk.RIGHT, padx=1)
+        self.tool.trace_add("write", self._refresh_tool_hint)
+        self._refresh_tool_hint()
 
         self.selected_crop.trace_add("write", self._refresh_swatch)
         self._refresh_swatch()
 
-        # Status bar
+        # Status bar, with a progress bar for long opens and saves
+        status = tk.Frame(left, bg="#1A3209")
+        status.pack(fill=tk.X, pady=(4, 0))
         self.status_var = tk.StringVar(value="Ready")
         tk.Label(
-            left, textvariable=self.status_var,
+            status, textvariable=self.status_var,
             bg="#1A3209", fg="#A5D6A7",
             font=("Helvetica", 9), anchor="w", padx=8, pady=3,
-        ).pack(fill=tk.X, pady=(4, 0))
+        ).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self._progress = tk.Frame(status, bg="#1A3209")
+        ttk.Button(self._progress, text="Cancel", command=self._cancel_job).pack(side=tk.RIGHT, padx=4)
+        self._progress_bar = ttk.Progressbar(self._progress, length=160, maximum=1000)
+        self._progress_bar.pack(side=tk.RIGHT, pady=2)
 
         # ── Right: sidebar ───────────────────────────────────────────────────
         self._build_sidebar(outer)
@@ -217,6 +674,26 @@ class GardenPlannerApp:
             ).pack(pady=(12, 2), padx=10, anchor="w")
             ttk.Separator(sidebar, orient="horizontal").pack(fill=tk.X, padx=8, pady=(0, 4))
 
+        # Bed switcher and project totals
+        section("BEDS")
+        self.bed_var = tk.StringVar()
+        self.bed_box = ttk.Combobox(sidebar, textvariable=self.bed_var, state="readonly")
+        self.bed_box.pack(fill=tk.X, padx=10)
+        self.bed_box.bind("<<ComboboxSelected>>", lambda e: self._switch_bed(self.bed_var.get()))
+        self.project_lbl = tk.Label(
+            sidebar, bg="#1A3209", fg="#81C784",
+            font=("Helvetica", 8), justify="left", padx=8,
+        )
+        self.project_lbl.pack(anchor="w", pady=(2, 0))
+
+        # Statistics for the selected region
+        section("SELECTION")
+        self.selection_lbl = tk.Label(
+            sidebar, bg="#1A3209", fg="#81C784",
+            font=("Helvetica", 8), justify="left", padx=8, wraplength=220,
+        )
+        self.selection_lbl.pack(anchor="w")
+
         # Legend
         section("CROP LEGEND")
         leg = tk.Frame(sidebar, bg="#1A3209")
@@ -238,6 +715,12 @@ class GardenPlannerApp:
         section("PLANTED SUMMARY")
         self.summary_frame = tk.Frame(sidebar, bg="#1A3209")
         self.summary_frame.pack(fill=tk.BOTH, expand=True, padx=8)
+        self._summary_rows = {}     # crop -> (row frame, count label)
+        self.empty_lbl = tk.Label(
+            self.summary_frame, text="Nothing planted yet.",
+            bg="#1A3209", fg="#6A9E6A",
+            font=("Helvetica", 9, "italic"),
+        )
 
         ttk.Separator(sidebar, orient="horizontal").pack(fill=tk.X, padx=8, pady=6)
         self.stats_lbl = tk.Label(
@@ -246,195 +729,311 @@ class GardenPlannerApp:
         )
         self.stats_lbl.pack(anchor="w", pady=(0, 10))
 
-    # ─── Grid Drawing ─────────────────────────────────────────────────────────
-
-    def _init_grid(self):
-        self.grid_data = {
-            (r, c): None
-            for r in range(self.rows)
-            for c in range(self.cols)
-            if self.cell_types.get((r, c), "garden") == "garden"
-        }
-
-    def _is_garden(self, r, c):
-        """True if (r, c) is inside the grid and has surface type 'garden'."""
-        if not (0 <= r < self.rows and 0 <= c < self.cols):
-            return False
-        return self.cell_types.get((r, c), "garden") == "garden"
+    @_timed("update_selection")
+    def _update_selection_stats(self):
+        if not self.selection:
+            self.selection_lbl.configure(
+                text="Shift+drag to select squares, or Shift+drag along the "
+                     "row or column numbers for whole rows or columns."
+            )
+            return
+        r0, r1, c0, c1 = self.selection
+        st = self.garden.region_stats(r0, r1, c0, c1)
 
-    def _draw_grid(self):
-        self.canvas.delete("all")
-        SZ = CELL_SIZE
+        def span(a, b):
+            return f"{a + 1}" if b - a == 1 else f"{a + 1}–{b}"
 
-        total_w = self.cols * SZ + PAD * 2
-        total_h = self.rows * SZ + PAD * 2
-        self.canvas.configure(scrollregion=(0, 0, total_w, total_h))
-
-        # Draw each cell
-        for r in range(self.rows):
-            for c in range(self.cols):
-                surface = self.cell_types.get((r, c), "garden")
-                x1 = PAD + c * SZ
-                y1 = PAD + r * SZ
-                x2 = x1 + SZ
-                y2 = y1 + SZ
-
-                if surface != "garden":
-                    # Non-garden surface cell
-                    sdata = SURFACE_DATA[surface]
-                    color = sdata["color"]
-                    self.canvas.create_rectangle(
-                        x1, y1, x2, y2,
-                        fill=color, outline="#C0C0C0", width=1,
-                        tags="cell",
-                    )
-                    txt = _text_color(color)
-                    cx, cy = x1 + SZ // 2, y1 + SZ // 2
-                    if sdata["icon"]:
-                        self.canvas.create_text(
-                            cx, cy - 8, text=sdata["icon"],
-                            font=("Segoe UI Emoji", 16), fill=txt,
-                        )
-                    name = surface.capitalize()
-                    self.canvas.create_text(
-                        cx, cy + 16, text=name,
-                        font=("Helvetica", 8), fill=txt,
-                    )
-                else:
-                    # Garden cell — show crop or empty
-                    crop  = self.grid_data.get((r, c))
-                    color = CROP_DATA[crop]["color"] if crop else EMPTY_COLOR
-                    self.canvas.create_rectangle(
-                        x1, y1, x2, y2,
-                        fill=color, outline=GRID_LINE_COLOR, width=1,
-                        tags="cell",
-                    )
-                    txt = _text_color(color)
-                    cx, cy = x1 + SZ // 2, y1 + SZ // 2
-                    if crop:
-                        icon  = CROP_DATA[crop]["icon"]
-                        n     = CROP_DATA[crop]["plants_per_sqft"]
-                        label = crop if len(crop) <= 10 else crop[:9] + "."
-                        self.canvas.create_text(
-                            cx, cy - 22, text=icon,
-                            font=("Segoe UI Emoji", 14), fill=txt,
-                        )
-                        self.canvas.create_text(
-                            cx, cy - 2, text=label,
-                            font=("Helvetica", 8, "bold"), fill=txt,
-                        )
-                        self.canvas.create_text(
-                            cx, cy + 14, text=f"× {n}",
-                            font=("Helvetica", 8), fill=txt,
-                        )
-                    else:
-                        self.canvas.create_text(
-                            x1 + 5, y1 + 5, text=f"{r+1},{c+1}",
-                            font=("Helvetica", 6), fill=txt, anchor="nw",
-                        )
-
-                    # Note indicator — top-right corner
-                    if (r, c) in self.notes:
-                        self.canvas.create_text(
-                            x2 - 4, y1 + 4, text="📝",
-                            font=("Segoe UI Emoji", 9), fill=txt, anchor="ne",
-                        )
-
-                    # Irrigation indicator — bottom-left corner
-                    irr_icons  = {"drip": "💧", "spray": "🌧️"}
-                    irr = self.irrigation.get((r, c))
-                    if irr in irr_icons:
-                        self.canvas.create_text(
-                            x1 + 4, y2 - 4, text=irr_icons[irr],
-                            font=("Segoe UI Emoji", 9), fill=txt, anchor="sw",
-                        )
-
-                    # Soil indicator — bottom-right corner
-                    soil_icons = {
-                        "composted":        "♻️",
-                        "fertilized":       "⚡",
-                        "needs_compost":    "🟤",
-                        "needs_fertilizer": "⚠️",
-                    }
-                    soil = self.soil.get((r, c))
-                    if soil in soil_icons:
-                        self.canvas.create_text(
-                            x2 - 4, y2 - 4, text=soil_icons[soil],
-                            font=("Segoe UI Emoji", 9), fill=txt, anchor="se",
-                        )
-
-        # Raised-bed border: draw thick brown line on edges adjacent to
-        # non-garden cells or grid boundary.
-        BORDER_COLOR = "#3E2107"
-        BORDER_W = 5
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if not self._is_garden(r, c):
-                    continue
-                x1 = PAD + c * SZ
-                y1 = PAD + r * SZ
-                x2 = x1 + SZ
-                y2 = y1 + SZ
-                if not self._is_garden(r - 1, c):  # top
-                    self.canvas.create_line(x1, y1, x2, y1, fill=BORDER_COLOR, width=BORDER_W)
-                if not self._is_garden(r + 1, c):  # bottom
-                    self.canvas.create_line(x1, y2, x2, y2, fill=BORDER_COLOR, width=BORDER_W)
-                if not self._is_garden(r, c - 1):  # left
-                    self.canvas.create_line(x1, y1, x1, y2, fill=BORDER_COLOR, width=BORDER_W)
-                if not self._is_garden(r, c + 1):  # right
-                    self.canvas.create_line(x2, y1, x2, y2, fill=BORDER_COLOR, width=BORDER_W)
-
-        # Row numbers (left)
-        for r in range(self.rows):
-            self.canvas.create_text(
-                PAD - 12, PAD + r * SZ + SZ // 2,
-                text=str(r + 1),
-                font=("Helvetica", 8, "bold"), fill="#F5F5DC", anchor="e",
-            )
+        lines = [
+            f"Rows {span(r0, r1)} × Cols {span(c0, c1)}  ({st['cells']} squares)",
+            f"Garden {st['garden']}  ·  planted {st['planted']} ({st['percent']}%)  ·  "
+            f"{st['plants']} plants",
+        ]
+        crops = sorted(st["crops"].items(), key=lambda kv: (-kv[1][0], kv[0]))
+        for crop, (n, plants) in crops[:8]:
+            lines.append(f"   {crop}: {n} sq · {plants} plants")
+        if len(crops) > 8:
+            lines.append(f"   … and {len(crops) - 8} more crops")
+        for label, counts in (("Irrigation", st["irrigation"]), ("Soil", st["soil"])):
+            if counts:
+                lines.append(
+                    f"{label}: " + ", ".join(f"{v.replace('_', ' ')} {n}" for v, n in counts.items())
+                )
+        self.selection_lbl.configure(text="\n".join(lines))
 
-        # Column numbers (top)
-        for c in range(self.cols):
-            self.canvas.create_text(
-                PAD + c * SZ + SZ // 2, PAD - 12,
-                text=str(c + 1),
-                font=("Helvetica", 8, "bold"), fill="#F5F5DC", anchor="s",
-            )
+    # ─── Grid Drawing ─────────────────────────────────────────────────────────
 
+    @_timed("draw_grid")
+    def _draw_grid(self):
+        """Full redraw — used when the grid's shape or contents change wholesale."""
+        self._dirty_cells.clear()
+        self.companions.take_dirty()
+        self.renderer.rebuild()
         self._draw_hover_highlight()
+        if self.selection and not (
+            self.selection[1] <= self.model.rows and self.selection[3] <= self.model.cols
+        ):
+            self.selection = None   # the bed shrank past it
+        self._draw_selection()
+
+    def _refresh_cells(self, *cells):
+        """Queue the given cells (and the bed borders around them) for repaint.
+
+        The sidebar is refreshed in the same pass.
+        """
+        self._dirty_cells.update(cells)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_id is None:
+            self._flush_id = self.root.after_idle(self._flush)
+
+    @_timed("flush")
+    def _flush(self):
+        """Apply everything queued since the last idle tick in one pass."""
+        self._flush_id = None
+        if self._dirty_cells:
+            cells, self._dirty_cells = self._dirty_cells, set()
+            # Neighbours whose conflict highlight came or went
+            cells |= self.companions.take_dirty()
+            self.renderer.refresh_cells(cells)
+            self._update_sidebar()
+            if self.journal.error and not self._autosave_warned:
+                self._autosave_warned = True
+                self.status_var.set(f"Autosave failed: {self.journal.error}")
+        if self._hover_pending:
+            self._hover_pending = False
+            cell = self._hover_target
+            if cell != self.hovered_cell:
+                self.hovered_cell = cell
+                self._draw_hover_highlight()
+            self._show_cell_status(cell)
 
     # ─── Canvas Interaction ───────────────────────────────────────────────────
 
     def _cell_from_event(self, event):
         cx = self.canvas.canvasx(event.x)
         cy = self.canvas.canvasy(event.y)
-        col = int((cx - PAD) // CELL_SIZE)
-        row = int((cy - PAD) // CELL_SIZE)
-        if 0 <= row < self.rows and 0 <= col < self.cols:
+        SZ = self.renderer.cell_size
+        col = int((cx - PAD) // SZ)
+        row = int((cy - PAD) // SZ)
+        if self.model.in_bounds(row, col):
             return row, col
         return None
 
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            step = -1
+        else:
+            step = 1
+        if event.state & 0x0004:    # Ctrl held — zoom around the pointer
+            self._zoom(-step, event)
+        elif event.state & 0x0001:  # Shift held — scroll sideways
+            self.canvas.xview_scroll(step, "units")
+        else:
+            self.canvas.yview_scroll(step, "units")
+
+    def _zoom(self, direction, event=None):
+        """Step the zoom in (+1) or out (-1) through ZOOM_LEVELS; 0 resets.
+
+        The grid point under the mouse (or the middle of the view, for
+        menu and keyboard zooms) stays put on screen.
+        """
+        old = self.renderer.cell_size
+        if direction == 0:
+            new = CELL_SIZE
+        elif direction > 0:
+            new = next((z for z in ZOOM_LEVELS if z > old), old)
+        else:
+            new = next((z for z in reversed(ZOOM_LEVELS) if z < old), old)
+        if new == old:
+            return
+
+        cv = self.canvas
+        if event is not None:
+            sx, sy = event.x, event.y
+        else:
+            sx, sy = cv.winfo_width() // 2, cv.winfo_height() // 2
+        gx = (cv.canvasx(sx) - PAD) / old
+        gy = (cv.canvasy(sy) - PAD) / old
+
+        self.renderer.set_cell_size(new)
+        self.renderer.update_scrollregion()
+        total_w = self.model.cols * new + PAD * 2
+        total_h = self.model.rows * new + PAD * 2
+        cv.xview_moveto(max(0.0, (PAD + gx * new - sx) / total_w))
+        cv.yview_moveto(max(0.0, (PAD + gy * new - sy) / total_h))
+        self._draw_grid()
+        self.status_var.set(f"Zoom: {round(100 * new / CELL_SIZE)}%")
+
+    @_timed("on_click")
     def _on_click(self, event):
         cell = self._cell_from_event(event)
+        tool = self.tool.get()
+        if tool == "fill":
+            if cell:
+                self._fill_at(*cell)
+            return
+        if tool == "rect":
+            self._rect_anchor = cell
+            self._draw_rect_preview(cell)
+            return
+        self._drag_last = cell
         if cell:
-            r, c = cell
-            if self.cell_types.get((r, c), "garden") != "garden":
-                return  # can't plant on non-garden surfaces
-            self.grid_data[(r, c)] = self.selected_crop.get()
+            self._paint_cell(*cell)
+
+    @_timed("on_drag")
+    def _on_drag(self, event):
+        """Paint the selected crop on every square the pointer sweeps over."""
+        if self._select_anchor is not None:
+            self._drag_select(event)
+            return
+        if self._rect_anchor is not None:
+            self._draw_rect_preview(self._grid_point(event)[:2])
+            return
+        if self.tool.get() != "paint":
+            return
+        cell = self._cell_from_event(event)
+        self._on_hover(event)
+        if cell and self._drag_last:
+            # Fast drags skip squares between motion events; fill them in
+            for r, c in _cells_between(self._drag_last, cell):
+                self._paint_cell(r, c)
+        elif cell:
+            self._paint_cell(*cell)
+        self._drag_last = cell
+
+    @_timed("end_drag")
+    def _end_drag(self, event):
+        if self._select_anchor is not None:
+            self._select_anchor = None
+            return
+        if self._rect_anchor is not None:
+            self._fill_rect(self._rect_anchor, self._grid_point(event)[:2])
+            return
+        if self.tool.get() != "paint":
+            return
+        # A click or a whole drag is one undo step
+        self._drag_last = None
+        self.history.commit("Plant")
+
+    # ── Region selection ─────────────────────────────────────────────────────
+
+    def _grid_point(self, event):
+        """Return (row, col, where) for the pointer, clamped to the bed;
+        *where* is "rows" or "cols" over the row or column numbers, "all"
+        over the corner between them, else "cells"."""
+        cx = self.canvas.canvasx(event.x)
+        cy = self.canvas.canvasy(event.y)
+        SZ = self.renderer.cell_size
+        row = min(max(int((cy - PAD) // SZ), 0), self.model.rows - 1)
+        col = min(max(int((cx - PAD) // SZ), 0), self.model.cols - 1)
+        where = {(True, True): "all", (True, False): "rows", (False, True): "cols"}.get(
+            (cx < PAD, cy < PAD), "cells"
+        )
+        return row, col, where
+
+    def _start_select(self, event):
+        """Shift+click starts a selection: a rectangle of squares, or a band
+        of whole rows or columns when started on their numbers."""
+        self._select_anchor = self._grid_point(event)
+        self._drag_select(event)
+
+    def _drag_select(self, event):
+        ar, ac, where = self._select_anchor
+        row, col, _ = self._grid_point(event)
+        r0, r1 = min(ar, row), max(ar, row) + 1
+        c0, c1 = min(ac, col), max(ac, col) + 1
+        if where in ("rows", "all"):
+            c0, c1 = 0, self.model.cols
+        if where in ("cols", "all"):
+            r0, r1 = 0, self.model.rows
+        if (r0, r1, c0, c1) != self.selection:
+            self._select((r0, r1, c0, c1))
+
+    def _select_all(self):
+        self._select((0, self.model.rows, 0, self.model.cols))
+
+    def _select(self, region):
+        """Select rows r0..r1, cols c0..c1 of *region* (half-open), or
+        nothing with None."""
+        self.selection = region
+        self._draw_selection()
+        self._update_selection_stats()
+
+    def _draw_selection(self):
+        self.canvas.delete("selection")
+        if self.selection:
+            r0, r1, c0, c1 = self.selection
+            SZ = self.renderer.cell_size
+            self.canvas.create_rectangle(
+                PAD + c0 * SZ, PAD + r0 * SZ, PAD + c1 * SZ, PAD + r1 * SZ,
+                outline=SELECT_COLOR, width=2, dash=(6, 4), tags="selection",
+            )
+
+    # ── Fill and rectangle tools ─────────────────────────────────────────────
+
+    def _refresh_tool_hint(self, *_):
+        self.tool_hint.configure(text=next(h for v, _, h in TOOLS if v == self.tool.get()))
+
+    def _fill_at(self, r, c):
+        """Plant the selected crop on the connected squares sharing (r, c)'s crop."""
+        crop = self.selected_crop.get()
+        if not self.model.is_garden(r, c) or self.model.crop_at(r, c) == crop:
+            return
+        self._apply_fill("Fill", flood_region(self.model, "crop", r, c), crop)
+
+    def _fill_rect(self, a, b):
+        self._rect_anchor = None
+        self.canvas.delete("rect_preview")
+        if a is None:
+            return
+        (r0, r1), (c0, c1) = (sorted(pair) for pair in zip(a, b))
+        runs = rect_runs(self.model, r0, r1 + 1, c0, c1 + 1)
+        self._apply_fill("Rectangle", runs, self.selected_crop.get())
+
+    def _draw_rect_preview(self, cell):
+        self.canvas.delete("rect_preview")
+        if self._rect_anchor is None or cell is None:
+            return
+        (r0, r1), (c0, c1) = (sorted(pair) for pair in zip(self._rect_anchor, cell))
+        SZ = self.renderer.cell_size
+        self.canvas.create_rectangle(
+            PAD + c0 * SZ, PAD + r0 * SZ, PAD + (c1 + 1) * SZ, PAD + (r1 + 1) * SZ,
+            outline=HOVER_COLOR, width=2, dash=(4, 3), tags="rect_preview",
+        )
+        self.status_var.set(f"Rectangle: {r1 - r0 + 1} × {c1 - c0 + 1} squares")
+
+    @_timed("fill")
+    def _apply_fill(self, label, runs, crop):
+        """Plant *crop* over *runs* as one undo step and one repaint."""
+        n = self.model.fill("crop", runs, crop)
+        self.history.commit(label)
+        if n > History.BULK_APPLY:
+            # Written as one bulk change: redraw what is in view
             self._draw_grid()
             self._update_sidebar()
+        else:
+            cols = self.model.cols
+            self._refresh_cells(*(divmod(i, cols) for run in runs for i in run))
+        self.status_var.set(f"{label}: {crop}")
+
+    def _paint_cell(self, r, c):
+        # Non-garden surfaces can't be planted; plant() leaves them alone
+        if self.garden.plant(r, c, self.selected_crop.get()):
+            self._refresh_cells((r, c))
 
     def _on_double_click(self, event):
         cell = self._cell_from_event(event)
         if cell:
             r, c = cell
-            _NoteDialog(self.root, r, c, self.notes, self._draw_grid)
+            _NoteDialog(self.root, r, c, self.model, lambda: self._edited("Edit Note", (r, c)))
 
     def _on_right_click(self, event):
         cell = self._cell_from_event(event)
         if not cell:
             return
         r, c = cell
-        surface = self.cell_types.get((r, c), "garden")
+        surface = self.model.surface_at(r, c)
 
         menu = tk.Menu(self.root, tearoff=0)
 
@@ -470,61 +1069,73 @@ class GardenPlannerApp:
         menu.tk_popup(event.x_root, event.y_root)
 
     def _set_surface(self, r, c, surface):
-        if surface == "garden":
-            self.cell_types.pop((r, c), None)
-            # Ensure grid_data entry exists for this garden cell
-            if (r, c) not in self.grid_data:
-                self.grid_data[(r, c)] = None
-        else:
-            self.cell_types[(r, c)] = surface
-            # Remove crop data for non-garden cells
-            self.grid_data.pop((r, c), None)
-            self.notes.pop((r, c), None)
-            self.irrigation.pop((r, c), None)
-            self.soil.pop((r, c), None)
-        self._draw_grid()
-        self._update_sidebar()
+        # Non-garden cells lose their crop, note and tags
+        self.garden.set_surface(r, c, surface)
+        self._edited("Set Surface", (r, c))
 
     def _clear_square(self, r, c):
-        self.grid_data[(r, c)] = None
-        self._draw_grid()
-        self._update_sidebar()
+        if self.garden.plant(r, c, None):
+            self._edited("Clear Square", (r, c))
 
     def _set_irrigation(self, r, c, value):
-        if value is None:
-            self.irrigation.pop((r, c), None)
-        else:
-            self.irrigation[(r, c)] = value
-        self._draw_grid()
+        self.garden.set_irrigation(r, c, value)
+        self._edited("Set Irrigation", (r, c))
 
     def _set_soil(self, r, c, value):
-        if value is None:
-            self.soil.pop((r, c), None)
+        self.garden.set_soil(r, c, value)
+        self._edited("Set Soil", (r, c))
+
+    def _edited(self, label, *cells):
+        """Repaint *cells* and close the undo step for the action *label*."""
+        self.history.commit(label)
+        self._refresh_cells(*cells)
+
+    # ─── Undo / Redo ──────────────────────────────────────────────────────────
+
+    @_timed("undo")
+    def _undo(self):
+        self._replay(self.history.undo(), "Undo", "Nothing to undo")
+
+    @_timed("redo")
+    def _redo(self):
+        self._replay(self.history.redo(), "Redo", "Nothing to redo")
+
+    def _replay(self, result, verb, empty):
+        if result is None:
+            self.status_var.set(empty)
+            return
+        label, cells = result
+        if cells is None:
+            self._draw_grid()
+            self._update_sidebar()
         else:
-            self.soil[(r, c)] = value
-        self._draw_grid()
+            self._refresh_cells(*cells)
+        self.status_var.set(f"{verb}: {label}" if label else verb)
 
+    @_timed("on_hover")
     def _on_hover(self, event):
-        cell = self._cell_from_event(event)
-        if cell != self.hovered_cell:
-            self.hovered_cell = cell
-            self._draw_hover_highlight()
+        self._hover_target  = self._cell_from_event(event)
+        self._hover_pending = True
+        self._schedule_flush()
 
+    def _show_cell_status(self, cell):
         if cell:
             r, c = cell
-            surface = self.cell_types.get((r, c), "garden")
+            surface = self.model.surface_at(r, c)
             if surface != "garden":
                 self.status_var.set(
                     f"Row {r+1}, Col {c+1}  ·  {surface.capitalize()}"
                 )
             else:
-                crop = self.grid_data.get(cell)
+                crop = self.model.crop_at(r, c)
                 if crop:
                     n  = CROP_DATA[crop]["plants_per_sqft"]
                     sp = CROP_DATA[crop]["spacing"]
+                    clashes = self.companions.conflicting(self.model.index(r, c))
                     self.status_var.set(
                         f"Row {r+1}, Col {c+1}  ·  {crop}  ·  "
                         f"{n} plant(s)/sqft  ·  Spacing: {sp}"
+                        + (f"  ·  ⚠ Bad neighbour: {', '.join(clashes)}" if clashes else "")
                     )
                 else:
                     self.status_var.set(
@@ -535,18 +1146,19 @@ class GardenPlannerApp:
             self.status_var.set("Ready")
 
     def _clear_hover(self):
-        self.hovered_cell = None
-        self._draw_hover_highlight()
-        self.status_var.set("Ready")
+        self._hover_target  = None
+        self._hover_pending = True
+        self._schedule_flush()
 
     def _draw_hover_highlight(self):
         self.canvas.delete("hover")
-        if self.hovered_cell:
+        if self.hovered_cell and self.model.in_bounds(*self.hovered_cell):
             r, c = self.hovered_cell
-            x1 = PAD + c * CELL_SIZE
-            y1 = PAD + r * CELL_SIZE
+            SZ = self.renderer.cell_size
+            x1 = PAD + c * SZ
+            y1 = PAD + r * SZ
             self.canvas.create_rectangle(
-                x1, y1, x1 + CELL_SIZE, y1 + CELL_SIZE,
+                x1, y1, x1 + SZ, y1 + SZ,
                 outline=HOVER_COLOR, width=3, tags="hover",
             )
 
@@ -562,55 +1174,86 @@ class GardenPlannerApp:
             text=f"{d['plants_per_sqft']} plant(s)/sqft  ·  Spacing: {d['spacing']}"
         )
 
+    @_timed("update_sidebar")
     def _update_sidebar(self):
-        for w in self.summary_frame.winfo_children():
-            w.destroy()
-
-        # Tally planted squares per crop
-        counts = {}
-        for crop in self.grid_data.values():
-            if crop:
-                counts[crop] = counts.get(crop, 0) + 1
+        """Bring the planted summary in line with the tally.
+
+        Only rows for crops whose totals changed are touched; a row is
+        created when a crop is first planted and removed when its last
+        square is cleared.
+        """
+        tally = self.tally
+        rows  = self._summary_rows
+        dirty = tally.take_dirty()
+        dirty.update(crop for crop in rows if crop not in tally.squares)
+
+        for crop in dirty:
+            squares = tally.squares.get(crop, 0)
+            if not squares:
+                if crop in rows:
+                    rows.pop(crop)[0].destroy()
+                continue
+            total = squares * CROP_DATA[crop]["plants_per_sqft"]
+            text  = f"{squares} sq · {total} plants"
+            if crop in rows:
+                rows[crop][1].configure(text=text)
+                continue
+
+            row = tk.Frame(self.summary_frame, bg="#1A3209")
+            # Keep rows in alphabetical order
+            after = [c for c in rows if c > crop]
+            if after:
+                row.pack(fill=tk.X, pady=2, before=rows[min(after)][0])
+            else:
+                row.pack(fill=tk.X, pady=2)
 
-        if not counts:
+            tk.Label(row, width=3, bg=CROP_DATA[crop]["color"],
+                     relief="solid", bd=1).pack(side=tk.LEFT, padx=(0, 5))
             tk.Label(
-                self.summary_frame, text="Nothing planted yet.",
-                bg="#1A3209", fg="#6A9E6A",
-                font=("Helvetica", 9, "italic"),
-            ).pack(pady=10)
+                row, text=crop, bg="#1A3209", fg="#F5F5DC",
+                font=("Helvetica", 9, "bold"), anchor="w",
+            ).pack(side=tk.LEFT)
+            count_lbl = tk.Label(
+                row, text=text,
+                bg="#1A3209", fg="#81C784",
+                font=("Helvetica", 8),
+            )
+            count_lbl.pack(side=tk.RIGHT)
+            rows[crop] = (row, count_lbl)
+
+        if rows:
+            self.empty_lbl.pack_forget()
         else:
-            for crop in sorted(counts):
-                squares = counts[crop]
-                total   = squares * CROP_DATA[crop]["plants_per_sqft"]
-                row = tk.Frame(self.summary_frame, bg="#1A3209")
-                row.pack(fill=tk.X, pady=2)
+            self.empty_lbl.pack(pady=10)
 
-                tk.Label(row, width=3, bg=CROP_DATA[crop]["color"],
-                         relief="solid", bd=1).pack(side=tk.LEFT, padx=(0, 5))
-                tk.Label(
-                    row, text=crop, bg="#1A3209", fg="#F5F5DC",
-                    font=("Helvetica", 9, "bold"), anchor="w",
-                ).pack(side=tk.LEFT)
-                tk.Label(
-                    row, text=f"{squares} sq · {total} plants",
-                    bg="#1A3209", fg="#81C784",
-                    font=("Helvetica", 8),
-                ).pack(side=tk.RIGHT)
-
-        # Stats footer — garden_sq counts only garden-type cells
-        total_grid = self.rows * self.cols
-        garden_sq  = len(self.grid_data)
-        planted_sq = sum(1 for v in self.grid_data.values() if v)
-        total_pl   = sum(
-            CROP_DATA[v]["plants_per_sqft"]
-            for v in self.grid_data.values() if v
-        )
-        pct = int(100 * planted_sq / garden_sq) if garden_sq else 0
+        # Stats footer — garden counts only garden-type cells
+        st = self.garden.stats()
+        comp = self.companions
         self.stats_lbl.configure(
             text=(
-                f"Garden: {garden_sq} sqft  ·  Total grid: {total_grid} cells\n"
-                f"Planted: {planted_sq}/{garden_sq} squares  ({pct}%)\n"
-                f"Total plants: {total_pl}"
+                f"Garden: {st['garden']} sqft  ·  Total grid: {st['cells']} cells\n"
+                f"Planted: {st['planted']}/{st['garden']} squares  ({st['percent']}%)\n"
+                f"Total plants: {st['plants']}\n"
+                f"Companions: {comp.score:+d}  ({comp.good} good, {comp.bad} bad pairs)"
+            )
+        )
+        self._update_project_totals()
+        self._update_selection_stats()
+
+    def _update_project_totals(self):
+        project = self.project
+        names = list(project.beds)
+        if list(self.bed_box.cget("values") or ()) != names:
+            self.bed_box.configure(values=names)
+        self.bed_var.set(project.active)
+        if len(names) == 1:
+            self.project_lbl.configure(text="One bed  ·  Garden → Add Bed… for more")
+            return
+        tot = project.totals()
+        self.project_lbl.configure(
+            text=(
+                f"{tot['beds']} beds  ·  {tot['garden']} sqft garden\n"
+                f"Planted {tot['planted']} squares ({tot['percent']}%)  ·  {tot['plants']} plants"
             )
         )
 
@@ -621,137 +1264,1048 @@ class GardenPlannerApp:
             "New Garden",
             "Start a new garden?\nUnsaved changes will be lost.",
         ):
-            self.current_file = None
-            self.rows, self.cols = 4, 8
-            self.cell_types = {}
-            self.notes      = {}
-            self.irrigation = {}
-            self.soil       = {}
-            self._init_grid()
+            self._settle_job()
+            self._set_garden(Garden(4, 8))
             self._draw_grid()
             self._update_sidebar()
-            self.root.title("Square Foot Garden Planner")
+            self._show_title()
+
+    # ─── Beds and Projects ────────────────────────────────────────────────────
+
+    def _show_title(self):
+        title = "Square Foot Garden Planner"
+        if self.project.path:
+            title += f" — {self.project.path} [{self.project.active}]"
+        elif self.garden.path:
+            title += f" — {self.garden.path}"
+        self.root.title(title)
+
+    def _switch_bed(self, name):
+        """Make bed *name* of the current project the one being edited."""
+        project = self.project
+        if name == project.active or name not in project.beds:
+            return
+        self._settle_job()
+        from_file = project.beds[name]["blob"] is None
+        try:
+            garden = project.open_bed(name)
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Open Bed", f"Could not open bed {name!r}:\n{e}")
+            self.bed_var.set(project.active)
+            return
+        self._set_garden(garden, recover=from_file)
+        self._draw_grid()
+        self._update_sidebar()
+        self._show_title()
+        self.status_var.set(f"Bed: {name}")
+
+    def _step_bed(self, step):
+        names = list(self.project.beds)
+        if len(names) > 1:
+            k = names.index(self.project.active)
+            self._switch_bed(names[(k + step) % len(names)])
+
+    def _add_bed(self):
+        dlg = _BedDialog(self.root, "Add Bed", f"Bed {len(self.project.beds) + 1}", (4, 8))
+        self.root.wait_window(dlg.top)
+        if dlg.result:
+            name, rows, cols = dlg.result
+            try:
+                name = self.project.add_bed(name, rows, cols)
+            except ValueError as e:
+                messagebox.showerror("Add Bed", str(e))
+                return
+            self._switch_bed(name)
+
+    def _add_layout_bed(self):
+        path = filedialog.askopenfilename(
+            filetypes=[("Garden layouts", f"*.json *{SQFT_EXT}"), ("All files", "*.*")],
+            title="Add Layout File as Bed",
+        )
+        if not path:
+            return
+        try:
+            name = self.project.add_layout(path)
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Add Bed", str(e))
+            return
+        self._switch_bed(name)
+
+    def _rename_bed(self):
+        dlg = _BedDialog(self.root, "Rename Bed", self.project.active)
+        self.root.wait_window(dlg.top)
+        if dlg.result:
+            try:
+                self.project.rename_bed(self.project.active, dlg.result[0])
+            except ValueError as e:
+                messagebox.showerror("Rename Bed", str(e))
+                return
+            self._update_project_totals()
+            self._show_title()
+
+    def _remove_bed(self):
+        project = self.project
+        if len(project.beds) == 1:
+            messagebox.showinfo("Remove Bed", "A project needs at least one bed.")
+            return
+        name = project.active
+        if not messagebox.askyesno(
+            "Remove Bed",
+            f"Remove bed {name!r} from the project?\n(Its layout file is not deleted.)",
+        ):
+            return
+        names = list(project.beds)
+        self._switch_bed(names[names.index(name) - 1] if names[0] != name else names[1])
+        if project.active != name:
+            project.remove_bed(name)
+            self._update_project_totals()
+
+    def _open_project(self):
+        if not self._keep_other_beds():
+            return
+        path = filedialog.askopenfilename(
+            filetypes=[("Garden projects", f"*{PROJECT_EXT}"), ("All files", "*.*")],
+            title="Open Garden Project",
+        )
+        if not path:
+            return
+        self._settle_job()
+        try:
+            project = Project.load(path)
+            if not project.beds:
+                project.add_bed("Bed 1")
+            name = project.last_active or next(iter(project.beds))
+            garden = project.open_bed(name)
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Open Project", str(e))
+            return
+        self.project = project
+        self._set_garden(garden, recover=True)
+        self._draw_grid()
+        self._update_sidebar()
+        self._show_title()
+        self.status_var.set(f"Opened project: {path}")
+
+    def _save_project_as(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=PROJECT_EXT,
+            filetypes=[("Garden project", f"*{PROJECT_EXT}"), ("All files", "*.*")],
+            title="Save Garden Project",
+        )
+        return bool(path) and self._save_project(path)
+
+    def _save_project(self, path):
+        """Save every bed with unsaved edits, then the project file, on the
+        file worker; return True if the save was started.
+
+        The worker writes copies taken now, as _write_json() does, so the
+        active bed can be edited while the files are written.
+        """
+        try:
+            plan = self.project.save_plan(path)
+        except ValueError as e:
+            messagebox.showerror("Save Error", str(e))
+            return False
+        return self._run_job(
+            f"Saving project {os.path.basename(plan['path'])}",
+            lambda task: Project.write_plan(plan, task),
+            lambda result, error: self._project_saved(plan, error),
+            keep=True,
+        )
+
+    def _project_saved(self, plan, error):
+        # Beds written before a failure or cancel stay saved
+        current = self.project.save_done(plan)
+        if error is None or current is not None:
+            self._journal_saved(self.garden.path, current is not False)
+        self._show_title()
+        self._update_project_totals()
+        if isinstance(error, Cancelled):
+            self.status_var.set(f"Project save cancelled; {plan['path']} was not changed")
+            return
+        if isinstance(error, (OSError, ValueError)):
+            messagebox.showerror("Save Error", str(error))
+            return
+        if error is not None:
+            raise error
+        later = "" if current is not False else "  ·  later edits not saved yet"
+        self.status_var.set(f"Saved project: {self.project.path}{later}")
 
     def _resize_garden(self):
-        dlg = _LayoutDialog(self.root, self.rows, self.cols, self.cell_types)
+        dlg = _LayoutDialog(self.root, self.model)
         self.root.wait_window(dlg.top)
         if dlg.result:
-            nr, nc, new_types = dlg.result
-            old = self.grid_data.copy()
-            self.rows, self.cols = nr, nc
-            self.cell_types = new_types
-            self._init_grid()
-            for (r, c), crop in old.items():
-                if r < nr and c < nc and crop:
-                    if self.cell_types.get((r, c), "garden") == "garden":
-                        self.grid_data[(r, c)] = crop
-            self.notes      = {(r, c): v for (r, c), v in self.notes.items()      if r < nr and c < nc and self.cell_types.get((r, c), "garden") == "garden"}
-            self.irrigation = {(r, c): v for (r, c), v in self.irrigation.items() if r < nr and c < nc and self.cell_types.get((r, c), "garden") == "garden"}
-            self.soil       = {(r, c): v for (r, c), v in self.soil.items()       if r < nr and c < nc and self.cell_types.get((r, c), "garden") == "garden"}
-            self._draw_grid()
-            self._update_sidebar()
+            self._apply_layout(*dlg.result)
+
+    @_timed("resize_garden")
+    def _apply_layout(self, rows, cols, surface):
+        self.garden.resize(rows, cols, surface)
+        self.history.commit("Edit Layout")
+        self._draw_grid()
+        self._update_sidebar()
+
+    def _shift_layout(self):
+        dlg = _OffsetsDialog(
+            self.root, "Shift Layout", ("Down:", "Right:"),
+            "Negative numbers shift up or left.\nSquares pushed past the edge are lost.",
+        )
+        self.root.wait_window(dlg.top)
+        if dlg.result:
+            self._transform("Shift Layout", lambda g: g.shift(*dlg.result))
+
+    def _extend_edges(self):
+        dlg = _OffsetsDialog(
+            self.root, "Extend or Trim Edges", ("Top:", "Bottom:", "Left:", "Right:"),
+            "Squares to add on each edge; negative numbers trim.",
+        )
+        self.root.wait_window(dlg.top)
+        if dlg.result:
+            self._transform("Extend Edges", lambda g: g.extend(*dlg.result))
+
+    def _crop_to_selection(self):
+        if not self.selection:
+            self.status_var.set("Crop to Selection: Shift+drag to select a region first")
+            return
+        region = self.selection
+        self._transform("Crop to Selection", lambda g: g.crop(*region))
+
+    @_timed("transform")
+    def _transform(self, label, change):
+        """Apply *change* (called with the Garden) as one undo step.
+
+        Transforms move every square's crop, surface, tags and note
+        together; see GridModel.reframe(), rotate() and mirror().
+        """
+        try:
+            change(self.garden)
+        except ValueError as e:
+            messagebox.showerror(label, str(e))
+            return
+        self.history.commit(label)
+        self.selection = None       # it no longer covers the same squares
+        self._draw_grid()
+        self._update_sidebar()
+        self.status_var.set(f"{label}: the bed is now {self.model.rows}×{self.model.cols}")
+
+    def _auto_plan(self):
+        dlg = _AutoPlanDialog(self.root, self.model)
+        self.root.wait_window(dlg.top)
+        if dlg.result:
+            self._apply_plan(dlg.result)
+
+    @_timed("auto_plan")
+    def _apply_plan(self, plan):
+        plan.apply(self.model)
+        self.history.commit("Auto-Plan")
+        self._draw_grid()
+        self._update_sidebar()
+        self.status_var.set(f"Auto-Plan: planted {len(plan)} squares, {plan.plants} plants")
 
     def _clear_all(self):
         if messagebox.askyesno("Clear All", "Remove all crops from the garden?\n(Layout shape will be kept.)"):
-            for key in self.grid_data:
-                self.grid_data[key] = None
-            self.notes      = {}
-            self.irrigation = {}
-            self.soil       = {}
+            self.garden.clear_all()
+            self.history.commit("Clear All")
             self._draw_grid()
             self._update_sidebar()
 
     # ─── File I/O ─────────────────────────────────────────────────────────────
 
     def _save_file(self):
-        if self.current_file:
-            self._write_json(self.current_file)
+        if self.project.path:
+            self._save_project(self.project.path)
+        elif self.garden.path:
+            self._write_json(self.garden.path)
         else:
             self._save_as()
 
     def _save_as(self):
         path = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("Garden layout", "*.json"), ("All files", "*.*")],
+            filetypes=[
+                ("Garden layout", "*.json"),
+                ("Compact binary layout", f"*{SQFT_EXT}"),
+                ("All files", "*.*"),
+            ],
             title="Save Garden Layout",
         )
         if path:
-            self.current_file = path
             self._write_json(path)
 
+    @_timed("save_file")
     def _write_json(self, path):
-        payload = {
-            "rows": self.rows,
-            "cols": self.cols,
-            "grid": {
-                f"{r},{c}": crop
-                for (r, c), crop in self.grid_data.items()
-                if crop
-            },
-            "cell_types": {f"{r},{c}": val  for (r, c), val  in self.cell_types.items()},
-            "notes":      {f"{r},{c}": note for (r, c), note in self.notes.items()},
-            "irrigation": {f"{r},{c}": val  for (r, c), val  in self.irrigation.items()},
-            "soil":       {f"{r},{c}": val  for (r, c), val  in self.soil.items()},
-        }
-        try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(payload, f, indent=2)
-            self.root.title(f"Square Foot Garden Planner — {path}")
-            self.status_var.set(f"Saved: {path}")
-        except OSError as e:
-            messagebox.showerror("Save Error", str(e))
+        """Save the bed to *path* on the file worker.
+
+        The worker writes a copy of the model taken now, so editing can go
+        on while the file is written.
+        """
+        snapshot = self.model.copy()
+        self._run_job(
+            f"Saving {os.path.basename(path)}",
+            lambda task: save_layout(snapshot, path, task),
+            lambda result, error: self._saved(path, snapshot, error),
+            keep=True,
+        )
+
+    def _saved(self, path, snapshot, error):
+        if isinstance(error, Cancelled):
+            self.status_var.set(f"Save cancelled; {path} was not changed")
+            return
+        if isinstance(error, OSError):
+            messagebox.showerror("Save Error", str(error))
+            return
+        if error is not None:
+            raise error
+        # Edits made while the file was being written are not in it
+        current = self.model.matches(snapshot)
+        self.garden.path = path
+        self.status_var.set(f"Saved: {path}" if current else f"Saved: {path}  ·  later edits not saved yet")
+        self.project.bed_saved(current)
+        self._show_title()
+        self._journal_saved(path, current)
+
+    def _journal_saved(self, path, current=True):
+        if not current:
+            # The journal must keep the newer edits: restart it on a snapshot
+            if self.journal.path == journal_path(path):
+                self.journal.compact()
+            else:
+                self._start_journal(base_saved=False, dirty=True)
+        # The saved file is now the journal's starting point
+        elif self.journal.path == journal_path(path):
+            self.journal.mark_saved()
+        else:
+            self._start_journal(base_saved=True)
 
     def _load_file(self):
         path = filedialog.askopenfilename(
-            filetypes=[("Garden layout", "*.json"), ("All files", "*.*")],
+            filetypes=[
+                ("Garden layouts", f"*.json *{SQFT_EXT}"),
+                ("All files", "*.*"),
+            ],
             title="Open Garden Layout",
         )
+        if path and self._keep_other_beds():
+            self._open_path(path)
+
+    def _open_path(self, path):
+        """Read the layout at *path* on the file worker, then show it."""
+        self._run_job(
+            f"Opening {os.path.basename(path)}",
+            lambda task: Garden.load(path, task),
+            lambda garden, error: self._opened(path, garden, error),
+        )
+
+    @_timed("load_file")
+    def _opened(self, path, garden, error):
+        if isinstance(error, Cancelled):
+            self.status_var.set(f"Open cancelled: {path}")
+            return
+        if isinstance(error, (OSError, ValueError, KeyError)):
+            messagebox.showerror("Load Error", str(error))
+            return
+        if error is not None:
+            raise error
+        self._set_garden(garden, recover=True)
+        self._draw_grid()
+        self._update_sidebar()
+        self._show_title()
+        self.status_var.set(f"Loaded: {path}")
+
+        skipped = self.garden.diagnostics
+        if skipped:
+            self.status_var.set(f"Loaded: {path}  ·  {len(skipped)} entries skipped")
+            lines = [f"{d.section} {d.key}: {d.message}".replace(" :", ":") for d in skipped[:15]]
+            if len(skipped) > 15:
+                lines.append(f"… and {len(skipped) - 15} more")
+            messagebox.showwarning(
+                "Load Warnings",
+                "Some entries could not be loaded and were skipped:\n\n" + "\n".join(lines),
+            )
+
+    # ─── Background File Jobs ─────────────────────────────────────────────────
+
+    def _run_job(self, label, work, done, keep=False):
+        """Run ``work(task)`` on the file worker.
+
+        Its outcome comes back on the Tk thread as ``done(result, error)``,
+        with error None on success.  Only one job runs at a time; *keep*
+        marks a job (a save) that is finished rather than cancelled when
+        the garden is replaced or the app closes.  Returns False if another
+        job is still running.
+        """
+        if self._job is not None:
+            self.root.bell()
+            self.status_var.set(f"Busy: {self._job['task'].label} — wait for it or press Cancel")
+            return False
+        task = Task(label)
+        self._job = {
+            "task": task, "future": self._io.submit(work, task), "done": done,
+            "keep": keep, "start": time.perf_counter(),
+        }
+        self.status_var.set(f"{label}…")
+        self._job_poll = self.root.after(IO_POLL_MS, self._poll_job)
+        return True
+
+    def _poll_job(self):
+        job = self._job
+        if not job["future"].done():
+            if time.perf_counter() - job["start"] >= IO_PROGRESS_SECS:
+                task = job["task"]
+                if not self._progress.winfo_ismapped():
+                    self._progress.pack(side=tk.RIGHT)
+                self._progress_bar.configure(value=int(task.fraction() * 1000))
+                if not task.cancelled:
+                    self.status_var.set(f"{task.label}…  {int(task.fraction() * 100)}%")
+            self._job_poll = self.root.after(IO_POLL_MS, self._poll_job)
+            return
+        self._job = self._job_poll = None
+        self._progress.pack_forget()
+        error = job["future"].exception()
+        job["done"](None if error else job["future"].result(), error)
+
+    def _cancel_job(self):
+        if self._job is not None:
+            self._job["task"].cancel()
+            self.status_var.set(f"{self._job['task'].label}: cancelling…")
+
+    def _settle_job(self):
+        """Bring a running job to its end now, before the garden is
+        replaced: a save is waited for, anything else is cancelled and
+        its result dropped."""
+        job = self._job
+        if job is None:
+            return
+        self.root.after_cancel(self._job_poll)
+        if job["keep"]:
+            wait([job["future"]])
+            self._poll_job()
+            return
+        job["task"].cancel()
+        self._job = self._job_poll = None
+        self._progress.pack_forget()
+        self.status_var.set(f"{job['task'].label}: cancelled")
+
+    # ─── Companion Planting ───────────────────────────────────────────────────
+
+    def _toggle_conflicts(self):
+        self.show_conflicts = self._conflicts_var.get()
+        self._draw_grid()
+
+    def _toggle_diagonal(self):
+        self.companion_diagonal = self._diagonal_var.get()
+        self._attach_companions()
+        self._draw_grid()
+        self._update_sidebar()
+
+    # ─── Instrumentation ──────────────────────────────────────────────────────
+
+    def _toggle_perf_overlay(self):
+        prof = self.profiler
+        if self.perf_overlay.get():
+            prof.enable(self.canvas)
+            prof.on_frame = self._show_perf
+            self._perf_label.configure(text=prof.overlay_text())
+            self._perf_label.place(x=8, y=8)
+        else:
+            prof.on_frame = None
+            self._perf_label.place_forget()
+            if prof.cprofile is None:   # a --profile session keeps recording
+                prof.disable()
+
+    def _show_perf(self):
+        self._perf_label.configure(text=self.profiler.overlay_text())
+
+    def _save_profile(self):
+        prof = self.profiler
+        if not prof.trace:
+            messagebox.showinfo(
+                "Performance Profile",
+                "Nothing has been recorded yet.\n"
+                "Turn on View → Performance Overlay, use the planner, then save.",
+            )
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Trace (Perfetto, chrome://tracing)", "*.json"), ("All files", "*.*")],
+            title="Save Performance Profile",
+        )
         if not path:
             return
         try:
-            with open(path, encoding="utf-8") as f:
-                data = json.load(f)
-            self.rows = int(data["rows"])
-            self.cols = int(data["cols"])
-            self.cell_types = {}
-            for key, val in data.get("cell_types", {}).items():
-                r, c = map(int, key.split(","))
-                if 0 <= r < self.rows and 0 <= c < self.cols and val in SURFACE_DATA:
-                    self.cell_types[(r, c)] = val
-            self._init_grid()
-            for key, crop in data.get("grid", {}).items():
-                r, c = map(int, key.split(","))
-                if (r, c) in self.grid_data and crop in CROP_DATA:
-                    self.grid_data[(r, c)] = crop
-            self.notes = {}
-            for key, note in data.get("notes", {}).items():
-                r, c = map(int, key.split(","))
-                if 0 <= r < self.rows and 0 <= c < self.cols:
-                    self.notes[(r, c)] = note
-            self.irrigation = {}
-            for key, val in data.get("irrigation", {}).items():
-                r, c = map(int, key.split(","))
-                if 0 <= r < self.rows and 0 <= c < self.cols:
-                    self.irrigation[(r, c)] = val
-            self.soil = {}
-            for key, val in data.get("soil", {}).items():
-                r, c = map(int, key.split(","))
-                if 0 <= r < self.rows and 0 <= c < self.cols:
-                    self.soil[(r, c)] = val
-            self.current_file = path
-            self._draw_grid()
-            self._update_sidebar()
-            self.root.title(f"Square Foot Garden Planner — {path}")
-            self.status_var.set(f"Loaded: {path}")
-        except (OSError, ValueError, KeyError) as e:
-            messagebox.showerror("Load Error", str(e))
+            written = prof.save(path)
+        except OSError as e:
+            messagebox.showerror("Save Error", str(e))
+            return
+        self.status_var.set("Profile saved: " + ", ".join(written))
+
+
+# ─── Grid Renderer ────────────────────────────────────────────────────────────
+
+class _GridRenderer:
+    """Draws the main garden grid and keeps it in sync with the app's data.
+
+    Only the cells inside the visible part of the canvas (plus a margin of
+    VIEW_MARGIN cells) are materialised as canvas items; sync_viewport()
+    adds and removes cells as the view scrolls, so the item count follows
+    the window size rather than the bed size.
+
+    For every materialised cell the renderer remembers the canvas item IDs
+    it created.  Raised-bed borders come from a BedOutline as merged runs,
+    one line item per run per visible grid line.  rebuild() starts from
+    scratch; refresh_cells() re-styles just the given cells and redraws the
+    grid lines the outline reports as changed, so a single edit costs a few
+    canvas operations no matter how big the bed is.
+    """
+
+    SLOTS = ("rect", "icon", "label", "count", "note", "irr", "soil")
+    VIEW_MARGIN = 2     # extra cells kept alive around the visible region
+
+    def __init__(self, canvas, app):
+        self.canvas = canvas
+        self.app    = app
+        self.profiler = app.profiler
+        self.set_cell_size(CELL_SIZE)
+        self._items = {}    # (row, col) -> {slot: item id}
+        self._specs = {}    # (row, col) -> {slot: spec} as last drawn
+        self._lines = {}    # ("h" | "v", k) -> (coords as drawn, [item ids])
+        self.outline = None
+        self._row_labels = {}   # row -> item id
+        self._col_labels = {}   # col -> item id
+        self._window = (0, 0, 0, 0)     # materialised rows/cols, half-open
+        # Hidden marker items that separate the cell, border and label layers
+        # so items created later can be slotted into the right place.
+        self._cells_top   = None
+        self._borders_top = None
+        self._sync_pending = None
+        self.styles = STYLES
+
+    # ── Full redraw ──────────────────────────────────────────────────────────
+
+    def rebuild(self):
+        cv = self.canvas
+        model = self.app.model
+        cv.delete("all")
+        self._items.clear()
+        self._specs.clear()
+        self._lines.clear()
+        self._row_labels.clear()
+        self._col_labels.clear()
+        self._window = (0, 0, 0, 0)
+        self.styles.refresh()
+        self.update_scrollregion()
+        if self.outline is None or self.outline.model is not model:
+            if self.outline is not None:
+                self.outline.model.observers.remove(self.outline)
+            self.outline = BedOutline(model)
+            model.observers.append(self.outline)
+        self.outline.take_dirty()
+
+        self._cells_top   = cv.create_line(0, 0, 0, 0, state="hidden")
+        self._borders_top = cv.create_line(0, 0, 0, 0, state="hidden")
+        self.sync_viewport()
+
+    def update_scrollregion(self):
+        model = self.app.model
+        SZ = self.cell_size
+        total_w = model.cols * SZ + PAD * 2
+        total_h = model.rows * SZ + PAD * 2
+        self.canvas.configure(scrollregion=(0, 0, total_w, total_h))
+
+    # ── Zoom and level of detail ─────────────────────────────────────────────
+
+    def set_cell_size(self, size):
+        """Change the zoom.  Takes effect on the next rebuild().
+
+        Also picks the level of detail: "full" draws icons, labels, counts,
+        coordinates and badges; "icons" keeps just the crop or surface icon;
+        "fill" draws only the cell colour and the bed borders.
+        """
+        self.cell_size = size
+        if size >= LOD_DETAIL:
+            self.lod = "full"
+        elif size >= LOD_ICONS:
+            self.lod = "icons"
+        else:
+            self.lod = "fill"
+        # In-cell text offsets are laid out for CELL_SIZE; scale them to fit
+        k = size / CELL_SIZE
+        self._off = {
+            name: round(v * k) for name, v in (
+                ("surface_icon", 8), ("surface_label", 16), ("crop_icon", 22),
+                ("crop_label", 2), ("crop_count", 14), ("coord", 5), ("badge", 4),
+            )
+        }
+        self._border_w = max(1, min(BORDER_W, size // 20))
+        self._conflict_w = max(2, size // 25)
+        # Label every row/column only while there is room for the digits
+        self._label_step = max(1, -(-16 // size))
+
+    # ── Viewport culling ─────────────────────────────────────────────────────
+
+    def schedule_sync(self, *_):
+        """Sync the viewport once the current burst of scroll events is done."""
+        if self._sync_pending is None:
+            self._sync_pending = self.canvas.after_idle(self.sync_viewport)
+
+    def _visible_window(self):
+        cv = self.canvas
+        model = self.app.model
+        SZ = self.cell_size
+        m = self.VIEW_MARGIN
+        x0 = cv.canvasx(0)
+        y0 = cv.canvasy(0)
+        x1 = x0 + cv.winfo_width()
+        y1 = y0 + cv.winfo_height()
+        r0 = max(0, int((y0 - PAD) // SZ) - m)
+        c0 = max(0, int((x0 - PAD) // SZ) - m)
+        r1 = max(r0, min(model.rows, int((y1 - PAD) // SZ) + 1 + m))
+        c1 = max(c0, min(model.cols, int((x1 - PAD) // SZ) + 1 + m))
+        return r0, r1, c0, c1
+
+    @_timed("sync_viewport")
+    def sync_viewport(self):
+        """Materialise the cells that scrolled into view and drop the rest."""
+        self._sync_pending = None
+        old = self._window
+        new = self._visible_window()
+        if new == old:
+            return
+        self._window = new
+
+        for cell in _rect_minus(old, new):
+            self._drop_cell(cell)
+        for cell in _rect_minus(new, old):
+            self._draw_cell(cell)
+
+        # Border items are clipped to the window, so every visible line may
+        # need new coordinates; unchanged ones cost no canvas calls.
+        for key in [k for k in self._lines if not self._line_in_window(k)]:
+            self._drop_line(key)
+        r0, r1, c0, c1 = new
+        for k in range(r0, r1 + 1):
+            self._draw_line(("h", k))
+        for k in range(c0, c1 + 1):
+            self._draw_line(("v", k))
+
+        self._sync_labels()
+
+    def _sync_labels(self):
+        cv = self.canvas
+        SZ = self.cell_size
+        step = self._label_step
+        r0, r1, c0, c1 = self._window
+
+        # Row numbers (left)
+        for r in [r for r in self._row_labels if not r0 <= r < r1]:
+            cv.delete(self._row_labels.pop(r))
+        for r in range(r0 + (-r0) % step, r1, step):
+            if r not in self._row_labels:
+                self._row_labels[r] = cv.create_text(
+                    PAD - 12, PAD + r * SZ + SZ // 2,
+                    text=str(r + 1),
+                    font=("Helvetica", 8, "bold"), fill="#F5F5DC", anchor="e",
+                )
+
+        # Column numbers (top)
+        for c in [c for c in self._col_labels if not c0 <= c < c1]:
+            cv.delete(self._col_labels.pop(c))
+        for c in range(c0 + (-c0) % step, c1, step):
+            if c not in self._col_labels:
+                self._col_labels[c] = cv.create_text(
+                    PAD + c * SZ + SZ // 2, PAD - 12,
+                    text=str(c + 1),
+                    font=("Helvetica", 8, "bold"), fill="#F5F5DC", anchor="s",
+                )
+
+    # ── Incremental updates ──────────────────────────────────────────────────
+
+    def refresh_cells(self, cells):
+        """Re-style the given cells; cells outside the window are skipped
+        and will be drawn fresh when they scroll into view."""
+        r0, r1, c0, c1 = self._window
+        for r, c in cells:
+            if r0 <= r < r1 and c0 <= c < c1:
+                self._draw_cell((r, c))
+        for key in self.outline.take_dirty():
+            if self._line_in_window(key):
+                self._draw_line(key)
+
+    # ── Cells ────────────────────────────────────────────────────────────────
+
+    def _cell_spec(self, r, c):
+        """Return {slot: spec} describing how cell (r, c) should look.
+
+        A rect spec is (x1, y1, x2, y2, fill, outline, width); a text spec
+        is (x, y, text, font, fill, anchor).  Slots that are absent draw
+        nothing.
+        """
+        SZ = self.cell_size
+        x1 = PAD + c * SZ
+        y1 = PAD + r * SZ
+        x2 = x1 + SZ
+        y2 = y1 + SZ
+        cx, cy = x1 + SZ // 2, y1 + SZ // 2
+        off = self._off
+        lod = self.lod
+        spec = {}
+
+        model  = self.app.model
+        styles = self.styles
+        i = r * model.cols + c
+        surface = model.surface[i]
+        crop = model.crop[i]
+        st = styles.surfaces[surface] if surface else styles.crops[crop]
+        txt = st["text"]
+        if self.app.show_conflicts and i in self.app.companions.conflicts:
+            spec["rect"] = (x1, y1, x2, y2, st["fill"], CONFLICT_COLOR, self._conflict_w)
+        else:
+            spec["rect"] = (x1, y1, x2, y2, st["fill"], st["outline"], 1)
+        if lod == "fill":
+            return spec
+        if lod == "icons":
+            if st["icon"]:
+                spec["icon"] = (cx, cy, st["icon"], st["icon_font"], txt, "center")
+            return spec
+
+        if surface:
+            # Non-garden surface cell
+            if st["icon"]:
+                spec["icon"] = (cx, cy - off["surface_icon"], st["icon"], st["icon_font"], txt, "center")
+            spec["label"] = (cx, cy + off["surface_label"], st["label"], st["label_font"], txt, "center")
+            return spec
+
+        # Garden cell — show crop or empty
+        if crop:
+            spec["icon"]  = (cx, cy - off["crop_icon"], st["icon"], st["icon_font"], txt, "center")
+            spec["label"] = (cx, cy - off["crop_label"], st["label"], st["label_font"], txt, "center")
+            spec["count"] = (cx, cy + off["crop_count"], st["count"], st["count_font"], txt, "center")
+        else:
+            d = off["coord"]
+            spec["label"] = (x1 + d, y1 + d, f"{r+1},{c+1}", st["label_font"], txt, "nw")
+
+        d = off["badge"]
+        # Note indicator — top-right corner
+        if i in model.notes:
+            spec["note"] = (x2 - d, y1 + d, NOTE_ICON, BADGE_FONT, txt, "ne")
+
+        # Irrigation indicator — bottom-left corner
+        irr = styles.irrigation[model.irrigation[i]]
+        if irr:
+            spec["irr"] = (x1 + d, y2 - d, irr, BADGE_FONT, txt, "sw")
+
+        # Soil indicator — bottom-right corner
+        soil = styles.soil[model.soil[i]]
+        if soil:
+            spec["soil"] = (x2 - d, y2 - d, soil, BADGE_FONT, txt, "se")
+
+        return spec
+
+    def _draw_cell(self, cell):
+        """Bring the canvas items for one cell in line with its current spec."""
+        cv = self.canvas
+        spec  = self._cell_spec(*cell)
+        old   = self._specs.get(cell, {})
+        items = self._items.setdefault(cell, {})
+
+        for slot in self.SLOTS:
+            want = spec.get(slot)
+            have = old.get(slot)
+            if want == have:
+                continue
+            item = items.get(slot)
+            if want is None:
+                cv.delete(item)
+                del items[slot]
+                continue
+
+            if slot == "rect":
+                x1, y1, x2, y2, fill, outline, width = want
+                if item is None:
+                    item = cv.create_rectangle(
+                        x1, y1, x2, y2,
+                        fill=fill, outline=outline, width=width, tags="cell",
+                    )
+                else:
+                    cv.itemconfigure(item, fill=fill, outline=outline, width=width)
+            else:
+                x, y, text, font, fill, anchor = want
+                if item is None:
+                    item = cv.create_text(
+                        x, y, text=text, font=font, fill=fill, anchor=anchor,
+                    )
+                else:
+                    if have[:2] != (x, y):
+                        cv.coords(item, x, y)
+                    cv.itemconfigure(item, text=text, font=font, fill=fill, anchor=anchor)
+
+            if slot not in items:
+                items[slot] = item
+                if self._cells_top is not None:
+                    cv.tag_lower(item, self._cells_top)
+
+        self._specs[cell] = spec
+
+    def _drop_cell(self, cell):
+        items = self._items.pop(cell, {})
+        if items:
+            self.canvas.delete(*items.values())
+        self._specs.pop(cell, None)
+
+    # ── Raised-bed borders ───────────────────────────────────────────────────
+
+    def _line_in_window(self, key):
+        kind, k = key
+        r0, r1, c0, c1 = self._window
+        if kind == "h":
+            return r0 <= k <= r1
+        return c0 <= k <= c1
+
+    def _draw_line(self, key):
+        """Bring the border items along one grid line up to date.
+
+        ("h", k) is the line along the top of row k and ("v", k) the line
+        along the left of column k.  Each merged run of the outline becomes
+        one line item, clipped to the materialised window.
+        """
+        kind, k = key
+        r0, r1, c0, c1 = self._window
+        SZ = self.cell_size
+        if kind == "h":
+            runs, lo, hi = self.outline.h[k], c0, c1
+        else:
+            runs, lo, hi = self.outline.v[k], r0, r1
+
+        coords = []
+        fixed = PAD + k * SZ
+        for a, b in runs[max(0, bisect_left(runs, (lo,)) - 1):]:
+            if a >= hi:
+                break
+            a, b = max(a, lo), min(b, hi)
+            if a < b:
+                a, b = PAD + a * SZ, PAD + b * SZ
+                coords.append((a, fixed, b, fixed) if kind == "h" else (fixed, a, fixed, b))
+
+        have, items = self._lines.get(key, ((), []))
+        if coords == have:
+            return
+        if not coords:
+            self._drop_line(key)
+            return
+        cv = self.canvas
+        for j, xy in enumerate(coords):
+            if j < len(items):
+                if j >= len(have) or have[j] != xy:
+                    cv.coords(items[j], *xy)
+                continue
+            item = cv.create_line(
+                *xy, fill=BORDER_COLOR, width=self._border_w, tags="border",
+            )
+            if self._borders_top is not None:
+                cv.tag_lower(item, self._borders_top)
+            items.append(item)
+        if len(items) > len(coords):
+            cv.delete(*items[len(coords):])
+            del items[len(coords):]
+        self._lines[key] = (coords, items)
+
+    def _drop_line(self, key):
+        _, items = self._lines.pop(key, ((), []))
+        if items:
+            self.canvas.delete(*items)
+
+
+class _TileCache:
+    """PhotoImage tiles keyed by their look, bounded by an LRU limit.
+
+    Tiles shown by at least one cell are pinned; once a tile is no longer
+    in use it joins the LRU queue and is discarded when the cache holds
+    more than *limit* tiles.  (Dropping an image still shown on the canvas
+    would blank those cells, hence the reference counts.)
+    """
+
+    def __init__(self, render, limit):
+        self._render = render
+        self.limit   = limit
+        self._tiles  = {}               # key -> PhotoImage
+        self._refs   = {}               # key -> cells currently showing it
+        self._idle   = OrderedDict()    # unused keys, least recent first
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def acquire(self, key):
+        img = self._tiles.get(key)
+        if img is None:
+            img = self._tiles[key] = self._render(key)
+        self._idle.pop(key, None)
+        self._refs[key] = self._refs.get(key, 0) + 1
+        return img
+
+    def release(self, key):
+        n = self._refs[key] - 1
+        if n:
+            self._refs[key] = n
+            return
+        del self._refs[key]
+        self._idle[key] = True
+        self._trim()
+
+    def release_all(self):
+        for key in self._refs:
+            self._idle[key] = True
+        self._refs.clear()
+        self._trim()
+
+    def _trim(self):
+        while len(self._tiles) > self.limit and self._idle:
+            key, _ = self._idle.popitem(last=False)
+            del self._tiles[key]
+
+
+class _TileRenderer(_GridRenderer):
+    """Renderer that shows each cell as a single pre-rasterised image item.
+
+    A tile is rendered once per look — crop or surface, note/irrigation/soil
+    badge combination and cell size — and shared by every cell that looks
+    the same, so a huge bed needs one canvas item per visible cell instead
+    of up to seven.  Plain Tk cannot draw text into a PhotoImage, so tiles
+    carry the fill colour plus small coloured corner pips in place of the
+    emoji badges; the status bar still describes the hovered square.
+    """
+
+    TILE_CACHE_SIZE = 512
+    PIP_COLORS = {
+        "note":             "#FFF59D",
+        "drip":             "#1E88E5",
+        "spray":            "#81D4FA",
+        "composted":        "#6D4C41",
+        "fertilized":       "#FDD835",
+        "needs_compost":    "#A1887F",
+        "needs_fertilizer": "#E53935",
+    }
+
+    def __init__(self, canvas, app):
+        super().__init__(canvas, app)
+        self.tiles = _TileCache(self._render_tile, self.TILE_CACHE_SIZE)
+
+    def rebuild(self):
+        self.tiles.release_all()    # rebuild() deletes every image item
+        super().rebuild()
+
+    def _tile_key(self, r, c):
+        model = self.app.model
+        i = r * model.cols + c
+        surface = model.surface[i]
+        size = self.cell_size
+        if surface:
+            return ("surface", surface, False, 0, 0, False, size)
+        conflict = self.app.show_conflicts and i in self.app.companions.conflicts
+        if self.lod == "fill":
+            # Too small for badge pips to be legible
+            return ("crop", model.crop[i], False, 0, 0, conflict, size)
+        return (
+            "crop", model.crop[i], i in model.notes,
+            model.irrigation[i], model.soil[i], conflict, size,
+        )
+
+    def _render_tile(self, key):
+        kind, code, note, irr, soil, conflict, size = key
+        st = (self.styles.surfaces if kind == "surface" else self.styles.crops)[code]
+        img = tk.PhotoImage(master=self.canvas, width=size, height=size)
+        img.put(st["fill"], to=(0, 0, size, size))
+        w = self._conflict_w if conflict else 1
+        for box in ((0, 0, size, w), (0, size - w, size, size),
+                    (0, 0, w, size), (size - w, 0, size, size)):
+            img.put(CONFLICT_COLOR if conflict else st["outline"], to=box)
+
+        pip = max(3, size // 8)
+        inset = max(2, size // 20)
+        if note:
+            img.put(self.PIP_COLORS["note"],
+                    to=(size - inset - pip, inset, size - inset, inset + pip))
+        if irr:
+            img.put(self.PIP_COLORS[IRRIGATION_VALUES[irr]],
+                    to=(inset, size - inset - pip, inset + pip, size - inset))
+        if soil:
+            img.put(self.PIP_COLORS[SOIL_VALUES[soil]],
+                    to=(size - inset - pip, size - inset - pip, size - inset, size - inset))
+        return img
+
+    def _draw_cell(self, cell):
+        key = self._tile_key(*cell)
+        old = self._specs.get(cell)
+        if old is not None and old["tile"] == key:
+            return
+        img = self.tiles.acquire(key)
+        items = self._items.setdefault(cell, {})
+        item = items.get("tile")
+        if item is None:
+            r, c = cell
+            item = self.canvas.create_image(
+                PAD + c * self.cell_size, PAD + r * self.cell_size,
+                image=img, anchor="nw", tags="cell",
+            )
+            self.canvas.tag_lower(item, self._cells_top)
+            items["tile"] = item
+        else:
+            self.canvas.itemconfigure(item, image=img)
+        if old is not None:
+            self.tiles.release(old["tile"])
+        self._specs[cell] = {"tile": key}
+
+    def _drop_cell(self, cell):
+        spec = self._specs.get(cell)
+        if spec is not None:
+            self.tiles.release(spec["tile"])
+        super()._drop_cell(cell)
+
+
+RENDERERS = {"vector": _GridRenderer, "tiles": _TileRenderer}
+
+
+def _cells_between(a, b):
+    """Yield the cells on a straight line from cell *a* to cell *b*, inclusive."""
+    (r0, c0), (r1, c1) = a, b
+    dr, dc = abs(r1 - r0), abs(c1 - c0)
+    sr = 1 if r1 >= r0 else -1
+    sc = 1 if c1 >= c0 else -1
+    err = dc - dr
+    while True:
+        yield r0, c0
+        if (r0, c0) == (r1, c1):
+            return
+        e2 = 2 * err
+        if e2 > -dr:
+            err -= dr
+            c0 += sc
+        if e2 < dc:
+            err += dc
+            r0 += sr
+
+
+def _rect_minus(a, b):
+    """Yield the (row, col) cells of window *a* that are not in window *b*.
+
+    Windows are (r0, r1, c0, c1) half-open row/column ranges.
+    """
+    r0, r1, c0, c1 = a
+    br0, br1, bc0, bc1 = b
+    for r in range(r0, r1):
+        if br0 <= r < br1 and bc0 < bc1:
+            for c in range(c0, min(c1, bc0)):
+                yield r, c
+            for c in range(max(c0, bc1), c1):
+                yield r, c
+        else:
+            for c in range(c0, c1):
+                yield r, c
 
 
 # ─── Note Dialog ──────────────────────────────────────────────────────────────
 
 class _NoteDialog:
-    def __init__(self, parent, row, col, notes, refresh_cb):
-        self.notes      = notes
+    def __init__(self, parent, row, col, model, refresh_cb):
+        self.model      = model
         self.key        = (row, col)
         self.refresh_cb = refresh_cb
 
@@ -773,7 +2327,7 @@ class _NoteDialog:
             font=("Helvetica", 10), wrap="word",
         )
         self.text_widget.pack(padx=16, pady=4)
-        existing = notes.get(self.key, "")
+        existing = model.note_at(row, col)
         if existing:
             self.text_widget.insert("1.0", existing)
 
@@ -785,30 +2339,130 @@ class _NoteDialog:
 
     def _save(self):
         note = self.text_widget.get("1.0", "end-1c").strip()
-        if note:
-            self.notes[self.key] = note
-        else:
-            self.notes.pop(self.key, None)
+        self.model.set_note(*self.key, note)
         self.refresh_cb()
         self.top.destroy()
 
     def _clear(self):
-        self.notes.pop(self.key, None)
+        self.model.set_note(*self.key, None)
         self.refresh_cb()
         self.top.destroy()
 
 
+# ─── Bed Dialog ───────────────────────────────────────────────────────────────
+
+class _BedDialog:
+    """Ask for a bed name and, given a default *size*, its rows and columns.
+
+    ``result`` is (name, rows, cols), or None if cancelled.
+    """
+
+    def __init__(self, parent, title, name, size=None):
+        self.result = None
+        self.top = tk.Toplevel(parent)
+        self.top.title(title)
+        self.top.resizable(False, False)
+        self.top.grab_set()
+        self.top.configure(bg="#2D5016")
+
+        form = tk.Frame(self.top, bg="#2D5016")
+        form.pack(padx=16, pady=(12, 4))
+        tk.Label(form, text="Name:", bg="#2D5016", fg="#F5F5DC",
+                 font=("Helvetica", 10)).grid(row=0, column=0, sticky="w")
+        self.name_var = tk.StringVar(value=name)
+        entry = ttk.Entry(form, textvariable=self.name_var, width=24)
+        entry.grid(row=0, column=1, columnspan=3, pady=2, sticky="w")
+        entry.focus_set()
+
+        self.size = size
+        if size is not None:
+            self.rows_var = tk.IntVar(value=size[0])
+            self.cols_var = tk.IntVar(value=size[1])
+            for col, (label, var) in enumerate((("Rows:", self.rows_var), ("Cols:", self.cols_var))):
+                tk.Label(form, text=label, bg="#2D5016", fg="#F5F5DC",
+                         font=("Helvetica", 10)).grid(row=1, column=2 * col, sticky="w")
+                ttk.Spinbox(form, from_=1, to=MAX_GRID_DIM, textvariable=var, width=5
+                            ).grid(row=1, column=2 * col + 1, pady=2, sticky="w")
+
+        btns = tk.Frame(self.top, bg="#2D5016")
+        btns.pack(pady=(4, 12))
+        ttk.Button(btns, text="OK",     command=self._ok).pack(side=tk.LEFT, padx=6)
+        ttk.Button(btns, text="Cancel", command=self.top.destroy).pack(side=tk.LEFT, padx=6)
+        self.top.bind("<Return>", lambda e: self._ok())
+
+    def _ok(self):
+        rows = cols = None
+        if self.size is not None:
+            try:
+                rows, cols = self.rows_var.get(), self.cols_var.get()
+            except tk.TclError:
+                rows = cols = 0
+            if not (1 <= rows <= MAX_GRID_DIM and 1 <= cols <= MAX_GRID_DIM):
+                messagebox.showerror(
+                    "Bed Size", f"Rows and columns must be 1 to {MAX_GRID_DIM}.", parent=self.top,
+                )
+                return
+        self.result = (self.name_var.get().strip(), rows, cols)
+        self.top.destroy()
+
+
+# ─── Offsets Dialog ───────────────────────────────────────────────────────────
+
+class _OffsetsDialog:
+    """Ask for one whole number (possibly negative) per label in *fields*.
+
+    ``result`` is a tuple of the numbers, or None if cancelled.
+    """
+
+    def __init__(self, parent, title, fields, hint):
+        self.result = None
+        self.top = tk.Toplevel(parent)
+        self.top.title(title)
+        self.top.resizable(False, False)
+        self.top.grab_set()
+        self.top.configure(bg="#2D5016")
+
+        form = tk.Frame(self.top, bg="#2D5016")
+        form.pack(padx=16, pady=(12, 4))
+        self.vars = []
+        for i, label in enumerate(fields):
+            tk.Label(form, text=label, bg="#2D5016", fg="#F5F5DC",
+                     font=("Helvetica", 10)).grid(row=i // 2, column=2 * (i % 2), sticky="w")
+            var = tk.IntVar(value=0)
+            ttk.Spinbox(form, from_=-MAX_GRID_DIM, to=MAX_GRID_DIM, textvariable=var, width=6
+                        ).grid(row=i // 2, column=2 * (i % 2) + 1, padx=(4, 12), pady=2, sticky="w")
+            self.vars.append(var)
+        tk.Label(self.top, text=hint, bg="#2D5016", fg="#81C784",
+                 font=("Helvetica", 8, "italic")).pack(padx=16)
+
+        btns = tk.Frame(self.top, bg="#2D5016")
+        btns.pack(pady=(8, 12))
+        ttk.Button(btns, text="OK",     command=self._ok).pack(side=tk.LEFT, padx=6)
+        ttk.Button(btns, text="Cancel", command=self.top.destroy).pack(side=tk.LEFT, padx=6)
+        self.top.bind("<Return>", lambda e: self._ok())
+
+    def _ok(self):
+        try:
+            self.result = tuple(var.get() for var in self.vars)
+        except tk.TclError:
+            messagebox.showerror("Invalid Number", "Enter whole numbers only.", parent=self.top)
+            return
+        self.top.destroy()
+
+
 # ─── Layout Dialog ────────────────────────────────────────────────────────────
 
 class _LayoutDialog:
-    MINI_SZ = 28  # pixels per cell in the mini canvas
+    MINI_SZ     = 28   # largest pixels per cell in the mini canvas
+    MINI_MIN_SZ = 6    # smallest pixels per cell; bigger grids scroll
+    MINI_VIEW   = 560  # max width/height of the visible mini canvas area
 
-    def __init__(self, parent, rows, cols, cell_types):
+    def __init__(self, parent, model):
         self.result = None
-        self._rows = rows
-        self._cols = cols
-        # Work on a copy so Cancel discards changes
-        self._cell_types = dict(cell_types)
+        rows, cols = model.rows, model.cols
+        # Work on a copy of the surface plane so Cancel discards changes
+        self._layout = GridModel(rows, cols)
+        self._layout.surface = array("B", model.surface)
 
         self.top = tk.Toplevel(parent)
         self.top.title("Edit Garden Layout")
@@ -837,7 +2491,7 @@ class _LayoutDialog:
             ).pack(side=tk.LEFT, padx=(0, 4))
             var = tk.IntVar(value=default)
             setattr(self, attr, var)
-            sp = ttk.Spinbox(dim_frame, from_=1, to=20, textvariable=var, width=5)
+            sp = ttk.Spinbox(dim_frame, from_=1, to=MAX_GRID_DIM, textvariable=var, width=5)
             sp.pack(side=tk.LEFT, padx=(0, 12))
 
         ttk.Button(dim_frame, text="Update Grid", command=self._rebuild_canvas).pack(side=tk.LEFT, padx=6)
@@ -846,7 +2500,7 @@ class _LayoutDialog:
         self._canvas_frame = tk.Frame(self.top, bg="#2D5016")
         self._canvas_frame.pack(padx=24, pady=8)
 
-        self.mini_canvas = None
+        self._mini_last = None
         self._build_mini_canvas()
 
         # ── Legend strip ─────────────────────────────────────────────────
@@ -861,9 +2515,27 @@ class _LayoutDialog:
             tk.Label(f, text=stype.capitalize(), bg="#2D5016", fg="#F5F5DC",
                      font=("Helvetica", 8)).pack(side=tk.LEFT)
 
+        # ── Tools ────────────────────────────────────────────────────────
+        tools = tk.Frame(self.top, bg="#2D5016")
+        tools.pack(padx=24, pady=(2, 2))
+        tk.Label(tools, text="Surface:", bg="#2D5016", fg="#F5F5DC",
+                 font=("Helvetica", 9)).pack(side=tk.LEFT, padx=(0, 4))
+        self.surface_var = tk.StringVar(value="garden")
+        ttk.Combobox(tools, textvariable=self.surface_var, values=SURFACE_ORDER,
+                     state="readonly", width=9).pack(side=tk.LEFT, padx=(0, 10))
+        self.tool = tk.StringVar(value="click")
+        for value, text in (("click", "✎ Click"), ("fill", "◍ Fill"), ("rect", "▭ Rectangle")):
+            tk.Radiobutton(
+                tools, text=text, value=value, variable=self.tool, indicatoron=False,
+                bg="#1A3209", fg="#F5F5DC", selectcolor="#3A7D44",
+                activebackground="#2D5016", font=("Helvetica", 9), padx=6,
+            ).pack(side=tk.LEFT, padx=1)
+        self._rect_anchor = None
+
         tk.Label(
             self.top,
-            text="Left-click = Garden  ·  Right-click = cycle surface type",
+            text="Left-click = set surface (Fill: the connected area; Rectangle: drag)"
+                 "  ·  Right-click = cycle surface type",
             bg="#2D5016", fg="#81C784",
             font=("Helvetica", 8, "italic"),
         ).pack(pady=(0, 4))
@@ -875,92 +2547,441 @@ class _LayoutDialog:
         ttk.Button(btns, text="Cancel", command=self.top.destroy).pack(side=tk.LEFT, padx=6)
 
     def _build_mini_canvas(self):
-        if self.mini_canvas:
-            self.mini_canvas.destroy()
-        SZ = self.MINI_SZ
-        w = self._cols * SZ + 2
-        h = self._rows * SZ + 2
+        """Create the mini canvas and its scrollbars, once; the canvas
+        follows the layout from then on (see model_reset())."""
+        frame = self._canvas_frame
         self.mini_canvas = tk.Canvas(
-            self._canvas_frame, width=w, height=h,
-            bg="#6B4C2A", highlightthickness=1, highlightbackground="#3A7D44",
+            frame, bg="#6B4C2A", highlightthickness=1, highlightbackground="#3A7D44",
         )
-        self.mini_canvas.pack()
-        self.mini_canvas.bind("<Button-1>", self._mini_left_click)
-        self.mini_canvas.bind("<Button-3>", self._mini_right_click)
+        self._h_bar = ttk.Scrollbar(frame, orient=tk.HORIZONTAL, command=self.mini_canvas.xview)
+        self._v_bar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.mini_canvas.yview)
+        self.mini_canvas.configure(xscrollcommand=self._h_bar.set, yscrollcommand=self._v_bar.set)
+        self.mini_canvas.grid(row=0, column=0)
+        self.mini_canvas.bind("<Button-1>",        self._mini_left_click)
+        self.mini_canvas.bind("<B1-Motion>",       self._mini_drag)
+        self.mini_canvas.bind("<ButtonRelease-1>", self._mini_release)
+        self.mini_canvas.bind("<Button-3>",        self._mini_right_click)
+        self._mini_sz = self._fit_size()
+        self._fit_canvas()
         self._draw_mini()
+        self._layout.observers.append(self)
+
+    def _fit_size(self):
+        # Shrink cells for big grids, then scroll once they hit the minimum
+        rows, cols = self._layout.rows, self._layout.cols
+        return max(self.MINI_MIN_SZ, min(self.MINI_SZ, self.MINI_VIEW // max(rows, cols)))
+
+    def _fit_canvas(self):
+        """Size the canvas to the grid, with scrollbars only where needed."""
+        SZ = self._mini_sz
+        w = self._layout.cols * SZ + 2
+        h = self._layout.rows * SZ + 2
+        self.mini_canvas.configure(
+            width=min(w, self.MINI_VIEW), height=min(h, self.MINI_VIEW),
+            scrollregion=(0, 0, w, h),
+        )
+        for bar, needed, place in (
+            (self._h_bar, w > self.MINI_VIEW, {"row": 1, "column": 0, "sticky": "ew"}),
+            (self._v_bar, h > self.MINI_VIEW, {"row": 0, "column": 1, "sticky": "ns"}),
+        ):
+            if needed:
+                bar.grid(**place)
+            else:
+                bar.grid_remove()
+
+    def _mini_styles(self):
+        """(fill, outline, icon) per surface ID at the current cell size."""
+        styles = []
+        for surface in SURFACE_ORDER:
+            sdata = SURFACE_DATA[surface]
+            styles.append((
+                sdata["color"] or EMPTY_COLOR,
+                GRID_LINE_COLOR if surface == "garden" else "#C0C0C0",
+                sdata["icon"] if self._mini_sz >= 16 else None,
+            ))
+        return styles
 
     def _draw_mini(self):
+        """Draw every cell from scratch (first show, or a new cell size)."""
         self.mini_canvas.delete("all")
-        SZ = self.MINI_SZ
-        for r in range(self._rows):
-            for c in range(self._cols):
-                surface = self._cell_types.get((r, c), "garden")
-                sdata = SURFACE_DATA[surface]
-                color = sdata["color"] if sdata["color"] else EMPTY_COLOR
-                x1 = 1 + c * SZ
-                y1 = 1 + r * SZ
-                x2 = x1 + SZ
-                y2 = y1 + SZ
-                outline = GRID_LINE_COLOR if surface == "garden" else "#C0C0C0"
-                self.mini_canvas.create_rectangle(
-                    x1, y1, x2, y2,
-                    fill=color, outline=outline, width=1,
-                )
-                if sdata["icon"]:
-                    self.mini_canvas.create_text(
-                        x1 + SZ // 2, y1 + SZ // 2,
-                        text=sdata["icon"], font=("Segoe UI Emoji", 8),
-                    )
+        self._mini_items = {}   # (r, c) -> [rectangle id, icon id or None]
+        self._styles = self._mini_styles()
+        layout = self._layout
+        self._shown = array("B", layout.surface)    # surface IDs as drawn
+        self._shown_cols = layout.cols
+        for r in range(layout.rows):
+            for c in range(layout.cols):
+                self._draw_mini_cell(r, c, self._shown[r * layout.cols + c])
+
+    def _draw_mini_cell(self, r, c, code):
+        """Create or restyle the items of one cell for surface ID *code*."""
+        cv = self.mini_canvas
+        fill, outline, icon = self._styles[code]
+        items = self._mini_items.get((r, c))
+        if items is None:
+            SZ = self._mini_sz
+            x1, y1 = 1 + c * SZ, 1 + r * SZ
+            items = self._mini_items[r, c] = [
+                cv.create_rectangle(x1, y1, x1 + SZ, y1 + SZ, fill=fill, outline=outline, width=1),
+                None,
+            ]
+        else:
+            cv.itemconfigure(items[0], fill=fill, outline=outline)
+            if items[1] is not None:
+                cv.delete(items[1])
+                items[1] = None
+        if icon:
+            SZ = self._mini_sz
+            items[1] = cv.create_text(
+                1 + c * SZ + SZ // 2, 1 + r * SZ + SZ // 2,
+                text=icon, font=("Segoe UI Emoji", 8),
+            )
+
+    # ── Layout observer ──────────────────────────────────────────────────────
+
+    def cell_changed(self, plane, i, old, new):
+        if plane == "surface":
+            r, c = divmod(i, self._layout.cols)
+            self._shown[i] = new
+            self._draw_mini_cell(r, c, new)
+
+    def model_reset(self):
+        """Catch up after a resize or a bulk fill.
+
+        Cells that left the grid are deleted and new ones created in
+        place; of the rest, only rows whose surfaces differ from what is
+        drawn are compared cell by cell.  A new cell size redraws all.
+        """
+        layout = self._layout
+        rows, cols = layout.rows, layout.cols
+        SZ = self._fit_size()
+        if SZ != self._mini_sz:
+            self._mini_sz = SZ
+            self._fit_canvas()
+            self._draw_mini()
+            return
+        cv = self.mini_canvas
+        for key in [k for k in self._mini_items if k[0] >= rows or k[1] >= cols]:
+            for item in self._mini_items.pop(key):
+                if item is not None:
+                    cv.delete(item)
+        self._fit_canvas()
+
+        old, old_cols = self._shown, self._shown_cols
+        old_rows = len(old) // old_cols if old_cols else 0
+        new = layout.surface
+        keep = min(cols, old_cols)
+        for r in range(rows):
+            row = new[r * cols:(r + 1) * cols]
+            if r >= old_rows:
+                start = 0
+            elif old[r * old_cols:r * old_cols + keep] == row[:keep]:
+                start = keep    # the surviving part of this row is as drawn
+            else:
+                start = 0
+            for c in range(start, cols):
+                if r >= old_rows or c >= old_cols or old[r * old_cols + c] != row[c]:
+                    self._draw_mini_cell(r, c, row[c])
+        self._shown = array("B", new)
+        self._shown_cols = cols
+
+    # ── Mouse ────────────────────────────────────────────────────────────────
 
     def _mini_cell(self, event):
-        SZ = self.MINI_SZ
-        c = int((event.x - 1) // SZ)
-        r = int((event.y - 1) // SZ)
-        if 0 <= r < self._rows and 0 <= c < self._cols:
+        SZ = self._mini_sz
+        c = int((self.mini_canvas.canvasx(event.x) - 1) // SZ)
+        r = int((self.mini_canvas.canvasy(event.y) - 1) // SZ)
+        if self._layout.in_bounds(r, c):
             return r, c
         return None
 
     def _mini_left_click(self, event):
         cell = self._mini_cell(event)
-        if cell:
-            self._cell_types.pop(cell, None)  # set to garden
-            self._draw_mini()
+        self._mini_last = cell
+        if not cell:
+            return
+        tool, surface = self.tool.get(), self.surface_var.get()
+        if tool == "rect":
+            self._rect_anchor = cell
+            self._draw_mini_rect(cell)
+        elif tool == "fill":
+            self._layout.fill("surface", flood_region(self._layout, "surface", *cell), surface)
+        else:
+            self._layout.set_surface(*cell, surface)
+
+    def _mini_point(self, event):
+        """The cell under the pointer, clamped to the grid."""
+        SZ = self._mini_sz
+        c = int((self.mini_canvas.canvasx(event.x) - 1) // SZ)
+        r = int((self.mini_canvas.canvasy(event.y) - 1) // SZ)
+        return min(max(r, 0), self._layout.rows - 1), min(max(c, 0), self._layout.cols - 1)
+
+    def _mini_drag(self, event):
+        if self._rect_anchor is not None:
+            self._draw_mini_rect(self._mini_point(event))
+            return
+        if self.tool.get() != "click":
+            return
+        # Paint every cell the pointer sweeps over, as on the main canvas
+        cell = self._mini_cell(event)
+        surface = self.surface_var.get()
+        if cell and self._mini_last:
+            for r, c in _cells_between(self._mini_last, cell):
+                self._layout.set_surface(r, c, surface)
+        elif cell:
+            self._layout.set_surface(*cell, surface)
+        self._mini_last = cell
+
+    def _mini_release(self, event):
+        self._mini_last = None
+        if self._rect_anchor is None:
+            return
+        (r0, r1), (c0, c1) = (sorted(pair) for pair in zip(self._rect_anchor, self._mini_point(event)))
+        self._rect_anchor = None
+        self.mini_canvas.delete("rect_preview")
+        self._layout.fill("surface", rect_runs(self._layout, r0, r1 + 1, c0, c1 + 1), self.surface_var.get())
+
+    def _draw_mini_rect(self, cell):
+        self.mini_canvas.delete("rect_preview")
+        (r0, r1), (c0, c1) = (sorted(pair) for pair in zip(self._rect_anchor, cell))
+        SZ = self._mini_sz
+        self.mini_canvas.create_rectangle(
+            1 + c0 * SZ, 1 + r0 * SZ, 1 + (c1 + 1) * SZ, 1 + (r1 + 1) * SZ,
+            outline=HOVER_COLOR, width=2, dash=(4, 3), tags="rect_preview",
+        )
 
     def _mini_right_click(self, event):
         cell = self._mini_cell(event)
         if not cell:
             return
-        current = self._cell_types.get(cell, "garden")
+        current = self._layout.surface_at(*cell)
         idx = SURFACE_ORDER.index(current)
-        next_surface = SURFACE_ORDER[(idx + 1) % len(SURFACE_ORDER)]
-        if next_surface == "garden":
-            self._cell_types.pop(cell, None)
-        else:
-            self._cell_types[cell] = next_surface
-        self._draw_mini()
+        self._layout.set_surface(*cell, SURFACE_ORDER[(idx + 1) % len(SURFACE_ORDER)])
 
     def _rebuild_canvas(self):
-        nr = self.rows_var.get()
-        nc = self.cols_var.get()
-        # Prune cell_types outside new bounds
-        self._cell_types = {
-            (r, c): v for (r, c), v in self._cell_types.items()
-            if r < nr and c < nc
-        }
-        self._rows = nr
-        self._cols = nc
-        self._build_mini_canvas()
+        # Cells outside the new bounds are dropped; new cells start as garden.
+        # The canvas grows or shrinks in place through model_reset().
+        self._layout.resize(self.rows_var.get(), self.cols_var.get())
 
     def _apply(self):
-        self.result = (self.rows_var.get(), self.cols_var.get(), dict(self._cell_types))
+        self._layout.observers.remove(self)     # no need to redraw on the way out
+        self._layout.resize(self.rows_var.get(), self.cols_var.get())
+        self.result = (self._layout.rows, self._layout.cols, self._layout.surface)
         self.top.destroy()
 
 
+# ─── Auto-Plan Dialog ─────────────────────────────────────────────────────────
+
+class _AutoPlanDialog:
+    """Pick a crop mix and limits, preview the plan, then apply it.
+
+    ``result`` is the Plan to apply, or None if the dialog was cancelled.
+    """
+
+    PREVIEW = 320   # size of the preview image, in pixels
+
+    def __init__(self, parent, model):
+        self.model  = model
+        self.result = None
+
+        self.top = tk.Toplevel(parent)
+        self.top.title("Auto-Plan")
+        self.top.resizable(False, False)
+        self.top.grab_set()
+        self.top.configure(bg="#2D5016")
+
+        tk.Label(
+            self.top, text="Auto-Plan Empty Squares",
+            font=("Georgia", 13, "bold"),
+            bg="#2D5016", fg="#F5F5DC",
+        ).pack(pady=(16, 8), padx=24)
+
+        body = tk.Frame(self.top, bg="#2D5016")
+        body.pack(padx=24)
+        left  = tk.Frame(body, bg="#2D5016")
+        left.pack(side=tk.LEFT, anchor="n")
+        right = tk.Frame(body, bg="#2D5016")
+        right.pack(side=tk.LEFT, anchor="n", padx=(16, 0))
+
+        # ── Goal and placement rule ──────────────────────────────────────
+        opts = tk.Frame(left, bg="#2D5016")
+        opts.pack(fill=tk.X, pady=(0, 6))
+        self.objective = tk.StringVar(value="plants")
+        for text, value in (("Most plants", "plants"), ("Weighted score", "weighted")):
+            tk.Radiobutton(
+                opts, text=text, value=value, variable=self.objective,
+                bg="#2D5016", fg="#F5F5DC", selectcolor="#1A3209",
+                activebackground="#2D5016", font=("Helvetica", 9),
+            ).pack(side=tk.LEFT, padx=(0, 8))
+        tk.Label(opts, text="Tall crops within", bg="#2D5016", fg="#F5F5DC",
+                 font=("Helvetica", 9)).pack(side=tk.LEFT, padx=(8, 4))
+        self.tall_rows = tk.IntVar(value=TALL_ROWS)
+        ttk.Spinbox(opts, from_=1, to=MAX_GRID_DIM, textvariable=self.tall_rows, width=4
+                    ).pack(side=tk.LEFT)
+        tk.Label(opts, text="rows of north edge", bg="#2D5016", fg="#F5F5DC",
+                 font=("Helvetica", 9)).pack(side=tk.LEFT, padx=(4, 0))
+
+        # ── Crop mix table ───────────────────────────────────────────────
+        wrap = tk.Frame(left, bg="#2D5016")
+        wrap.pack(fill=tk.X)
+        table_cv = tk.Canvas(wrap, width=380, height=300, bg="#1A3209", highlightthickness=0)
+        bar = ttk.Scrollbar(wrap, orient=tk.VERTICAL, command=table_cv.yview)
+        table_cv.configure(yscrollcommand=bar.set)
+        bar.pack(side=tk.RIGHT, fill=tk.Y)
+        table_cv.pack(side=tk.LEFT)
+        table = tk.Frame(table_cv, bg="#1A3209")
+        table_cv.create_window(0, 0, window=table, anchor="nw")
+        table.bind("<Configure>", lambda e: table_cv.configure(scrollregion=table_cv.bbox("all")))
+
+        for col, text in enumerate(("Use", "Crop", "Min", "Max", "Weight")):
+            tk.Label(table, text=text, bg="#1A3209", fg="#F5F5DC",
+                     font=("Helvetica", 9, "bold")).grid(row=0, column=col, padx=4, sticky="w")
+        self._rows = {}     # crop -> (use, min, max, weight) variables
+        for r, (crop, data) in enumerate(CROP_DATA.items(), start=1):
+            use    = tk.BooleanVar(value=True)
+            least  = tk.StringVar()
+            most   = tk.StringVar()
+            weight = tk.StringVar(value=str(data["plants_per_sqft"]))
+            self._rows[crop] = (use, least, most, weight)
+            tk.Checkbutton(table, variable=use, bg="#1A3209", selectcolor="#1A3209",
+                           activebackground="#1A3209").grid(row=r, column=0)
+            name = f"{crop} ▲" if crop in TALL_CROPS else crop
+            tk.Label(table, text=name, bg=data["color"], fg=_text_color(data["color"]),
+                     font=("Helvetica", 8), width=16, anchor="w").grid(row=r, column=1, padx=4, pady=1)
+            for col, var in ((2, least), (3, most), (4, weight)):
+                ttk.Entry(table, textvariable=var, width=6).grid(row=r, column=col, padx=2)
+
+        tk.Label(
+            left,
+            text="Min/Max count squares already planted; leave blank for no limit.\n"
+                 "▲ tall: kept near the north (top) edge so it won't shade others.",
+            bg="#2D5016", fg="#81C784", font=("Helvetica", 8, "italic"), justify="left",
+        ).pack(anchor="w", pady=(4, 0))
+
+        # ── Preview ──────────────────────────────────────────────────────
+        self._preview = tk.Label(right, bg="#6B4C2A", width=self.PREVIEW, height=self.PREVIEW)
+        self._preview.pack()
+        self._image = None
+        self.summary_lbl = tk.Label(
+            right, text="Press Preview to see the plan.", bg="#2D5016", fg="#F5F5DC",
+            font=("Helvetica", 9), justify="left", wraplength=self.PREVIEW,
+        )
+        self.summary_lbl.pack(anchor="w", pady=(6, 0))
+
+        # ── Buttons ──────────────────────────────────────────────────────
+        btns = tk.Frame(self.top, bg="#2D5016")
+        btns.pack(pady=(10, 14))
+        ttk.Button(btns, text="Preview", command=self._preview_plan).pack(side=tk.LEFT, padx=6)
+        ttk.Button(btns, text="Apply",   command=self._apply).pack(side=tk.LEFT, padx=6)
+        ttk.Button(btns, text="Cancel",  command=self.top.destroy).pack(side=tk.LEFT, padx=6)
+
+    def _make_plan(self):
+        """Plan from the current settings, or None after reporting bad input."""
+        def number(text, kind, crop, what):
+            text = text.strip()
+            if not text:
+                return None
+            try:
+                n = kind(text)
+            except ValueError:
+                n = -1
+            if n < 0:
+                raise ValueError(f"{crop}: {what} must be a number of 0 or more.")
+            return n
+
+        mix, weights = {}, {}
+        try:
+            for crop, (use, least, most, weight) in self._rows.items():
+                if not use.get():
+                    continue
+                mix[crop] = (number(least.get(), int, crop, "Min"), number(most.get(), int, crop, "Max"))
+                weights[crop] = number(weight.get(), float, crop, "Weight") or 0
+            tall_rows = self.tall_rows.get()
+        except (ValueError, tk.TclError) as e:
+            messagebox.showerror("Auto-Plan", str(e), parent=self.top)
+            return None
+        weighted = self.objective.get() == "weighted"
+        return auto_plan(self.model, mix, weights if weighted else None, tall_rows)
+
+    def _preview_plan(self):
+        plan = self._make_plan()
+        if plan is None:
+            return
+        self._draw_preview(plan)
+        lines = [f"Adds {len(plan)} squares · {plan.plants} plants"]
+        top = sorted(plan.squares.items(), key=lambda kv: -kv[1])
+        lines.append(", ".join(f"{crop} {n}" for crop, n in top[:8]) + (" …" if len(top) > 8 else ""))
+        if plan.shortfall:
+            lines.append("Not enough room for the minimum: " + ", ".join(
+                f"{crop} (short {n})" for crop, n in plan.shortfall.items()
+            ))
+        self.summary_lbl.configure(text="\n".join(lines))
+
+    def _draw_preview(self, plan):
+        """Show the bed with the plan applied, one pixel block per square."""
+        model = self.model
+        rows, cols = model.rows, model.cols
+        crops = array("B", model.crop)
+        for i, cid in zip(plan.cells, plan.crops):
+            crops[i] = cid
+        crop_colors = [EMPTY_COLOR] + [CROP_DATA[name]["color"] for name in CROP_NAMES[1:]]
+        surface_colors = [SURFACE_DATA[s]["color"] or EMPTY_COLOR for s in SURFACE_ORDER]
+        surface = model.surface
+        data = []
+        for r in range(rows):
+            base = r * cols
+            data.append("{" + " ".join(
+                surface_colors[surface[i]] if surface[i] else crop_colors[crops[i]]
+                for i in range(base, base + cols)
+            ) + "}")
+        image = tk.PhotoImage(width=cols, height=rows)
+        image.put(" ".join(data))
+        side = max(rows, cols)
+        if side <= self.PREVIEW:
+            image = image.zoom(self.PREVIEW // side)
+        else:
+            image = image.subsample(-(-side // self.PREVIEW))
+        self._image = image     # keep a reference or Tk drops the pixels
+        self._preview.configure(image=image, width=self.PREVIEW, height=self.PREVIEW)
+
+    def _apply(self):
+        plan = self._make_plan()
+        if plan is not None:
+            self.result = plan
+            self.top.destroy()
+
+
 # ─── Entry Point ──────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
+    # Headless tools: python garden_planner.py stats|convert ...
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+        sys.exit(cli_main(prog="garden_planner.py"))
+
+    parser = argparse.ArgumentParser(
+        description="Square Foot Garden Planner",
+        epilog=f"Headless tools: {', '.join(CLI_COMMANDS)} (see '<tool> --help').",
+    )
+    parser.add_argument(
+        "--renderer", choices=sorted(RENDERERS), default="vector",
+        help="'vector' draws icons and labels in every square; 'tiles' draws "
+             "one cached image per square, which keeps very large beds fast",
+    )
+    parser.add_argument(
+        "--undo-mb", type=float, default=UNDO_BUDGET / 2**20, metavar="MB",
+        help="memory to spend on undo history (default: %(default)g MB)",
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="time every handler and run cProfile from startup; save the "
+             "results with View → Save Performance Profile",
+    )
+    args = parser.parse_args()
+
     root = tk.Tk()
     root.geometry("1280x760")
     root.minsize(1060, 600)
-    GardenPlannerApp(root)
+    GardenPlannerApp(
+        root, renderer=args.renderer, undo_budget=int(args.undo_mb * 2**20), profile=args.profile,
+    )
     root.mainloop()
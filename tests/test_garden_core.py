@@ -0,0 +1,87 @@
+"""Tests for the Tk-free half of the planner (run with python -m unittest)."""
+
+import csv
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from garden_core import Garden, GridModel, Project, auto_plan, write_stats
+
+
+# ─── Auto-Plan ────────────────────────────────────────────────────────────────
+
+class AutoPlanTest(unittest.TestCase):
+
+    def test_shortfall_when_minimum_exceeds_empty_squares(self):
+        model = GridModel(1, 3)
+        plan = auto_plan(model, {"Peppers": (5, None)})
+        self.assertEqual(plan.squares, {"Peppers": 3})
+        self.assertEqual(plan.shortfall, {"Peppers": 2})
+
+    def test_shortfall_on_full_bed(self):
+        model = GridModel(1, 3)
+        for c in range(3):
+            model.set_crop(0, c, "Basil")
+        plan = auto_plan(model, {"Kale": (3, None)})
+        self.assertEqual(len(plan), 0)
+        self.assertEqual(plan.shortfall, {"Kale": 3})
+
+    def test_minimum_that_fits_has_no_shortfall(self):
+        model = GridModel(4, 8)
+        plan = auto_plan(model, {"Peppers": (5, None), "Basil": (None, None)})
+        self.assertEqual(plan.squares["Peppers"], 5)
+        self.assertEqual(plan.shortfall, {})
+
+
+# ─── Projects ─────────────────────────────────────────────────────────────────
+
+class ProjectSaveTest(unittest.TestCase):
+
+    def test_edits_during_a_save_stay_unsaved(self):
+        project = Project()
+        project.add_garden(Garden(2, 2), "Front")
+        project.add_bed("Back", 3, 3)
+        project.garden.plant(0, 0, "Kale")
+        with tempfile.TemporaryDirectory() as tmp:
+            plan = project.save_plan(os.path.join(tmp, "site.sqproj"))
+            project.garden.plant(1, 1, "Basil")     # after the snapshot
+            Project.write_plan(plan)
+            self.assertIs(project.save_done(plan), False)
+            self.assertEqual(project.unsaved(), ["Front"])
+
+            saved = Project.load(project.path)
+            self.assertEqual(list(saved.beds), ["Front", "Back"])
+            front = saved.open_bed("Front")
+            self.assertEqual(front.model.crop_at(0, 0), "Kale")
+            self.assertIsNone(front.model.crop_at(1, 1))
+
+
+# ─── Batch Statistics ─────────────────────────────────────────────────────────
+
+class StatsCsvTest(unittest.TestCase):
+
+    def test_csv_has_squares_and_plants_per_crop(self):
+        garden = Garden(2, 4)
+        garden.plant(0, 0, "Carrots")
+        garden.plant(0, 1, "Carrots")
+        garden.plant(1, 0, "Tomatoes")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bed.json")
+            garden.save(path)
+            out = io.StringIO()
+            self.assertEqual(write_stats([path], out, fmt="csv", jobs=1), 0)
+        (row,) = csv.DictReader(io.StringIO(out.getvalue()))
+        self.assertEqual(row["squares:Carrots"], "2")
+        self.assertEqual(row["plants:Carrots"], "32")
+        self.assertEqual(row["squares:Tomatoes"], "1")
+        self.assertEqual(row["plants:Tomatoes"], "1")
+        self.assertEqual(row["plants:Basil"], "0")
+        self.assertEqual(row["plants"], "33")
+
+
+if __name__ == "__main__":
+    unittest.main()